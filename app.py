@@ -62,8 +62,8 @@ def initialize_services():
     """서비스 초기화 (한 번만 실행)"""
     try:
         config = initialize_config()
-        memory_manager = SimpleMemoryManager(config)
         chat_service = EnhancedChatService(config)  # 강화된 채팅 서비스 사용
+        memory_manager = chat_service.memory_manager  # 같은 메모리 매니저 공유 (중복 로드 방지)
         classifier = ClassificationService(config)
         return config, memory_manager, chat_service, classifier
     except Exception as e:
@@ -93,6 +93,20 @@ def run_async(coro):
     finally:
         loop.close()
 
+def iter_async(agen):
+    """async generator를 동기 generator로 변환 (st.write_stream용, 스트림 전체에 루프 하나 사용)"""
+    loop = asyncio.new_event_loop()
+    asyncio.set_event_loop(loop)
+    try:
+        while True:
+            try:
+                yield loop.run_until_complete(agen.__anext__())
+            except StopAsyncIteration:
+                break
+    finally:
+        loop.run_until_complete(agen.aclose())
+        loop.close()
+
 # 헤더
 st.title("🧠 mem0 LTM - 장기 기억 챗봇")
 st.markdown("""
@@ -162,8 +176,8 @@ with st.sidebar:
     # 대화 초기화
     if st.button("🗑️ 대화 초기화"):
         st.session_state.messages = []
-        st.session_state.session_id = str(uuid.uuid4())
         chat_service.clear_session(st.session_state.session_id)
+        st.session_state.session_id = str(uuid.uuid4())
         st.rerun()
 
 # 메인 레이아웃
@@ -197,19 +211,24 @@ with col1:
             "content": user_input
         })
 
-        # 대화 처리
-        with st.spinner("생각 중..."):
-            response = run_async(chat_service.chat(
-                message=user_input,
-                user_id=st.session_state.user_id,
-                session_id=st.session_state.session_id,
-                use_memory=True
-            ))
+        # 대화 처리 (토큰이 생성되는 대로 표시)
+        response = {}
+        with chat_container:
+            with st.chat_message("user"):
+                st.write(user_input)
+            with st.chat_message("assistant"):
+                streamed_text = st.write_stream(iter_async(chat_service.chat_stream(
+                    message=user_input,
+                    user_id=st.session_state.user_id,
+                    session_id=st.session_state.session_id,
+                    use_memory=True,
+                    result=response
+                )))
 
         # 응답 추가
         st.session_state.messages.append({
             "role": "assistant",
-            "content": response["response"],
+            "content": response.get("response", streamed_text),
             "used_memories": response.get("used_memories", [])
         })
 
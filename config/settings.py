@@ -78,14 +78,22 @@ class ModelConfig:
 class DatabaseConfig:
     """데이터베이스 설정"""
     # Vector DB (Qdrant)
-    vector_db_type: str = "qdrant"
+    vector_db_type: str = "qdrant"  # "qdrant" (서버) 또는 "qdrant_local" (임베디드, 서버 불필요)
     qdrant_host: str = "localhost"
     qdrant_port: int = 6333
     qdrant_api_key: Optional[str] = None
     collection_name: str = "memories"
+    # qdrant_local 저장 경로 (벡터도 디스크에 저장)
+    qdrant_path: str = "data/qdrant"
+    # True면 모든 사용자가 collection_name 컬렉션 하나를 공유 (user_id 페이로드로 격리)
+    multi_tenant: bool = False
+    # Qdrant 헬스 체크 (장애 시 ChromaDB로 전환, 복구되면 자동 복귀)
+    qdrant_health_interval: float = 5.0
+    qdrant_probe_timeout: float = 0.5
+    qdrant_failure_threshold: int = 2
 
     # Metadata DB (SQLite/PostgreSQL)
-    metadata_db_type: str = "sqlite"  # "sqlite" or "postgresql"
+    metadata_db_type: str = "sqlite"  # "sqlite", "file" or "postgresql"
     sqlite_path: str = "data/metadata.db"
 
     # PostgreSQL 설정 (선택적)
@@ -126,6 +134,56 @@ class MemoryConfig:
     archive_after_days: int = 90
     delete_after_days: int = 365
 
+    # 사용자별 mem0 인스턴스 풀 설정
+    memory_pool_size: int = 64  # 동시에 유지할 최대 인스턴스 수
+    memory_pool_idle_seconds: int = 900  # 이 시간 동안 쓰이지 않은 인스턴스는 해제
+
+    # 임베딩 캐시 설정
+    embedding_cache_size: int = 10000  # 프로세스 내 LRU 항목 수
+    embedding_cache_disk: bool = True  # data_dir/embedding_cache.db 디스크 캐시 사용
+
+    # 일괄 추가 설정 (add_memories)
+    ingest_embed_batch_size: int = 64  # 임베딩 요청 하나에 담을 텍스트 수
+    ingest_upsert_batch_size: int = 256  # 벡터 저장소 upsert 청크 크기
+
+    # 대화 전 조회 단계 타임아웃 (초과하면 해당 결과 없이 응답 생성)
+    retrieval_search_timeout: float = 3.0  # 관련 메모리 검색
+    retrieval_profile_timeout: float = 2.0  # 최근 메모리(사용자 프로필)
+    retrieval_history_timeout: float = 1.0  # 세션 히스토리
+
+    # 백그라운드 메모리 수집 (응답을 먼저 돌려주고 추출/분류/저장은 큐에서 처리)
+    ingest_async: bool = True
+    ingest_workers: int = 2  # 동시에 처리할 작업 수
+    ingest_queue_size: int = 1000  # 메모리에 올려 둘 작업 수 (초과분은 저널에서 다시 읽음)
+    ingest_journal: bool = True  # data_dir/ingest/*.jsonl 저널 (재시작 시 미처리 작업 복구)
+    ingest_max_retries: int = 3  # 작업당 최대 시도 횟수
+    ingest_retry_delay: float = 1.0  # 첫 재시도 대기 시간 (초, 시도마다 두 배)
+
+    # 대화 세션 저장소 (세션별 최근 대화)
+    session_max_messages: int = 20  # 세션당 유지할 최근 메시지 수
+    session_max_active: int = 1000  # RAM에 유지할 최대 세션 수
+    session_idle_seconds: int = 3600  # 이 시간 동안 쓰이지 않은 세션은 RAM에서 내보냄
+    session_max_bytes: int = 32 * 1024 * 1024  # RAM에 유지할 세션 내용 상한
+    session_persist: bool = True  # data_dir/sessions/*.db에 기록 (재시작 후 복구)
+    session_retention_days: int = 7  # 디스크 보관 기간 (0이면 무기한)
+
+    # 프롬프트 토큰 예산 (models.model_params["chat"]["num_ctx"] 기준)
+    prompt_max_tokens: int = 4096  # 프롬프트 상한 - 프롬프트 처리 시간 제한 (0이면 num_ctx가 허락하는 만큼)
+    prompt_memory_ratio: float = 0.6  # 고정 부분을 뺀 예산 중 메모리 컨텍스트 비율 (남은 만큼 히스토리)
+
+    # 로컬 저장소 설정
+    local_snapshot_interval: int = 1000  # 스냅샷을 다시 쓰기까지의 로그 작업 수
+    local_shard_idle_seconds: int = 600  # 유휴 사용자 샤드를 RAM에서 내리기까지의 시간
+    local_max_active_shards: int = 256  # RAM에 유지할 최대 사용자 샤드 수
+    local_write_behind: bool = True  # 로그 기록을 백그라운드 flusher로 미룸 (group commit)
+    local_flush_ops: int = 64  # 이 개수만큼 작업이 쌓이면 flush
+    local_flush_interval_ms: int = 200  # 버퍼된 작업이 있으면 이 간격마다 flush
+    local_max_buffered_ops: int = 4096  # 버퍼 상한 (초과 시 호출 스레드에서 즉시 flush)
+    local_compaction_dead_ratio: float = 0.5  # 죽은 레코드 비율이 이 값을 넘으면 샤드 압축
+    local_compaction_min_bytes: int = 65536  # 이보다 작은 샤드는 압축하지 않음
+    local_compaction_interval_seconds: int = 30  # 백그라운드 압축 점검 주기
+    local_vector_dtype: str = "float32"  # 벡터 세그먼트 저장 자료형 ("float32" 또는 "float16")
+
 
 @dataclass
 class APIConfig:
@@ -177,6 +235,10 @@ class AppConfig:
     ollama_host: str = "http://localhost:11434"
     ollama_timeout: int = 120  # seconds
 
+    # 블로킹 호출 실행기 설정 (mem0 / Ollama 동기 API를 이벤트 루프 밖에서 실행)
+    blocking_workers: int = 8  # 스레드 수
+    blocking_max_pending: int = 64  # 이벤트 루프당 동시에 진행/대기할 수 있는 호출 수
+
     def __post_init__(self):
         """초기화 후 디렉토리 생성"""
         for dir_path in [self.data_dir, self.logs_dir, self.uploads_dir]:
@@ -0,0 +1,205 @@
+"""
+벡터 저장소 백엔드 상태 감시
+백그라운드 스레드가 주기적으로 헬스 체크를 하고 결과를 캐시하여
+요청 경로에서는 네트워크 호출 없이 상태를 읽기만 함 (circuit breaker)
+"""
+
+import time
+import logging
+import threading
+from typing import Dict, Any, Callable, Optional
+
+import requests
+
+logger = logging.getLogger(__name__)
+
+
+def http_probe(url: str, timeout: float) -> Callable[[], bool]:
+    """HTTP GET으로 200 응답을 확인하는 헬스 체크 함수 생성"""
+    def probe() -> bool:
+        try:
+            return requests.get(url, timeout=timeout).status_code == 200
+        except Exception:
+            return False
+    return probe
+
+
+def client_probe(open_client: Callable[[], Any]) -> Callable[[], bool]:
+    """클라이언트로 컬렉션 목록을 조회해 확인하는 헬스 체크 함수 생성 (임베디드 Qdrant 등)"""
+    def probe() -> bool:
+        try:
+            open_client().get_collections()
+            return True
+        except Exception:
+            return False
+    return probe
+
+
+class CircuitBreaker:
+    """
+    백엔드 차단기
+
+    - closed: 요청을 백엔드로 보냄
+    - open: 연속 실패가 failure_threshold에 도달하면 열림, 요청은 즉시 폴백으로 보냄
+    - 열린 동안에는 헬스 체크가 성공해야 다시 닫힘 (요청이 직접 타임아웃을 기다리지 않음)
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+
+    def __init__(self, failure_threshold: int = 2):
+        self.failure_threshold = max(1, failure_threshold)
+        self.state = self.CLOSED
+        self.failures = 0
+        self.opened_at: Optional[float] = None
+        self.trips = 0
+        self._lock = threading.Lock()
+
+    @property
+    def is_closed(self) -> bool:
+        return self.state == self.CLOSED
+
+    def record_success(self) -> bool:
+        """성공 기록 - 상태가 바뀌면 True"""
+        with self._lock:
+            self.failures = 0
+            if self.state == self.CLOSED:
+                return False
+            self.state = self.CLOSED
+            self.opened_at = None
+            return True
+
+    def record_failure(self) -> bool:
+        """실패 기록 - 이번 실패로 열리면 True"""
+        with self._lock:
+            self.failures += 1
+            if self.state == self.OPEN or self.failures < self.failure_threshold:
+                return False
+            self._open()
+            return True
+
+    def trip(self) -> bool:
+        """즉시 열기 (요청 실패 후 헬스 체크까지 실패한 경우) - 상태가 바뀌면 True"""
+        with self._lock:
+            self.failures = max(self.failures, self.failure_threshold)
+            if self.state == self.OPEN:
+                return False
+            self._open()
+            return True
+
+    def _open(self):
+        """차단기 열기 (호출자가 잠금 보유)"""
+        self.state = self.OPEN
+        self.opened_at = time.monotonic()
+        self.trips += 1
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "state": self.state,
+                "failures": self.failures,
+                "trips": self.trips,
+                "open_seconds": time.monotonic() - self.opened_at if self.opened_at else 0.0
+            }
+
+
+class HealthMonitor:
+    """
+    백그라운드 헬스 체크
+
+    interval초마다 probe를 실행해 차단기를 갱신하고, 상태가 바뀌면 on_change(healthy) 호출
+    check_now()로 다음 체크를 앞당길 수 있음 (요청 실패 직후 등)
+    """
+
+    def __init__(
+        self,
+        name: str,
+        probe: Callable[[], bool],
+        breaker: CircuitBreaker,
+        interval: float = 5.0,
+        on_change: Optional[Callable[[bool], None]] = None
+    ):
+        self.name = name
+        self.probe = probe
+        self.breaker = breaker
+        self.interval = interval
+        self.on_change = on_change
+        self.last_checked: Optional[float] = None
+
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def healthy(self) -> bool:
+        """캐시된 상태 (네트워크 호출 없음)"""
+        return self.breaker.is_closed
+
+    def check(self) -> bool:
+        """헬스 체크 한 번 실행하고 차단기 갱신"""
+        ok = self.probe()
+        self.last_checked = time.monotonic()
+        changed = self.breaker.record_success() if ok else self.breaker.record_failure()
+        if changed:
+            if ok:
+                logger.info(f"✅ {self.name} 복구됨")
+            else:
+                logger.warning(f"⚠️ {self.name} 응답 없음 - 폴백으로 전환")
+            self._notify(ok)
+        return ok
+
+    def trip(self):
+        """차단기 즉시 열기"""
+        if self.breaker.trip():
+            logger.warning(f"⚠️ {self.name} 요청 실패 - 폴백으로 전환")
+            self._notify(False)
+
+    def _notify(self, healthy: bool):
+        if self.on_change is None:
+            return
+        try:
+            self.on_change(healthy)
+        except Exception as e:
+            logger.warning(f"상태 변경 처리 실패 ({self.name}): {e}")
+
+    def start(self):
+        """감시 스레드 시작"""
+        if self._thread is not None:
+            return
+        self._thread = threading.Thread(
+            target=self._loop,
+            name=f"health-{self.name.lower()}",
+            daemon=True
+        )
+        self._thread.start()
+
+    def check_now(self):
+        """다음 헬스 체크를 바로 실행하도록 깨움"""
+        self._wake.set()
+
+    def _loop(self):
+        while not self._stop.is_set():
+            self._wake.wait(self.interval)
+            self._wake.clear()
+            if self._stop.is_set():
+                break
+            try:
+                self.check()
+            except Exception as e:
+                logger.debug(f"헬스 체크 오류 ({self.name}): {e}")
+
+    def stop(self):
+        """감시 스레드 종료"""
+        self._stop.set()
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join(timeout=self.interval + 1)
+            self._thread = None
+
+    def stats(self) -> Dict[str, Any]:
+        stats = self.breaker.stats()
+        stats["healthy"] = self.healthy
+        stats["last_checked_ago"] = (
+            time.monotonic() - self.last_checked if self.last_checked else None
+        )
+        return stats
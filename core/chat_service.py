@@ -3,7 +3,7 @@
 """
 
 import logging
-from typing import Dict, List, Optional, Any, Tuple
+from typing import Dict, List, Optional, Any, AsyncIterator, Tuple
 from datetime import datetime
 import json
 import ollama
@@ -15,9 +15,28 @@ sys.path.append(str(Path(__file__).parent.parent))
 from core.memory_manager_simple import SimpleMemoryManager
 from core.classification_service import ClassificationService
 from config.settings import load_config, AppConfig
+from core.executor import run_blocking
+from core.ingest_queue import create_ingest_queue
+from core.ollama_stream import stream_chat
+from core.session_store import create_session_store
+from core.context_packer import ContextPacker, count_tokens
 
 logger = logging.getLogger(__name__)
 
+# 응답 생성 옵션 (스트리밍/일반 공통)
+CHAT_OPTIONS = {
+    "temperature": 0.7,
+    "top_p": 0.9,
+    "num_predict": 512
+}
+FALLBACK_RESPONSE = "죄송합니다. 응답을 생성하는 중 문제가 발생했습니다."
+# 응답 생성 전후 단계가 실패했을 때의 응답
+ERROR_RESPONSE = "죄송합니다. 일시적인 오류가 발생했습니다. 다시 시도해주세요."
+
+SYSTEM_PROMPT = """당신은 사용자와 대화하는 친근한 AI 어시스턴트입니다.
+사용자에 대한 기억된 정보를 활용하여 개인화된 대화를 진행하세요.
+한국어로 자연스럽게 대화하고, 이전 대화 내용을 기억하며 일관성 있게 응답하세요."""
+
 
 class ChatService:
     """메모리 기반 대화 서비스"""
@@ -33,8 +52,15 @@ class ChatService:
         self.memory_manager = SimpleMemoryManager(config)
         self.classifier = ClassificationService(config)
 
-        # 대화 히스토리 (세션별)
-        self.sessions = {}
+        # 대화 히스토리 (세션별, LRU + 유휴 TTL + 메모리 상한, 선택적으로 SQLite에 기록)
+        self.sessions = create_session_store(self.config, "chat")
+
+        # 프롬프트 토큰 예산 (num_ctx를 넘지 않도록 메모리/히스토리를 예산만큼만 담음)
+        self.packer = ContextPacker.from_config(self.config, CHAT_OPTIONS["num_predict"])
+        self.chat_options = dict(CHAT_OPTIONS, num_ctx=self.packer.num_ctx)
+
+        # 메모리 추출은 응답 후 백그라운드 큐에서 처리 (꺼져 있으면 None)
+        self.ingest_queue = create_ingest_queue(self.config, "chat", self._ingest)
 
     async def chat(
         self,
@@ -56,94 +82,194 @@ class ChatService:
             Dict: 응답 및 관련 정보
         """
         try:
-            # 세션 초기화
-            if session_id and session_id not in self.sessions:
-                self.sessions[session_id] = []
-
-            # 1. 관련 메모리 검색
-            relevant_memories = []
-            if use_memory:
-                relevant_memories = await self.memory_manager.search_memories(
-                    query=message,
-                    user_id=user_id,
-                    limit=5,
-                    threshold=self.config.memory.similarity_threshold
-                )
-
-            # 2. 컨텍스트 구성
-            context = self._build_context(relevant_memories, user_id)
-
-            # 3. 대화 히스토리 가져오기
-            history = self.sessions.get(session_id, []) if session_id else []
+            turn = await self._prepare_turn(message, user_id, session_id, use_memory)
 
             # 4. LLM 호출
             response_text = await self._generate_response(
                 message=message,
-                context=context,
-                history=history
-            )
-
-            # 5. 대화에서 메모리 추출 (자동)
-            conversation_text = f"User: {message}\nAssistant: {response_text}"
-            extracted_memories = await self._extract_and_save_memories(
-                conversation_text,
-                user_id
+                context=turn["context"],
+                history=turn["history"]
             )
 
-            # 6. 세션 히스토리 업데이트
-            if session_id:
-                self.sessions[session_id].append({
-                    "role": "user",
-                    "content": message
-                })
-                self.sessions[session_id].append({
-                    "role": "assistant",
-                    "content": response_text
-                })
-
-                # 히스토리 제한 (최근 20개만 유지)
-                if len(self.sessions[session_id]) > 20:
-                    self.sessions[session_id] = self.sessions[session_id][-20:]
+            return await self._finish_turn(message, user_id, session_id, response_text, turn)
 
-            # 7. 응답 구성
-            response = {
-                "response": response_text,
-                "user_message": message,
-                "used_memories": [
-                    {
-                        "id": mem.get("id"),
-                        "text": mem.get("text", "")[:100] + "...",
-                        "score": mem.get("score", 0)
-                    }
-                    for mem in relevant_memories[:3]  # 상위 3개만 표시
-                ],
-                "extracted_memories": extracted_memories,
-                "session_id": session_id,
+        except Exception as e:
+            logger.error(f"대화 처리 실패: {e}")
+            return {
+                "response": ERROR_RESPONSE,
+                "error": str(e),
                 "timestamp": datetime.now().isoformat()
             }
 
-            logger.info(f"대화 처리 완료 - User: {user_id}, Session: {session_id}")
-            return response
+    async def chat_stream(
+        self,
+        message: str,
+        user_id: str,
+        session_id: Optional[str] = None,
+        use_memory: bool = True,
+        result: Optional[Dict[str, Any]] = None
+    ) -> AsyncIterator[str]:
+        """
+        메모리 기반 대화 처리 (스트리밍)
+
+        응답 토큰을 Ollama가 생성하는 대로 yield하고, 스트림이 끝난 뒤
+        메모리 추출과 세션 히스토리 업데이트를 처리
+
+        Args:
+            message: 사용자 메시지
+            user_id: 사용자 ID
+            session_id: 세션 ID
+            use_memory: 메모리 사용 여부
+            result: 주어지면 스트림이 끝난 뒤 chat()과 같은 응답 정보로 채움
+
+        Yields:
+            str: 응답 텍스트 조각
+        """
+        try:
+            turn = await self._prepare_turn(message, user_id, session_id, use_memory)
+            messages = self._build_messages(message, turn["context"], turn["history"])
+        except Exception as e:
+            # chat()과 같이 오류 응답으로 대체 (예외가 Streamlit까지 올라가지 않도록)
+            logger.error(f"대화 처리 실패: {e}")
+            yield ERROR_RESPONSE
+            if result is not None:
+                result.update({
+                    "response": ERROR_RESPONSE,
+                    "error": str(e),
+                    "timestamp": datetime.now().isoformat()
+                })
+            return
 
+        chunks: List[str] = []
+        try:
+            async for chunk in stream_chat(
+                self.config.ollama_host,
+                self.config.models.chat_model,
+                messages,
+                self.chat_options
+            ):
+                chunks.append(chunk)
+                yield chunk
         except Exception as e:
+            logger.error(f"응답 생성 실패: {e}")
+            if not chunks:
+                chunks.append(FALLBACK_RESPONSE)
+                yield FALLBACK_RESPONSE
+
+        response_text = "".join(chunks)
+        try:
+            response = await self._finish_turn(message, user_id, session_id, response_text, turn)
+        except Exception as e:
+            # 응답은 이미 전달되었으므로 그대로 두고 오류만 기록
             logger.error(f"대화 처리 실패: {e}")
-            return {
-                "response": "죄송합니다. 일시적인 오류가 발생했습니다. 다시 시도해주세요.",
+            response = {
+                "response": response_text,
                 "error": str(e),
                 "timestamp": datetime.now().isoformat()
             }
+        if result is not None:
+            result.update(response)
+
+    async def _prepare_turn(
+        self,
+        message: str,
+        user_id: str,
+        session_id: Optional[str],
+        use_memory: bool
+    ) -> Dict[str, Any]:
+        """응답 생성 전 단계 - 세션 초기화, 메모리 검색, 컨텍스트/히스토리 구성"""
+        # 1. 관련 메모리 검색
+        relevant_memories = []
+        if use_memory:
+            relevant_memories = await self.memory_manager.search_memories(
+                query=message,
+                user_id=user_id,
+                limit=5,
+                threshold=self.config.memory.similarity_threshold
+            )
+
+        # 2. 컨텍스트 구성 (메모리 예산 안에서 관련도 순으로)
+        context = self._build_context(
+            relevant_memories,
+            user_id,
+            budget=self.packer.memory_budget(SYSTEM_PROMPT, message)
+        )
+
+        # 3. 대화 히스토리 가져오기
+        history = self.sessions.get(session_id) if session_id else []
+
+        return {
+            "relevant_memories": relevant_memories,
+            "context": context,
+            "history": history
+        }
+
+    async def _finish_turn(
+        self,
+        message: str,
+        user_id: str,
+        session_id: Optional[str],
+        response_text: str,
+        turn: Dict[str, Any]
+    ) -> Dict[str, Any]:
+        """응답 생성 후 단계 - 메모리 추출, 세션 히스토리 업데이트, 응답 구성"""
+        # 5. 대화에서 메모리 추출 (자동, 큐가 있으면 응답 후 백그라운드에서)
+        conversation_text = f"User: {message}\nAssistant: {response_text}"
+        extracted_memories = []
+        ingest_job_id = None
+        if self.ingest_queue is not None:
+            ingest_job_id = self.ingest_queue.submit({
+                "conversation": conversation_text,
+                "user_id": user_id
+            })
+        else:
+            extracted_memories = await self._extract_and_save_memories(
+                conversation_text,
+                user_id
+            )
+
+        # 6. 세션 히스토리 업데이트 (최근 session_max_messages개만 유지)
+        if session_id:
+            self.sessions.append(
+                session_id,
+                {"role": "user", "content": message},
+                {"role": "assistant", "content": response_text}
+            )
+
+        # 7. 응답 구성
+        response = {
+            "response": response_text,
+            "user_message": message,
+            "used_memories": [
+                {
+                    "id": mem.get("id"),
+                    "text": mem.get("text", "")[:100] + "...",
+                    "score": mem.get("score", 0)
+                }
+                for mem in turn["relevant_memories"][:3]  # 상위 3개만 표시
+            ],
+            "extracted_memories": extracted_memories,
+            "ingest_job_id": ingest_job_id,
+            "session_id": session_id,
+            "timestamp": datetime.now().isoformat()
+        }
+
+        logger.info(f"대화 처리 완료 - User: {user_id}, Session: {session_id}")
+        return response
 
     def _build_context(
         self,
         memories: List[Dict[str, Any]],
-        user_id: str
+        user_id: str,
+        budget: Optional[int] = None
     ) -> str:
         """
         메모리를 기반으로 컨텍스트 구성
 
         Args:
-            memories: 관련 메모리 목록
+            memories: 관련 메모리 목록 (관련도 순)
             user_id: 사용자 ID
+            budget: 컨텍스트 토큰 예산 (None이면 프롬프트 예산 전체)
 
         Returns:
             str: 구성된 컨텍스트
@@ -151,9 +277,11 @@ class ChatService:
         if not memories:
             return ""
 
-        context_parts = ["다음은 사용자에 대한 기억된 정보입니다:"]
+        header = "다음은 사용자에 대한 기억된 정보입니다:"
+        footer = "\n이 정보를 참고하여 대화해주세요."
 
-        for i, memory in enumerate(memories[:5], 1):  # 상위 5개만 사용
+        lines = []
+        for memory in memories:
             text = memory.get("text", "")
             metadata = memory.get("metadata", {})
             timestamp = metadata.get("timestamp", "")
@@ -168,9 +296,19 @@ class ChatService:
             else:
                 time_str = "이전"
 
-            context_parts.append(f"{i}. [{time_str}] {text}")
+            lines.append(f"[{time_str}] {text}")
+
+        # 관련도 순으로 예산이 허락하는 만큼만 담음
+        if budget is None:
+            budget = self.packer.prompt_budget
+        budget -= count_tokens(header) + count_tokens(footer) + 2
+        lines = self.packer.pack(lines, budget)
+        if not lines:
+            return ""
 
-        context_parts.append("\n이 정보를 참고하여 대화해주세요.")
+        context_parts = [header]
+        context_parts.extend(f"{i}. {line}" for i, line in enumerate(lines, 1))
+        context_parts.append(footer)
         return "\n".join(context_parts)
 
     async def _generate_response(
@@ -191,48 +329,14 @@ class ChatService:
             str: 생성된 응답
         """
         try:
-            # 메시지 구성
-            messages = []
-
-            # 시스템 프롬프트
-            system_prompt = """당신은 사용자와 대화하는 친근한 AI 어시스턴트입니다.
-사용자에 대한 기억된 정보를 활용하여 개인화된 대화를 진행하세요.
-한국어로 자연스럽게 대화하고, 이전 대화 내용을 기억하며 일관성 있게 응답하세요."""
-
-            messages.append({
-                "role": "system",
-                "content": system_prompt
-            })
-
-            # 컨텍스트 추가
-            if context:
-                messages.append({
-                    "role": "system",
-                    "content": context
-                })
-
-            # 대화 히스토리 추가 (최근 10개)
-            for msg in history[-10:]:
-                messages.append({
-                    "role": msg["role"],
-                    "content": msg["content"]
-                })
-
-            # 현재 메시지 추가
-            messages.append({
-                "role": "user",
-                "content": message
-            })
+            messages = self._build_messages(message, context, history)
 
             # Ollama 호출
-            response = ollama.chat(
+            response = await run_blocking(
+                ollama.chat,
                 model=self.config.models.chat_model,
                 messages=messages,
-                options={
-                    "temperature": 0.7,
-                    "top_p": 0.9,
-                    "num_predict": 512
-                }
+                options=self.chat_options
             )
 
             return response['message']['content']
@@ -240,12 +344,59 @@ class ChatService:
         except Exception as e:
             logger.error(f"응답 생성 실패: {e}")
             # Fallback 응답
-            return "죄송합니다. 응답을 생성하는 중 문제가 발생했습니다."
+            return FALLBACK_RESPONSE
+
+    def _build_messages(
+        self,
+        message: str,
+        context: str,
+        history: List[Dict[str, str]]
+    ) -> List[Dict[str, str]]:
+        """시스템 프롬프트, 메모리 컨텍스트, 최근 히스토리로 채팅 메시지 구성"""
+        # 메시지 구성
+        messages = []
+
+        # 시스템 프롬프트
+        messages.append({
+            "role": "system",
+            "content": SYSTEM_PROMPT
+        })
+
+        # 컨텍스트 추가
+        if context:
+            messages.append({
+                "role": "system",
+                "content": context
+            })
+
+        # 대화 히스토리 추가 (남은 예산 안에서 최근 메시지부터)
+        budget = self.packer.available(SYSTEM_PROMPT, context, message)
+        for msg in self.packer.pack_history(history, budget):
+            messages.append({
+                "role": msg["role"],
+                "content": msg["content"]
+            })
+
+        # 현재 메시지 추가
+        messages.append({
+            "role": "user",
+            "content": message
+        })
+
+        return messages
+
+    async def _ingest(self, job: Dict[str, Any], job_id: str):
+        """수집 큐 작업 처리 (실패하면 예외를 던져 재시도 - 메모리 ID는 작업 ID에서 만들어 중복 없음)"""
+        await self._extract_and_save_memories(
+            job["conversation"], job["user_id"], raise_errors=True, job_id=job_id
+        )
 
     async def _extract_and_save_memories(
         self,
         conversation: str,
-        user_id: str
+        user_id: str,
+        raise_errors: bool = False,
+        job_id: Optional[str] = None
     ) -> List[str]:
         """
         대화에서 메모리 추출 및 저장
@@ -253,6 +404,8 @@ class ChatService:
         Args:
             conversation: 대화 내용
             user_id: 사용자 ID
+            raise_errors: 실패 시 예외를 다시 던질지 여부 (수집 큐 재시도용)
+            job_id: 수집 큐 작업 ID (메모리 ID를 여기서 만들어 재시도해도 중복 저장 없음)
 
         Returns:
             List[str]: 저장된 메모리 ID 목록
@@ -267,7 +420,8 @@ class ChatService:
 
 추출할 정보 (한 줄에 하나씩):"""
 
-            response = ollama.generate(
+            response = await run_blocking(
+                ollama.generate,
                 model=self.config.models.chat_model,
                 prompt=extraction_prompt,
                 options={
@@ -284,30 +438,32 @@ class ChatService:
                 if line.strip() and not line.startswith('#')
             ]
 
-            # 메모리 저장
-            memory_ids = []
+            # 분류 후 한 번에 저장 (임베딩/저장 요청 한 번)
+            items = []
             for memory_text in memories[:5]:  # 최대 5개만 저장
                 if len(memory_text) > 10:  # 너무 짧은 내용 제외
-                    # 분류
                     category = await self.classifier.classify_text(memory_text)
-
-                    # 저장
-                    memory_id = await self.memory_manager.add_memory(
-                        text=memory_text,
-                        user_id=user_id,
-                        metadata={
+                    items.append({
+                        "text": memory_text,
+                        "metadata": {
                             "source": "conversation",
                             "category": category,
                             "auto_extracted": True
                         }
-                    )
-                    memory_ids.append(memory_id)
+                    })
+
+            memory_ids = (
+                await self.memory_manager.add_memories(items, user_id, raise_errors=raise_errors, job_id=job_id)
+                if items else []
+            )
 
             logger.info(f"대화에서 {len(memory_ids)}개 메모리 추출")
             return memory_ids
 
         except Exception as e:
             logger.error(f"메모리 추출 실패: {e}")
+            if raise_errors:
+                raise
             return []
 
     def clear_session(self, session_id: str):
@@ -318,7 +474,7 @@ class ChatService:
             session_id: 세션 ID
         """
         if session_id in self.sessions:
-            del self.sessions[session_id]
+            self.sessions.delete(session_id)
             logger.info(f"세션 삭제: {session_id}")
 
     def get_session_history(
@@ -334,4 +490,4 @@ class ChatService:
         Returns:
             List[Dict]: 대화 히스토리
         """
-        return self.sessions.get(session_id, [])
\ No newline at end of file
+        return self.sessions.get(session_id)
\ No newline at end of file
@@ -2,8 +2,10 @@
 강화된 대화 서비스 - 메모리를 실제로 활용하는 채팅 시스템
 """
 
+import time
+import asyncio
 import logging
-from typing import Dict, List, Optional, Any
+from typing import Dict, List, Optional, Any, AsyncIterator, Awaitable, Tuple
 from datetime import datetime
 import ollama
 from pathlib import Path
@@ -14,9 +16,47 @@ sys.path.append(str(Path(__file__).parent.parent))
 from core.memory_manager_simple import SimpleMemoryManager
 from core.classification_service import ClassificationService
 from config.settings import load_config, AppConfig
+from core.executor import run_blocking
+from core.ingest_queue import create_ingest_queue
+from core.ollama_stream import stream_chat
+from core.session_store import create_session_store
+from core.context_packer import ContextPacker, count_tokens
 
 logger = logging.getLogger(__name__)
 
+# 응답 생성 옵션 (스트리밍/일반 공통)
+CHAT_OPTIONS = {
+    "temperature": 0.7,
+    "top_p": 0.9,
+    "num_predict": 512
+}
+FALLBACK_RESPONSE = "죄송합니다. 응답을 생성하는 중 문제가 발생했습니다."
+# 응답 생성 전후 단계가 실패했을 때의 응답
+ERROR_RESPONSE = "죄송합니다. 일시적인 오류가 발생했습니다."
+
+SYSTEM_PROMPT = """당신은 사용자를 기억하는 AI 어시스턴트입니다.
+제공된 사용자 정보와 과거 기억을 바탕으로 개인화된 대화를 진행하세요.
+
+중요 지침:
+1. 사용자에 대해 알고 있는 정보를 자연스럽게 대화에 활용하세요
+2. 이전에 나눈 대화나 정보를 기억하고 있음을 보여주세요
+3. 사용자의 선호도를 고려하여 답변하세요
+4. 모순된 정보가 있다면 최신 정보를 우선시하세요
+5. 한국어로 친근하게 대화하세요"""
+
+# 메모리 컨텍스트를 감싸는 안내 문구
+CONTEXT_TEMPLATE = """다음은 사용자에 대해 기억하고 있는 정보입니다:
+
+{memory_context}
+
+위 정보를 참고하여 대화하되, 너무 인위적으로 언급하지 마세요.
+자연스럽게 대화 흐름에 맞춰 활용하세요."""
+
+
+def _elapsed_ms(started: float) -> float:
+    """started(perf_counter) 이후 경과 시간 (ms)"""
+    return round((time.perf_counter() - started) * 1000, 1)
+
 
 class EnhancedChatService:
     """메모리를 실제로 활용하는 대화 서비스"""
@@ -26,7 +66,15 @@ class EnhancedChatService:
         self.config = config or load_config()
         self.memory_manager = SimpleMemoryManager(config)
         self.classifier = ClassificationService(config)
-        self.sessions = {}
+        # 세션별 대화 히스토리 (LRU + 유휴 TTL + 메모리 상한, 선택적으로 SQLite에 기록)
+        self.sessions = create_session_store(self.config, "chat_enhanced")
+
+        # 프롬프트 토큰 예산 (num_ctx를 넘지 않도록 메모리/히스토리를 예산만큼만 담음)
+        self.packer = ContextPacker.from_config(self.config, CHAT_OPTIONS["num_predict"])
+        self.chat_options = dict(CHAT_OPTIONS, num_ctx=self.packer.num_ctx)
+
+        # 정보 추출/저장은 응답 후 백그라운드 큐에서 처리 (꺼져 있으면 None)
+        self.ingest_queue = create_ingest_queue(self.config, "chat_enhanced", self._ingest)
 
     async def chat(
         self,
@@ -37,109 +85,289 @@ class EnhancedChatService:
     ) -> Dict[str, Any]:
         """메모리 기반 대화 처리"""
         try:
-            # 세션 초기화
-            if session_id and session_id not in self.sessions:
-                self.sessions[session_id] = []
-
-            # 1. 관련 메모리 검색
-            relevant_memories = []
-            memory_context = ""
-
-            if use_memory:
-                logger.info(f"메모리 검색 중: {message}")
-                relevant_memories = await self.memory_manager.search_memories(
-                    query=message,
-                    user_id=user_id,
-                    limit=5
-                )
-
-                # 모든 메모리도 가져오기 (최근 10개)
-                all_memories = await self.memory_manager.get_all_memories(
-                    user_id=user_id,
-                    limit=10
-                )
-
-                # 메모리 컨텍스트 구성
-                memory_context = self._build_memory_context(
-                    relevant_memories,
-                    all_memories,
-                    user_id
-                )
-
-                logger.info(f"메모리 컨텍스트: {memory_context[:200]}...")
+            turn = await self._prepare_turn(message, user_id, session_id, use_memory)
 
             # 2. LLM에 메모리 컨텍스트와 함께 전달
+            stage_started = time.perf_counter()
             response_text = await self._generate_response_with_memory(
                 message=message,
-                memory_context=memory_context,
-                session_history=self.sessions.get(session_id, [])
+                memory_context=turn["memory_context"],
+                session_history=turn["session_history"]
             )
+            turn["latency"]["generation_ms"] = _elapsed_ms(stage_started)
 
-            # 3. 대화에서 중요 정보 추출 및 저장
-            await self._extract_and_save_info(
-                user_message=message,
-                ai_response=response_text,
-                user_id=user_id
-            )
-
-            # 4. 세션 히스토리 업데이트
-            if session_id:
-                self.sessions[session_id].append({
-                    "role": "user",
-                    "content": message
-                })
-                self.sessions[session_id].append({
-                    "role": "assistant",
-                    "content": response_text
-                })
-                # 최근 20개만 유지
-                if len(self.sessions[session_id]) > 20:
-                    self.sessions[session_id] = self.sessions[session_id][-20:]
+            return await self._finish_turn(message, user_id, session_id, response_text, turn)
 
-            # 5. 응답 구성
-            response = {
-                "response": response_text,
-                "user_message": message,
-                "used_memories": [
-                    {
-                        "id": mem.get("id"),
-                        "text": mem.get("text", ""),
-                        "score": mem.get("score", 0)
-                    }
-                    for mem in relevant_memories[:3]
-                ],
-                "memory_context": memory_context[:500] if memory_context else "",
-                "session_id": session_id,
+        except Exception as e:
+            logger.exception(f"대화 처리 실패: {e}")
+            return {
+                "response": ERROR_RESPONSE,
+                "error": str(e),
                 "timestamp": datetime.now().isoformat()
             }
 
-            return response
+    async def chat_stream(
+        self,
+        message: str,
+        user_id: str,
+        session_id: Optional[str] = None,
+        use_memory: bool = True,
+        result: Optional[Dict[str, Any]] = None
+    ) -> AsyncIterator[str]:
+        """
+        메모리 기반 대화 처리 (스트리밍)
+
+        응답 토큰을 Ollama가 생성하는 대로 yield하고, 스트림이 끝난 뒤
+        세션 업데이트와 정보 추출/저장을 처리
+
+        Args:
+            result: 주어지면 스트림이 끝난 뒤 chat()과 같은 응답 정보로 채움
+        """
+        try:
+            turn = await self._prepare_turn(message, user_id, session_id, use_memory)
+            messages = self._build_messages(message, turn["memory_context"], turn["session_history"])
+        except Exception as e:
+            # chat()과 같이 오류 응답으로 대체 (예외가 Streamlit까지 올라가지 않도록)
+            logger.error(f"대화 처리 실패: {e}")
+            yield ERROR_RESPONSE
+            if result is not None:
+                result.update({
+                    "response": ERROR_RESPONSE,
+                    "error": str(e),
+                    "timestamp": datetime.now().isoformat()
+                })
+            return
 
+        stage_started = time.perf_counter()
+        chunks: List[str] = []
+        try:
+            logger.info(f"Ollama 스트리밍 호출 - 모델: {self.config.models.chat_model}")
+            async for chunk in stream_chat(
+                self.config.ollama_host,
+                self.config.models.chat_model,
+                messages,
+                self.chat_options
+            ):
+                if not chunks:
+                    turn["latency"]["first_token_ms"] = _elapsed_ms(stage_started)
+                chunks.append(chunk)
+                yield chunk
         except Exception as e:
+            logger.error(f"응답 생성 실패: {e}")
+            if not chunks:
+                chunks.append(FALLBACK_RESPONSE)
+                yield FALLBACK_RESPONSE
+        turn["latency"]["generation_ms"] = _elapsed_ms(stage_started)
+
+        response_text = "".join(chunks)
+        try:
+            response = await self._finish_turn(message, user_id, session_id, response_text, turn)
+        except Exception as e:
+            # 응답은 이미 전달되었으므로 그대로 두고 오류만 기록
             logger.error(f"대화 처리 실패: {e}")
-            import traceback
-            traceback.print_exc()
-            return {
-                "response": "죄송합니다. 일시적인 오류가 발생했습니다.",
+            response = {
+                "response": response_text,
                 "error": str(e),
                 "timestamp": datetime.now().isoformat()
             }
+        if result is not None:
+            result.update(response)
+
+    async def _prepare_turn(
+        self,
+        message: str,
+        user_id: str,
+        session_id: Optional[str],
+        use_memory: bool
+    ) -> Dict[str, Any]:
+        """응답 생성 전 단계 - 세션 초기화, 조회, 메모리 컨텍스트 구성"""
+        started = time.perf_counter()
+
+        # 1. 조회 단계 - 관련 메모리 검색, 최근 메모리, 세션 히스토리를 동시에 조회
+        relevant_memories, all_memories, session_history, latency = await self._retrieve(
+            message, user_id, session_id, use_memory
+        )
+        memory_context = ""
+
+        if use_memory:
+            # 메모리 컨텍스트 구성
+            memory_context = self._build_memory_context(
+                relevant_memories,
+                all_memories,
+                user_id,
+                budget=self.packer.memory_budget(
+                    SYSTEM_PROMPT, CONTEXT_TEMPLATE.format(memory_context=""), message
+                )
+            )
+
+            logger.info(f"메모리 컨텍스트: {memory_context[:200]}...")
+
+        return {
+            "started": started,
+            "relevant_memories": relevant_memories,
+            "memory_context": memory_context,
+            "session_history": session_history,
+            "latency": latency
+        }
+
+    async def _finish_turn(
+        self,
+        message: str,
+        user_id: str,
+        session_id: Optional[str],
+        response_text: str,
+        turn: Dict[str, Any]
+    ) -> Dict[str, Any]:
+        """응답 생성 후 단계 - 정보 추출/저장, 세션 업데이트, 응답 구성"""
+        latency = turn["latency"]
+        memory_context = turn["memory_context"]
+
+        # 3. 대화에서 중요 정보 추출 및 저장 (큐가 있으면 제출만 하고 응답 후 처리)
+        stage_started = time.perf_counter()
+        ingest_job_id = None
+        if self.ingest_queue is not None:
+            ingest_job_id = self.ingest_queue.submit({
+                "user_message": message,
+                "ai_response": response_text,
+                "user_id": user_id
+            })
+        else:
+            await self._extract_and_save_info(
+                user_message=message,
+                ai_response=response_text,
+                user_id=user_id
+            )
+        latency["extraction_ms"] = _elapsed_ms(stage_started)
+
+        # 4. 세션 히스토리 업데이트 (최근 session_max_messages개만 유지)
+        if session_id:
+            self.sessions.append(
+                session_id,
+                {"role": "user", "content": message},
+                {"role": "assistant", "content": response_text}
+            )
+
+        # 5. 응답 구성
+        return {
+            "response": response_text,
+            "user_message": message,
+            "used_memories": [
+                {
+                    "id": mem.get("id"),
+                    "text": mem.get("text", ""),
+                    "score": mem.get("score", 0)
+                }
+                for mem in turn["relevant_memories"][:3]
+            ],
+            "memory_context": memory_context[:500] if memory_context else "",
+            "session_id": session_id,
+            "ingest_job_id": ingest_job_id,
+            "latency": dict(latency, total_ms=_elapsed_ms(turn["started"])),
+            "timestamp": datetime.now().isoformat()
+        }
+
+    async def _retrieve(
+        self,
+        message: str,
+        user_id: str,
+        session_id: Optional[str],
+        use_memory: bool
+    ) -> Tuple[List[Dict], List[Dict], List[Dict], Dict[str, Any]]:
+        """
+        조회 단계 - 서로 독립적인 조회를 동시에 실행 (비용은 합이 아니라 가장 느린 조회)
+
+        단계마다 타임아웃이 있어 느린 조회는 빈 결과로 대체하고 응답 생성을 계속함
+
+        Returns:
+            (관련 메모리, 최근 메모리, 세션 히스토리, 단계별 지연 시간)
+        """
+        memory_config = self.config.memory
+        stages = [
+            ("history", self._get_session_history(session_id), memory_config.retrieval_history_timeout)
+        ]
+        if use_memory:
+            logger.info(f"메모리 검색 중: {message}")
+            stages += [
+                (
+                    "search",
+                    self.memory_manager.search_memories(query=message, user_id=user_id, limit=5),
+                    memory_config.retrieval_search_timeout
+                ),
+                (
+                    # 최근 메모리 10개, 최신순 (사용자 정보/선호도 추출용)
+                    "profile",
+                    self.memory_manager.get_all_memories(user_id=user_id, limit=10, order="desc"),
+                    memory_config.retrieval_profile_timeout
+                )
+            ]
+
+        started = time.perf_counter()
+        results = await asyncio.gather(*(
+            self._run_stage(name, coroutine, timeout) for name, coroutine, timeout in stages
+        ))
+
+        latency: Dict[str, Any] = {"timed_out": []}
+        values: Dict[str, List[Dict]] = {}
+        for name, value, elapsed, timed_out in results:
+            values[name] = value
+            latency[f"{name}_ms"] = elapsed
+            if timed_out:
+                latency["timed_out"].append(name)
+        latency["retrieval_ms"] = _elapsed_ms(started)
+
+        return (
+            values.get("search", []),
+            values.get("profile", []),
+            values.get("history", []),
+            latency
+        )
+
+    async def _run_stage(
+        self,
+        name: str,
+        coroutine: Awaitable[List[Dict]],
+        timeout: float
+    ) -> Tuple[str, List[Dict], float, bool]:
+        """
+        조회 하나 실행 (타임아웃/실패 시 빈 결과)
+
+        타임아웃되어도 이미 실행 중인 블로킹 호출은 끝날 때까지 실행기 자리를 차지하므로
+        (run_blocking) 느린 백엔드 호출이 max_pending을 넘어 쌓이지 않음
+        """
+        started = time.perf_counter()
+        try:
+            value = await asyncio.wait_for(coroutine, timeout)
+            return name, value or [], _elapsed_ms(started), False
+        except asyncio.TimeoutError:
+            logger.warning(f"⏱️ 조회 단계 타임아웃: {name} ({timeout}초)")
+            return name, [], _elapsed_ms(started), True
+        except Exception as e:
+            logger.error(f"조회 단계 실패 ({name}): {e}")
+            return name, [], _elapsed_ms(started), False
+
+    async def _get_session_history(self, session_id: Optional[str]) -> List[Dict]:
+        """세션 히스토리 조회 (복사본, RAM에 없으면 디스크에서 읽음)"""
+        return await run_blocking(self.sessions.get, session_id) if session_id else []
 
     def _build_memory_context(
         self,
         relevant_memories: List[Dict],
         all_memories: List[Dict],
-        user_id: str
+        user_id: str,
+        budget: Optional[int] = None
     ) -> str:
-        """메모리를 기반으로 풍부한 컨텍스트 구성"""
-        context_parts = []
+        """
+        메모리를 기반으로 풍부한 컨텍스트 구성
 
+        항목 수를 고정하지 않고 토큰 예산 안에서 우선순위대로 채움
+        (관련 메모리 → 사용자 정보 → 선호도 → 경험, 최근 메모리 우선)
+        """
         # 사용자 기본 정보 추출
         user_info = {}
         preferences = []
         experiences = []
 
-        # 모든 메모리에서 정보 추출
+        # 모든 메모리에서 정보 추출 (최신순으로 받아 옴 - 모순되면 최신 정보 우선)
         for memory in all_memories:
             text = memory.get("text", "").lower()
             metadata = memory.get("metadata", {})
@@ -147,11 +375,11 @@ class EnhancedChatService:
 
             # 개인정보 추출
             if "이름" in text or "name" in text:
-                user_info["name"] = memory.get("text", "")
+                user_info.setdefault("name", memory.get("text", ""))
             elif "나이" in text or "age" in text or "살" in text:
-                user_info["age"] = memory.get("text", "")
+                user_info.setdefault("age", memory.get("text", ""))
             elif "직업" in text or "job" in text or "일" in text:
-                user_info["job"] = memory.get("text", "")
+                user_info.setdefault("job", memory.get("text", ""))
 
             # 선호도 추출
             if "좋아" in text or "싫어" in text or "prefer" in text:
@@ -161,27 +389,30 @@ class EnhancedChatService:
             if category == "experiences" or "경험" in text or "했" in text:
                 experiences.append(memory.get("text", ""))
 
-        # 컨텍스트 구성
-        if user_info:
-            context_parts.append("=== 사용자 정보 ===")
-            for key, value in user_info.items():
-                context_parts.append(f"- {value}")
-
-        if preferences:
-            context_parts.append("\n=== 선호도 ===")
-            for pref in preferences[:3]:  # 최대 3개
-                context_parts.append(f"- {pref}")
-
-        if experiences:
-            context_parts.append("\n=== 과거 경험 ===")
-            for exp in experiences[:2]:  # 최대 2개
-                context_parts.append(f"- {exp}")
-
-        # 관련 메모리 추가
-        if relevant_memories:
-            context_parts.append("\n=== 현재 대화와 관련된 정보 ===")
-            for memory in relevant_memories[:3]:
-                context_parts.append(f"- {memory.get('text', '')}")
+        sections = [
+            ("=== 사용자 정보 ===", list(user_info.values())),
+            ("\n=== 선호도 ===", preferences),
+            ("\n=== 과거 경험 ===", experiences),
+            ("\n=== 현재 대화와 관련된 정보 ===", [m.get("text", "") for m in relevant_memories])
+        ]
+
+        # 우선순위 순서로 예산 안에 담기 (섹션 제목 몫은 미리 뺌, 중복은 한 번만)
+        if budget is None:
+            budget = self.packer.prompt_budget
+        budget -= sum(count_tokens(title) + 1 for title, _ in sections)
+        priority = sections[3][1] + sections[0][1] + sections[1][1] + sections[2][1]
+        packed = set(self.packer.pack(priority, budget))
+
+        # 컨텍스트 구성 (표시 순서는 기존과 같음)
+        context_parts = []
+        used = set()
+        for title, items in sections:
+            lines = [item for item in items if item in packed and item not in used]
+            if not lines:
+                continue
+            used.update(lines)
+            context_parts.append(title)
+            context_parts.extend(f"- {line}" for line in lines)
 
         if not context_parts:
             return ""
@@ -197,76 +428,87 @@ class EnhancedChatService:
     ) -> str:
         """메모리 컨텍스트를 포함하여 응답 생성"""
         try:
-            messages = []
+            messages = self._build_messages(message, memory_context, session_history)
 
-            # 시스템 프롬프트 - 메모리 활용 강조
-            system_prompt = """당신은 사용자를 기억하는 AI 어시스턴트입니다.
-제공된 사용자 정보와 과거 기억을 바탕으로 개인화된 대화를 진행하세요.
-
-중요 지침:
-1. 사용자에 대해 알고 있는 정보를 자연스럽게 대화에 활용하세요
-2. 이전에 나눈 대화나 정보를 기억하고 있음을 보여주세요
-3. 사용자의 선호도를 고려하여 답변하세요
-4. 모순된 정보가 있다면 최신 정보를 우선시하세요
-5. 한국어로 친근하게 대화하세요"""
+            # Ollama 호출
+            logger.info(f"Ollama 호출 - 모델: {self.config.models.chat_model}")
+            response = await run_blocking(
+                ollama.chat,
+                model=self.config.models.chat_model,
+                messages=messages,
+                options=self.chat_options
+            )
 
-            messages.append({
-                "role": "system",
-                "content": system_prompt
-            })
+            return response['message']['content']
 
-            # 메모리 컨텍스트가 있으면 추가
-            if memory_context:
-                context_message = f"""다음은 사용자에 대해 기억하고 있는 정보입니다:
+        except Exception as e:
+            logger.error(f"응답 생성 실패: {e}")
+            return FALLBACK_RESPONSE
 
-{memory_context}
+    def _build_messages(
+        self,
+        message: str,
+        memory_context: str,
+        session_history: List[Dict]
+    ) -> List[Dict[str, str]]:
+        """시스템 프롬프트, 메모리 컨텍스트, 최근 히스토리로 채팅 메시지 구성"""
+        messages = []
 
-위 정보를 참고하여 대화하되, 너무 인위적으로 언급하지 마세요.
-자연스럽게 대화 흐름에 맞춰 활용하세요."""
+        # 시스템 프롬프트 - 메모리 활용 강조
+        messages.append({
+            "role": "system",
+            "content": SYSTEM_PROMPT
+        })
 
-                messages.append({
-                    "role": "system",
-                    "content": context_message
-                })
+        # 메모리 컨텍스트가 있으면 추가
+        context_message = ""
+        if memory_context:
+            context_message = CONTEXT_TEMPLATE.format(memory_context=memory_context)
 
-            # 최근 대화 히스토리 추가 (최대 6개)
-            for msg in session_history[-6:]:
-                messages.append({
-                    "role": msg["role"],
-                    "content": msg["content"]
-                })
+            messages.append({
+                "role": "system",
+                "content": context_message
+            })
 
-            # 현재 메시지 추가
+        # 최근 대화 히스토리 추가 (남은 예산 안에서 최근 메시지부터)
+        budget = self.packer.available(SYSTEM_PROMPT, context_message, message)
+        for msg in self.packer.pack_history(session_history, budget):
             messages.append({
-                "role": "user",
-                "content": message
+                "role": msg["role"],
+                "content": msg["content"]
             })
 
-            # Ollama 호출
-            logger.info(f"Ollama 호출 - 모델: {self.config.models.chat_model}")
-            response = ollama.chat(
-                model=self.config.models.chat_model,
-                messages=messages,
-                options={
-                    "temperature": 0.7,
-                    "top_p": 0.9,
-                    "num_predict": 512
-                }
-            )
+        # 현재 메시지 추가
+        messages.append({
+            "role": "user",
+            "content": message
+        })
 
-            return response['message']['content']
+        return messages
 
-        except Exception as e:
-            logger.error(f"응답 생성 실패: {e}")
-            return "죄송합니다. 응답을 생성하는 중 문제가 발생했습니다."
+    async def _ingest(self, job: Dict[str, Any], job_id: str):
+        """수집 큐 작업 처리 (실패하면 예외를 던져 재시도 - 메모리 ID는 작업 ID에서 만들어 중복 없음)"""
+        await self._extract_and_save_info(
+            user_message=job["user_message"],
+            ai_response=job["ai_response"],
+            user_id=job["user_id"],
+            raise_errors=True,
+            job_id=job_id
+        )
 
     async def _extract_and_save_info(
         self,
         user_message: str,
         ai_response: str,
-        user_id: str
+        user_id: str,
+        raise_errors: bool = False,
+        job_id: Optional[str] = None
     ):
-        """대화에서 중요 정보 추출 및 저장"""
+        """
+        대화에서 중요 정보 추출 및 저장 (raise_errors면 실패 시 예외를 다시 던짐)
+
+        job_id(수집 큐 작업 ID)가 있으면 메모리 ID를 여기서 만들어 재시도해도 중복 저장 없음
+        """
         try:
             logger.debug(f"정보 추출 시작 - 사용자: {user_id}")
             logger.debug(f"메시지: {user_message[:100]}...")
@@ -320,27 +562,29 @@ class EnhancedChatService:
                         "source": "conversation",
                         "category": category,
                         "auto_extracted": True
-                    }
+                    },
+                    raise_errors=raise_errors,
+                    job_id=job_id
                 )
                 logger.info(f"✅ 메모리 자동 저장 완료: ID={memory_id}, 내용={user_message[:50]}...")
 
                 # 저장 확인
-                all_memories = await self.memory_manager.get_all_memories(user_id)
-                logger.info(f"현재 총 메모리 수: {len(all_memories)}개")
+                stats = self.memory_manager.get_statistics(user_id)
+                logger.info(f"현재 총 메모리 수: {stats['total_memories']}개")
             else:
                 logger.debug(f"저장할 정보 없음: {user_message[:50]}...")
 
         except Exception as e:
-            logger.error(f"❌ 정보 추출 실패: {e}")
-            import traceback
-            traceback.print_exc()
+            logger.exception(f"❌ 정보 추출 실패: {e}")
+            if raise_errors:
+                raise
 
     def clear_session(self, session_id: str):
         """세션 초기화"""
         if session_id in self.sessions:
-            del self.sessions[session_id]
+            self.sessions.delete(session_id)
             logger.info(f"세션 삭제: {session_id}")
 
     def get_session_history(self, session_id: str) -> List[Dict[str, str]]:
         """세션 히스토리 반환"""
-        return self.sessions.get(session_id, [])
\ No newline at end of file
+        return self.sessions.get(session_id)
\ No newline at end of file
@@ -12,6 +12,7 @@ import sys
 sys.path.append(str(Path(__file__).parent.parent))
 
 from config.settings import load_config, AppConfig
+from core.executor import run_blocking
 
 logger = logging.getLogger(__name__)
 
@@ -174,7 +175,8 @@ class ClassificationService:
 
 카테고리:"""
 
-            response = ollama.generate(
+            response = await run_blocking(
+                ollama.generate,
                 model=self.config.models.classification_model or self.config.models.chat_model,
                 prompt=prompt,
                 options={
@@ -222,7 +224,8 @@ class ClassificationService:
 
 JSON:"""
 
-            response = ollama.generate(
+            response = await run_blocking(
+                ollama.generate,
                 model=self.config.models.chat_model,
                 prompt=prompt,
                 options={
@@ -283,7 +286,8 @@ sentiment: [positive/negative/neutral]
 intensity: [1-5]
 emotion: [주요감정]"""
 
-            response = ollama.generate(
+            response = await run_blocking(
+                ollama.generate,
                 model=self.config.models.chat_model,
                 prompt=prompt,
                 options={
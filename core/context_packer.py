@@ -0,0 +1,145 @@
+"""
+프롬프트 토큰 예산 관리
+시스템 프롬프트/메모리/히스토리에 토큰 예산을 나누고, 우선순위(관련도/최신순)대로
+예산이 허락하는 만큼만 담아 num_ctx를 넘지 않고 프롬프트 처리 시간을 일정하게 유지
+"""
+
+import logging
+from functools import lru_cache
+from typing import Dict, List, Optional, Any, Iterable
+
+logger = logging.getLogger(__name__)
+
+# 메시지 하나에 붙는 역할/구분 토큰 (채팅 템플릿 오버헤드 근사치)
+MESSAGE_OVERHEAD = 4
+# 채팅 템플릿/생성 시작 토큰 등 여유분
+RESERVED_TOKENS = 64
+
+_encoding: Any = None
+_encoding_loaded = False
+
+
+def _get_encoding() -> Optional[Any]:
+    """tiktoken 인코딩 (설치되지 않았거나 로드할 수 없으면 None - 근사치 사용)"""
+    global _encoding, _encoding_loaded
+    if not _encoding_loaded:
+        _encoding_loaded = True
+        try:
+            import tiktoken
+            _encoding = tiktoken.get_encoding("cl100k_base")
+        except Exception as e:
+            logger.debug(f"tiktoken 사용 불가, 근사치로 토큰 계산: {e}")
+            _encoding = None
+    return _encoding
+
+
+@lru_cache(maxsize=4096)
+def count_tokens(text: str) -> int:
+    """
+    텍스트 토큰 수
+
+    tiktoken이 있으면 cl100k_base로 계산하고, 없으면 근사치 사용
+    (ASCII 약 4자당 1토큰, 한글 등 그 외 문자는 1자당 1토큰)
+    """
+    if not text:
+        return 0
+    encoding = _get_encoding()
+    if encoding is not None:
+        return len(encoding.encode(text, disallowed_special=()))
+    ascii_chars = sum(1 for ch in text if ord(ch) < 128)
+    return (ascii_chars + 3) // 4 + (len(text) - ascii_chars)
+
+
+class ContextPacker:
+    """
+    프롬프트 예산 계산 및 항목 채우기
+
+    - 프롬프트 예산 = num_ctx - num_predict - 여유분 (max_prompt_tokens가 있으면 그 이하)
+    - 고정 부분(시스템 프롬프트, 현재 메시지)을 뺀 나머지 중 memory_ratio를 메모리 컨텍스트에,
+      실제로 쓰고 남은 만큼을 대화 히스토리에 배정
+    """
+
+    def __init__(
+        self,
+        num_ctx: int = 8192,
+        num_predict: int = 512,
+        max_prompt_tokens: int = 0,
+        memory_ratio: float = 0.6
+    ):
+        """
+        Args:
+            num_ctx: 모델 컨텍스트 길이 (Ollama num_ctx)
+            num_predict: 응답 생성에 남겨 둘 토큰 수
+            max_prompt_tokens: 프롬프트 상한 (0이면 num_ctx가 허락하는 만큼)
+            memory_ratio: 고정 부분을 뺀 예산 중 메모리 컨텍스트 비율
+        """
+        self.num_ctx = num_ctx
+        self.num_predict = num_predict
+        self.memory_ratio = memory_ratio
+
+        budget = max(num_ctx - num_predict - RESERVED_TOKENS, 0)
+        if max_prompt_tokens:
+            budget = min(budget, max_prompt_tokens)
+        self.prompt_budget = budget
+
+    def available(self, *texts: str) -> int:
+        """고정 메시지들을 넣고 남는 토큰 수"""
+        used = sum(count_tokens(text) + MESSAGE_OVERHEAD for text in texts if text)
+        return max(self.prompt_budget - used, 0)
+
+    def memory_budget(self, *texts: str) -> int:
+        """메모리 컨텍스트 예산 (고정 메시지를 뺀 나머지의 memory_ratio)"""
+        return int(self.available(*texts) * self.memory_ratio)
+
+    def pack(self, texts: Iterable[str], budget: int) -> List[str]:
+        """
+        우선순위 순서대로 예산 안에 들어가는 텍스트 선택 (한 줄에 하나, 줄바꿈 1토큰)
+
+        들어가지 않는 항목은 건너뛰고 다음(더 짧을 수 있는) 항목을 계속 시도
+        """
+        packed = []
+        seen = set()
+        for text in texts:
+            if not text or text in seen:
+                continue
+            cost = count_tokens(text) + 1
+            if cost > budget:
+                continue
+            packed.append(text)
+            seen.add(text)
+            budget -= cost
+        return packed
+
+    def pack_history(self, messages: List[Dict[str, str]], budget: int) -> List[Dict[str, str]]:
+        """
+        최근 메시지부터 예산 안에 들어가는 만큼 선택 (시간 순서 유지)
+
+        대화 흐름이 끊기지 않도록 들어가지 않는 메시지를 만나면 거기서 멈춤
+        """
+        packed = []
+        for message in reversed(messages):
+            cost = count_tokens(message.get("content", "")) + MESSAGE_OVERHEAD
+            if cost > budget:
+                break
+            packed.append(message)
+            budget -= cost
+        packed.reverse()
+        return packed
+
+    @classmethod
+    def from_config(cls, config: Any, num_predict: int) -> "ContextPacker":
+        """
+        설정으로 생성 (models.model_params["chat"]의 num_ctx, memory.prompt_* 설정)
+
+        Args:
+            config: AppConfig
+            num_predict: 실제로 요청하는 응답 토큰 수
+        """
+        params = dict(config.models.model_params.get("default", {}))
+        params.update(config.models.model_params.get("chat", {}))
+        return cls(
+            num_ctx=params.get("num_ctx", 8192),
+            num_predict=num_predict,
+            max_prompt_tokens=config.memory.prompt_max_tokens,
+            memory_ratio=config.memory.prompt_memory_ratio
+        )
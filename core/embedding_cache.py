@@ -0,0 +1,217 @@
+"""
+임베딩 캐시 - (임베딩 모델, 텍스트 해시) 키로 벡터 재사용
+1단계: 프로세스 내 LRU, 2단계(선택): data_dir 아래 SQLite 파일
+모든 서비스가 같은 캐시를 공유하도록 get_embedding_cache()로 가져와 사용
+"""
+
+import hashlib
+import sqlite3
+import logging
+import threading
+from collections import OrderedDict
+from typing import Dict, List, Optional, Any
+from pathlib import Path
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+
+def cache_key(model: str, text: str) -> str:
+    """캐시 키: sha256(모델 + 텍스트)"""
+    return hashlib.sha256(f"{model}\0{text}".encode("utf-8")).hexdigest()
+
+
+class EmbeddingCache:
+    """2단계 임베딩 캐시 (LRU + 선택적 SQLite)"""
+
+    def __init__(self, max_entries: int = 10000, disk_path: Optional[Path] = None):
+        """
+        캐시 초기화
+
+        Args:
+            max_entries: 프로세스 내 LRU 최대 항목 수
+            disk_path: 디스크 캐시 SQLite 파일 경로 (None이면 메모리만 사용)
+        """
+        self.max_entries = max_entries
+        self._lru: "OrderedDict[str, List[float]]" = OrderedDict()
+        self._lock = threading.RLock()
+        self._conn = None
+
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+
+        if disk_path is not None:
+            try:
+                disk_path = Path(disk_path)
+                disk_path.parent.mkdir(parents=True, exist_ok=True)
+                self._conn = sqlite3.connect(str(disk_path), check_same_thread=False)
+                self._conn.execute("PRAGMA journal_mode=WAL")
+                self._conn.execute("PRAGMA synchronous=NORMAL")
+                self._conn.execute(
+                    "CREATE TABLE IF NOT EXISTS embeddings ("
+                    "key TEXT PRIMARY KEY, model TEXT NOT NULL, vector BLOB NOT NULL)"
+                )
+                self._conn.commit()
+            except Exception as e:
+                logger.warning(f"디스크 임베딩 캐시 사용 불가, 메모리 캐시만 사용: {e}")
+                self._conn = None
+
+    def _remember(self, key: str, vector: List[float]):
+        """LRU에 저장 (호출자가 잠금 보유)"""
+        self._lru[key] = vector
+        self._lru.move_to_end(key)
+        while len(self._lru) > self.max_entries:
+            self._lru.popitem(last=False)
+
+    def get(self, model: str, text: str) -> Optional[List[float]]:
+        """캐시된 임베딩 조회 (없으면 None)"""
+        key = cache_key(model, text)
+        with self._lock:
+            vector = self._lru.get(key)
+            if vector is not None:
+                self._lru.move_to_end(key)
+                self.hits += 1
+                return vector
+
+            if self._conn is not None:
+                row = self._conn.execute(
+                    "SELECT vector FROM embeddings WHERE key = ?", (key,)
+                ).fetchone()
+                if row is not None:
+                    vector = np.frombuffer(row[0], dtype=np.float32).tolist()
+                    self._remember(key, vector)
+                    self.disk_hits += 1
+                    return vector
+
+            self.misses += 1
+            return None
+
+    def put(self, model: str, text: str, vector: List[float]):
+        """임베딩 저장"""
+        self.put_many(model, {text: vector})
+
+    def put_many(self, model: str, vectors: Dict[str, List[float]]):
+        """여러 임베딩을 한 번에 저장 (디스크는 단일 트랜잭션)"""
+        if not vectors:
+            return
+        with self._lock:
+            rows = []
+            for text, vector in vectors.items():
+                key = cache_key(model, text)
+                vector = list(vector)
+                self._remember(key, vector)
+                rows.append((key, model, np.asarray(vector, dtype=np.float32).tobytes()))
+
+            if self._conn is not None:
+                try:
+                    self._conn.executemany(
+                        "INSERT OR REPLACE INTO embeddings (key, model, vector) VALUES (?, ?, ?)",
+                        rows
+                    )
+                    self._conn.commit()
+                except Exception as e:
+                    logger.warning(f"디스크 임베딩 캐시 저장 실패: {e}")
+
+    def stats(self) -> Dict[str, Any]:
+        """캐시 적중 통계"""
+        with self._lock:
+            total = self.hits + self.disk_hits + self.misses
+            return {
+                "entries": len(self._lru),
+                "hits": self.hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "hit_rate": (self.hits + self.disk_hits) / total if total else 0.0
+            }
+
+
+def ollama_embed_batch(client: Any, model: str, texts: List[str], batch_size: int = 64) -> List[List[float]]:
+    """
+    Ollama 다중 입력 임베딩 (/api/embed) - batch_size개씩 한 번의 요청으로 처리
+
+    Args:
+        client: ollama.Client
+        model: 임베딩 모델 이름
+        texts: 임베딩할 텍스트 목록
+        batch_size: 요청 하나에 담을 텍스트 수
+    """
+    vectors: List[List[float]] = []
+    for start in range(0, len(texts), batch_size):
+        response = client.embed(model=model, input=texts[start:start + batch_size])
+        vectors.extend(list(vector) for vector in response["embeddings"])
+    return vectors
+
+
+class CachedEmbedder:
+    """
+    mem0 임베더 래퍼 - embed()/embed_batch() 결과를 공유 캐시에 보관
+
+    Memory.embedding_model을 이 객체로 바꾸면 mem0 내부의 add/search도 캐시를 거침
+    """
+
+    def __init__(self, embedder: Any, cache: EmbeddingCache, model: str):
+        self.embedder = embedder
+        self.cache = cache
+        self.model = model
+
+    def embed(self, text, memory_action: Optional[str] = None):
+        """단일 텍스트 임베딩 (캐시 우선)"""
+        vector = self.cache.get(self.model, text)
+        if vector is None:
+            vector = self.embedder.embed(text, memory_action)
+            self.cache.put(self.model, text, vector)
+        return vector
+
+    def embed_batch(self, texts, memory_action: Optional[str] = "add"):
+        """여러 텍스트 임베딩 - 캐시에 없는 텍스트만 임베더에 요청"""
+        cached = {text: self.cache.get(self.model, text) for text in texts}
+        missing = [text for text, vector in cached.items() if vector is None]
+
+        if missing:
+            client = getattr(self.embedder, "client", None)
+            if hasattr(self.embedder, "embed_batch"):
+                fresh = self.embedder.embed_batch(missing, memory_action)
+            elif hasattr(client, "embed"):
+                # mem0 Ollama 임베더는 배치가 없으므로 같은 클라이언트로 다중 입력 요청
+                fresh = ollama_embed_batch(client, self.embedder.config.model, missing)
+            else:
+                fresh = [self.embedder.embed(text, memory_action) for text in missing]
+            fresh_map = dict(zip(missing, fresh))
+            self.cache.put_many(self.model, fresh_map)
+            cached.update(fresh_map)
+
+        return [cached[text] for text in texts]
+
+    def __getattr__(self, name: str):
+        # config 등 나머지 속성은 원래 임베더로 위임
+        return getattr(self.embedder, name)
+
+
+def install_cache(memory: Any, cache: EmbeddingCache, model: str):
+    """mem0 Memory 인스턴스의 임베더를 캐시 래퍼로 교체 (중복 설치 방지)"""
+    if memory is None or isinstance(memory.embedding_model, CachedEmbedder):
+        return
+    memory.embedding_model = CachedEmbedder(memory.embedding_model, cache, model)
+
+
+# 프로세스 전체에서 공유하는 캐시 (data_dir별)
+_caches: Dict[str, EmbeddingCache] = {}
+_caches_lock = threading.Lock()
+
+
+def get_embedding_cache(config: Any) -> EmbeddingCache:
+    """설정에 맞는 공유 EmbeddingCache 반환"""
+    disk_path = None
+    if config.memory.embedding_cache_disk:
+        disk_path = Path(config.data_dir) / "embedding_cache.db"
+
+    key = str(disk_path.resolve()) if disk_path else ":memory:"
+    with _caches_lock:
+        if key not in _caches:
+            _caches[key] = EmbeddingCache(
+                max_entries=config.memory.embedding_cache_size,
+                disk_path=disk_path
+            )
+        return _caches[key]
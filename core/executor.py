@@ -0,0 +1,92 @@
+"""
+블로킹 호출 실행기
+mem0 Memory, Ollama 클라이언트 등 동기 API를 이벤트 루프 밖의 제한된 스레드 풀에서 실행
+루프마다 세마포어로 동시에 대기 중인 호출 수를 제한 (backpressure)
+"""
+
+import asyncio
+import logging
+import threading
+import functools
+import weakref
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Optional
+
+logger = logging.getLogger(__name__)
+
+# 프로세스 전체에서 공유하는 스레드 풀
+_executor: Optional[ThreadPoolExecutor] = None
+_max_workers = 8
+_max_pending = 64
+_lock = threading.Lock()
+
+# 이벤트 루프별 세마포어 (Streamlit은 호출마다 새 루프를 쓰므로 루프가 사라지면 함께 정리)
+_semaphores: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, asyncio.Semaphore]" = (
+    weakref.WeakKeyDictionary()
+)
+
+
+def configure_executor(max_workers: int = 8, max_pending: int = 64):
+    """
+    실행기 크기 설정 (처음 사용하기 전에 호출해야 적용됨)
+
+    Args:
+        max_workers: 블로킹 호출을 실행할 스레드 수
+        max_pending: 루프당 동시에 진행/대기할 수 있는 호출 수 (초과 시 호출자가 대기)
+    """
+    global _max_workers, _max_pending
+    with _lock:
+        if _executor is not None:
+            if (max_workers, max_pending) != (_max_workers, _max_pending):
+                logger.debug("블로킹 실행기가 이미 생성되어 설정 변경을 무시함")
+            return
+        _max_workers = max_workers
+        _max_pending = max(max_pending, max_workers)
+
+
+def get_executor() -> ThreadPoolExecutor:
+    """공유 스레드 풀 반환 (없으면 생성)"""
+    global _executor
+    with _lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=_max_workers,
+                thread_name_prefix="blocking-io"
+            )
+        return _executor
+
+
+def _semaphore(loop: asyncio.AbstractEventLoop) -> asyncio.Semaphore:
+    semaphore = _semaphores.get(loop)
+    if semaphore is None:
+        semaphore = asyncio.Semaphore(_max_pending)
+        _semaphores[loop] = semaphore
+    return semaphore
+
+
+async def run_blocking(func: Callable[..., Any], *args, **kwargs) -> Any:
+    """
+    동기 함수를 공유 스레드 풀에서 실행하고 결과를 기다림
+
+    대기 중인 호출이 max_pending개를 넘으면 자리가 날 때까지 기다려
+    느린 백엔드 때문에 작업이 무한정 쌓이지 않도록 함
+    호출자가 취소/타임아웃되어도 스레드의 작업은 계속 실행되므로 자리는 작업이 끝날 때 반납
+    """
+    loop = asyncio.get_running_loop()
+    semaphore = _semaphore(loop)
+    await semaphore.acquire()
+    try:
+        future = get_executor().submit(functools.partial(func, *args, **kwargs))
+    except BaseException:
+        semaphore.release()
+        raise
+
+    def release(_):
+        try:
+            loop.call_soon_threadsafe(semaphore.release)
+        except RuntimeError:
+            # 루프가 이미 닫힘 (세마포어도 루프와 함께 버려짐)
+            pass
+
+    future.add_done_callback(release)
+    return await asyncio.wrap_future(future, loop=loop)
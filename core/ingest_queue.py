@@ -0,0 +1,384 @@
+"""
+백그라운드 메모리 수집 큐
+대화 응답을 돌려준 뒤 메모리 추출/분류/저장을 별도 스레드의 이벤트 루프에서 처리
+(Streamlit은 호출마다 새 루프를 만들고 닫으므로 큐는 자체 루프에서 실행)
+
+- 작업은 저널 파일(JSONL)에 먼저 기록되어 프로세스가 죽어도 재시작 시 다시 처리
+- 메모리 큐가 가득 차면 작업 ID만 남기고 내용은 저널에서 다시 읽음 (디스크 spill, 기록 위치로 바로 이동)
+- 실패한 작업은 지수 백오프로 재시도
+- 완료 레코드가 쌓이면 남은 작업만으로 저널을 다시 씀 (계속 작업이 들어와도 저널 크기 유지)
+"""
+
+import os
+import json
+import uuid
+import asyncio
+import logging
+import threading
+from collections import deque
+from pathlib import Path
+from typing import Dict, List, Optional, Any, Callable, Awaitable, Deque, Set, Tuple
+
+logger = logging.getLogger(__name__)
+
+# 완료 레코드가 이 수와 남은 작업 수보다 많아지면 저널 압축
+COMPACT_MIN_RECORDS = 1000
+
+
+class IngestQueue:
+    """
+    백그라운드 작업 큐 (전용 이벤트 루프 스레드 + 워커 풀)
+
+    submit()은 어느 스레드/루프에서든 바로 반환하고, handler(job, job_id)는 큐의 루프에서 실행됨
+    (job_id는 재시도/복구에도 그대로이므로 handler가 결과 ID를 여기서 만들면 재시도해도 중복 저장되지 않음)
+    """
+
+    def __init__(
+        self,
+        handler: Callable[[Dict[str, Any], str], Awaitable[Any]],
+        workers: int = 2,
+        max_size: int = 1000,
+        journal_path: Optional[Path] = None,
+        max_retries: int = 3,
+        retry_delay: float = 1.0,
+        name: str = "memory-ingest"
+    ):
+        """
+        큐 초기화
+
+        Args:
+            handler: 작업 하나를 처리하는 async 함수 (작업, 작업 ID를 받음 - 예외를 던지면 재시도)
+            workers: 동시에 작업을 처리할 워커 수
+            max_size: 메모리에 올려 둘 최대 작업 수 (초과분은 저널에만 보관)
+            journal_path: 작업 저널 파일 (None이면 메모리에만 보관, 초과분도 메모리에 대기)
+            max_retries: 작업당 최대 시도 횟수
+            retry_delay: 첫 재시도 대기 시간 (초, 시도마다 두 배)
+            name: 스레드 이름
+        """
+        self.handler = handler
+        self.workers = max(1, workers)
+        self.max_size = max(1, max_size)
+        self.journal_path = Path(journal_path) if journal_path else None
+        self.max_retries = max(1, max_retries)
+        self.retry_delay = retry_delay
+        self.name = name
+
+        self.processed = 0
+        self.failed = 0
+        self.retries = 0
+
+        # 처리되지 않은 작업 ID (저널 정리 시점 판단)
+        self._pending: Set[str] = set()
+        # 처리되지 않은 작업의 저널 내 put 레코드 위치 (backlog에서 다시 읽을 때 바로 이동)
+        self._offsets: Dict[str, int] = {}
+        # 마지막 압축 이후 저널에 쌓인 완료 레코드 수
+        self._done_records = 0
+        # 메모리 큐에 들어가지 못한 작업 (저널이 있으면 (ID, 시도 횟수), 없으면 작업 자체)
+        self._backlog: Deque[Any] = deque()
+        self._journal_lock = threading.Lock()
+        self._idle = threading.Condition(self._journal_lock)
+
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._queue: Optional[asyncio.Queue] = None
+        self._thread: Optional[threading.Thread] = None
+        self._tasks: List[asyncio.Task] = []
+        self._ready = threading.Event()
+
+    def start(self):
+        """루프 스레드 시작 및 저널에 남은 작업 복구"""
+        if self._thread is not None:
+            return
+        self._thread = threading.Thread(target=self._run, name=self.name, daemon=True)
+        self._thread.start()
+        self._ready.wait()
+
+        recovered = self._recover()
+        if recovered:
+            logger.info(f"📥 미처리 수집 작업 {len(recovered)}개 복구")
+            for item in recovered:
+                self._loop.call_soon_threadsafe(self._put, item)
+
+    def _run(self):
+        self._loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(self._loop)
+        self._queue = asyncio.Queue(maxsize=self.max_size)
+        self._tasks = [self._loop.create_task(self._worker()) for _ in range(self.workers)]
+        self._ready.set()
+        try:
+            self._loop.run_forever()
+        finally:
+            self._loop.close()
+
+    def close(self, timeout: float = 5.0):
+        """남은 작업을 timeout초까지 기다린 뒤 루프 종료 (처리 못 한 작업은 저널에 남음)"""
+        if self._thread is None:
+            return
+        self.join(timeout)
+        asyncio.run_coroutine_threadsafe(self._shutdown(), self._loop)
+        self._thread.join(timeout=1.0)
+        self._thread = None
+
+    async def _shutdown(self):
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._loop.stop()
+
+    def submit(self, job: Dict[str, Any]) -> str:
+        """
+        작업 제출 (저널 기록 후 바로 반환)
+
+        Args:
+            job: JSON으로 저장 가능한 작업 내용
+
+        Returns:
+            str: 작업 ID
+        """
+        if self._thread is None:
+            self.start()
+
+        item = {"id": uuid.uuid4().hex, "job": job, "attempts": 0}
+        with self._journal_lock:
+            offset = self._write({"op": "put", "id": item["id"], "job": job})
+            if offset is not None:
+                self._offsets[item["id"]] = offset
+            self._pending.add(item["id"])
+        self._loop.call_soon_threadsafe(self._put, item)
+        return item["id"]
+
+    def _put(self, item: Dict[str, Any]):
+        """루프에서 작업을 큐에 넣기 (가득 차면 backlog로)"""
+        if self._backlog or self._queue.full():
+            # 재시도 작업도 spill될 수 있으므로 시도 횟수는 함께 보관
+            self._backlog.append((item["id"], item["attempts"]) if self.journal_path else item)
+            return
+        self._queue.put_nowait(item)
+
+    def _refill(self):
+        """큐에 자리가 나면 backlog에서 채움 (저널이 있으면 내용을 다시 읽음)"""
+        free = self.max_size - self._queue.qsize()
+        if free <= 0 or not self._backlog:
+            return
+
+        batch = [self._backlog.popleft() for _ in range(min(free, len(self._backlog)))]
+        if self.journal_path:
+            jobs = self._read_jobs([job_id for job_id, _ in batch])
+            batch = [
+                {"id": job_id, "job": jobs[job_id], "attempts": attempts}
+                for job_id, attempts in batch if job_id in jobs
+            ]
+        for item in batch:
+            self._queue.put_nowait(item)
+
+    async def _worker(self):
+        while True:
+            item = await self._queue.get()
+            try:
+                await self._process(item)
+            finally:
+                self._queue.task_done()
+                self._refill()
+
+    async def _process(self, item: Dict[str, Any]):
+        item["attempts"] += 1
+        try:
+            await self.handler(item["job"], item["id"])
+        except Exception as e:
+            if item["attempts"] < self.max_retries:
+                delay = self.retry_delay * (2 ** (item["attempts"] - 1))
+                self.retries += 1
+                logger.warning(
+                    f"수집 작업 재시도 예정 ({item['attempts']}/{self.max_retries}, {delay:.1f}초 후): {e}"
+                )
+                self._loop.call_later(delay, self._put, item)
+                return
+            self.failed += 1
+            logger.error(f"❌ 수집 작업 포기 ({self.max_retries}회 실패): {e}")
+        else:
+            self.processed += 1
+
+        self._done(item["id"])
+
+    def _done(self, job_id: str):
+        """작업 완료 기록 - 남은 작업이 없으면 저널 비우기, 완료 레코드가 쌓이면 압축"""
+        with self._journal_lock:
+            self._pending.discard(job_id)
+            self._offsets.pop(job_id, None)
+            if not self._pending:
+                self._truncate()
+                self._idle.notify_all()
+                return
+
+            self._write({"op": "done", "id": job_id})
+            self._done_records += 1
+            if self._done_records >= max(COMPACT_MIN_RECORDS, len(self._pending)):
+                self._compact()
+
+    def join(self, timeout: Optional[float] = None) -> bool:
+        """모든 작업이 끝날 때까지 대기 (완료되면 True)"""
+        with self._idle:
+            return self._idle.wait_for(lambda: not self._pending, timeout)
+
+    def _write(self, record: Dict[str, Any]) -> Optional[int]:
+        """저널에 레코드 추가 (호출자가 잠금 보유) - 기록한 위치 반환"""
+        if self.journal_path is None:
+            return None
+        try:
+            self.journal_path.parent.mkdir(parents=True, exist_ok=True)
+            with open(self.journal_path, "ab") as f:
+                offset = f.seek(0, os.SEEK_END)
+                f.write((json.dumps(record, ensure_ascii=False) + "\n").encode("utf-8"))
+            return offset
+        except Exception as e:
+            logger.warning(f"수집 저널 기록 실패: {e}")
+            return None
+
+    def _truncate(self):
+        """저널 비우기 (호출자가 잠금 보유)"""
+        self._offsets.clear()
+        self._done_records = 0
+        if self.journal_path is None or not self.journal_path.exists():
+            return
+        try:
+            self.journal_path.write_bytes(b"")
+        except Exception as e:
+            logger.warning(f"수집 저널 정리 실패: {e}")
+
+    def _compact(self):
+        """남은 작업의 put 레코드만으로 저널 다시 쓰기 (호출자가 잠금 보유)"""
+        if self.journal_path is None:
+            return
+        try:
+            jobs = self._read_at(list(self._pending))
+            tmp_path = self.journal_path.with_suffix(".tmp")
+            offsets: Dict[str, int] = {}
+            with open(tmp_path, "wb") as f:
+                for job_id, job in jobs.items():
+                    offsets[job_id] = f.tell()
+                    record = {"op": "put", "id": job_id, "job": job}
+                    f.write((json.dumps(record, ensure_ascii=False) + "\n").encode("utf-8"))
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_path, self.journal_path)
+            self._offsets = offsets
+            self._done_records = 0
+            logger.debug(f"수집 저널 압축: 남은 작업 {len(offsets)}개")
+        except Exception as e:
+            logger.warning(f"수집 저널 압축 실패: {e}")
+
+    def _records(self) -> List[Tuple[int, Dict[str, Any]]]:
+        """저널 레코드와 위치 목록 (깨진 줄은 건너뜀)"""
+        if self.journal_path is None or not self.journal_path.exists():
+            return []
+        records = []
+        with open(self.journal_path, "rb") as f:
+            offset = 0
+            for line in f:
+                try:
+                    records.append((offset, json.loads(line)))
+                except (json.JSONDecodeError, UnicodeDecodeError):
+                    pass
+                offset += len(line)
+        return records
+
+    def _read_at(self, job_ids: List[str]) -> Dict[str, Dict[str, Any]]:
+        """기록 위치로 바로 이동해 작업 내용 읽기 (호출자가 잠금 보유)"""
+        jobs: Dict[str, Dict[str, Any]] = {}
+        if self.journal_path is None or not self.journal_path.exists():
+            return jobs
+        with open(self.journal_path, "rb") as f:
+            for job_id in job_ids:
+                offset = self._offsets.get(job_id)
+                if offset is None:
+                    continue
+                f.seek(offset)
+                try:
+                    record = json.loads(f.readline())
+                except (json.JSONDecodeError, UnicodeDecodeError):
+                    continue
+                if record.get("op") == "put" and record.get("id") == job_id:
+                    jobs[job_id] = record["job"]
+        return jobs
+
+    def _read_jobs(self, job_ids: List[str]) -> Dict[str, Dict[str, Any]]:
+        """저널에서 작업 내용 읽기 (읽는 양은 작업 수에 비례, 저널 크기와 무관)"""
+        with self._journal_lock:
+            return self._read_at(job_ids)
+
+    def _recover(self) -> List[Dict[str, Any]]:
+        """저널에서 완료되지 않은 작업 복구"""
+        with self._journal_lock:
+            jobs: Dict[str, Dict[str, Any]] = {}
+            for offset, record in self._records():
+                if record.get("op") == "put":
+                    jobs[record["id"]] = record["job"]
+                    self._offsets[record["id"]] = offset
+                elif record.get("op") == "done":
+                    jobs.pop(record.get("id"), None)
+                    self._offsets.pop(record.get("id"), None)
+                    self._done_records += 1
+            self._pending.update(jobs)
+            return [{"id": job_id, "job": job, "attempts": 0} for job_id, job in jobs.items()]
+
+    def stats(self) -> Dict[str, Any]:
+        """큐 상태"""
+        return {
+            "pending": len(self._pending),
+            "queued": self._queue.qsize() if self._queue is not None else 0,
+            "spilled": len(self._backlog),
+            "processed": self.processed,
+            "failed": self.failed,
+            "retries": self.retries
+        }
+
+
+def create_ingest_queue(
+    config: Any,
+    name: str,
+    handler: Callable[[Dict[str, Any], str], Awaitable[Any]]
+) -> Optional[IngestQueue]:
+    """
+    서비스용 수집 큐 생성 (memory.ingest_async가 꺼져 있으면 None - 응답 전에 동기 처리)
+
+    Args:
+        config: AppConfig
+        name: 서비스 이름 (저널 파일 이름)
+        handler: 작업 처리 함수
+    """
+    memory_config = config.memory
+    if not memory_config.ingest_async:
+        return None
+
+    kwargs = dict(
+        workers=memory_config.ingest_workers,
+        max_size=memory_config.ingest_queue_size,
+        max_retries=memory_config.ingest_max_retries,
+        retry_delay=memory_config.ingest_retry_delay,
+        name=f"ingest-{name}"
+    )
+    if memory_config.ingest_journal:
+        return open_ingest_queue(Path(config.data_dir) / "ingest" / f"{name}.jsonl", handler, **kwargs)
+
+    queue = IngestQueue(handler, **kwargs)
+    queue.start()
+    return queue
+
+
+# 같은 저널을 쓰는 큐는 프로세스 내에서 공유 (서비스를 여러 번 만들어도 워커/저널은 하나)
+_queues: Dict[str, IngestQueue] = {}
+_queues_lock = threading.Lock()
+
+
+def open_ingest_queue(
+    journal_path: Path,
+    handler: Callable[[Dict[str, Any], str], Awaitable[Any]],
+    **kwargs
+) -> IngestQueue:
+    """저널 경로별 공유 IngestQueue 반환 (처음 만들 때 시작 및 복구)"""
+    key = str(Path(journal_path).resolve())
+    with _queues_lock:
+        if key not in _queues:
+            queue = IngestQueue(handler, journal_path=Path(key), **kwargs)
+            queue.start()
+            _queues[key] = queue
+        return _queues[key]
@@ -0,0 +1,250 @@
+"""
+로컬 폴백 검색용 역색인 (BM25)
+사용자별로 문자 n-gram → {메모리 ID: 빈도} posting list를 유지하여
+검색 시 전체 메모리를 훑지 않고 후보 문서만 BM25로 채점
+한국어 조사/어미("커피를" vs "커피")도 2/3-gram이 겹치므로 매칭됨
+"""
+
+import re
+import math
+import heapq
+import logging
+import threading
+from collections import OrderedDict, Counter
+from typing import Dict, List, Optional, Any, Set, Callable, Tuple
+
+logger = logging.getLogger(__name__)
+
+_TOKEN_PATTERN = re.compile(r"\w+", re.UNICODE)
+
+# BM25 파라미터
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+
+def tokenize(text: str) -> List[str]:
+    """소문자화 후 단어 단위 토큰 추출 (문장부호 제거)"""
+    return _TOKEN_PATTERN.findall(text.lower())
+
+
+def analyze(text: str) -> Counter:
+    """
+    텍스트를 문자 2-gram/3-gram 빈도로 변환
+
+    한 글자 단어는 그대로 사용하고, 그 외에는 단어 안에서만 n-gram 생성
+    (단어 경계를 넘는 n-gram은 만들지 않음)
+    """
+    terms = Counter()
+    for word in tokenize(text):
+        if len(word) < 2:
+            terms[word] += 1
+            continue
+        for n in (2, 3):
+            for i in range(len(word) - n + 1):
+                terms[word[i:i + n]] += 1
+    return terms
+
+
+class InvertedIndex:
+    """한 사용자의 BM25 역색인"""
+
+    def __init__(self):
+        # n-gram → {메모리 ID: 빈도}
+        self.postings: Dict[str, Dict[str, int]] = {}
+        # 메모리 ID → 엔트리, 메모리 ID → (n-gram 빈도, 문서 길이)
+        self.docs: Dict[str, Dict[str, Any]] = {}
+        self._doc_terms: Dict[str, Counter] = {}
+        self._doc_len: Dict[str, int] = {}
+        self._total_len = 0
+
+    def __len__(self) -> int:
+        return len(self.docs)
+
+    def add(self, entry: Dict[str, Any]):
+        """메모리 엔트리 색인"""
+        memory_id = entry["id"]
+        if memory_id in self.docs:
+            self.remove(memory_id)
+
+        terms = analyze(entry.get("text", ""))
+        length = sum(terms.values())
+
+        self.docs[memory_id] = entry
+        self._doc_terms[memory_id] = terms
+        self._doc_len[memory_id] = length
+        self._total_len += length
+        for term, tf in terms.items():
+            self.postings.setdefault(term, {})[memory_id] = tf
+
+    def remove(self, memory_id: str):
+        """메모리 엔트리 색인 제거"""
+        terms = self._doc_terms.pop(memory_id, None)
+        self.docs.pop(memory_id, None)
+        self._total_len -= self._doc_len.pop(memory_id, 0)
+        if not terms:
+            return
+
+        for term in terms:
+            posting = self.postings.get(term)
+            if posting is None:
+                continue
+            posting.pop(memory_id, None)
+            if not posting:
+                del self.postings[term]
+
+    def idf(self, term: str) -> float:
+        """BM25 IDF (문서 빈도는 posting list 크기로 증분 유지)"""
+        n = len(self.docs)
+        df = len(self.postings.get(term, ()))
+        return math.log(1 + (n - df + 0.5) / (df + 0.5))
+
+    def search(
+        self,
+        query: str,
+        limit: int = 10,
+        threshold: Optional[float] = None
+    ) -> List[Tuple[float, Dict[str, Any]]]:
+        """
+        BM25 상위 k개 검색
+
+        점수는 "쿼리 n-gram을 모두 한 번씩 포함한 평균 길이 문서" 점수로 나누어
+        0~1 범위로 정규화 (기존 유사도 임계값과 함께 사용 가능)
+
+        Returns:
+            List[(점수, 엔트리)]: 점수 내림차순
+        """
+        if not self.docs:
+            return []
+
+        query_terms = analyze(query)
+        avg_len = self._total_len / len(self.docs) or 1.0
+
+        scores: Dict[str, float] = {}
+        max_score = 0.0
+        for term in query_terms:
+            posting = self.postings.get(term)
+            idf = self.idf(term)
+            max_score += idf
+            if not posting:
+                continue
+            for memory_id, tf in posting.items():
+                norm = BM25_K1 * (1 - BM25_B + BM25_B * self._doc_len[memory_id] / avg_len)
+                scores[memory_id] = scores.get(memory_id, 0.0) + idf * tf * (BM25_K1 + 1) / (tf + norm)
+
+        if not scores or max_score <= 0:
+            return []
+
+        ranked = []
+        for memory_id, score in scores.items():
+            normalized = min(1.0, score / max_score)
+            if threshold and normalized < threshold:
+                continue
+            ranked.append((normalized, memory_id))
+
+        top = heapq.nlargest(limit, ranked)
+        return [(score, self.docs[memory_id]) for score, memory_id in top]
+
+
+class LocalSearchIndex:
+    """
+    사용자별 역색인 모음
+
+    - 사용자의 색인은 첫 검색 시 로컬 저장소에서 한 번 구축
+    - 이후 add/delete 시 증분 갱신
+    - 색인 수는 LRU로 제한 (로컬 저장소 샤드와 같은 기준)
+    """
+
+    def __init__(self, max_users: int = 256):
+        self.max_users = max_users
+        self._indexes: "OrderedDict[str, InvertedIndex]" = OrderedDict()
+        self._lock = threading.RLock()
+
+    def get(
+        self,
+        user_id: str,
+        loader: Callable[[], List[Dict[str, Any]]]
+    ) -> InvertedIndex:
+        """
+        사용자 색인 가져오기 (없으면 loader 결과로 구축)
+
+        Args:
+            user_id: 사용자 ID
+            loader: 사용자의 전체 메모리 엔트리를 반환하는 함수
+        """
+        with self._lock:
+            return self._get(user_id, loader)
+
+    def _get(
+        self,
+        user_id: str,
+        loader: Callable[[], List[Dict[str, Any]]]
+    ) -> InvertedIndex:
+        """사용자 색인 가져오기 (호출자가 잠금 보유)"""
+        index = self._indexes.get(user_id)
+        if index is not None:
+            self._indexes.move_to_end(user_id)
+            return index
+
+        index = InvertedIndex()
+        for entry in loader():
+            if isinstance(entry, dict) and "id" in entry:
+                index.add(entry)
+        self._indexes[user_id] = index
+        logger.debug(f"로컬 검색 색인 구축: {user_id} ({len(index)}개)")
+
+        while len(self._indexes) > self.max_users:
+            self._indexes.popitem(last=False)
+        return index
+
+    def search(
+        self,
+        user_id: str,
+        loader: Callable[[], List[Dict[str, Any]]],
+        query: str,
+        limit: int = 10,
+        threshold: Optional[float] = None
+    ) -> List[Tuple[float, Dict[str, Any]]]:
+        """
+        사용자 색인으로 BM25 검색 (색인이 없으면 먼저 구축)
+
+        다른 스레드의 add/remove가 posting list를 바꾸는 도중에 순회하지 않도록
+        색인 조회와 채점을 같은 잠금 안에서 실행
+        """
+        with self._lock:
+            return self._get(user_id, loader).search(query, limit=limit, threshold=threshold)
+
+    def add(self, user_id: str, entry: Dict[str, Any]):
+        """이미 구축된 사용자 색인에 엔트리 추가"""
+        with self._lock:
+            index = self._indexes.get(user_id)
+            if index is not None:
+                index.add(entry)
+
+    def remove(self, user_id: str, memory_id: str):
+        """이미 구축된 사용자 색인에서 엔트리 제거"""
+        with self._lock:
+            index = self._indexes.get(user_id)
+            if index is not None:
+                index.remove(memory_id)
+
+    def drop(self, user_id: Optional[str] = None):
+        """사용자 색인 (또는 전체) 버리기 - 다음 검색 때 다시 구축"""
+        with self._lock:
+            if user_id is None:
+                self._indexes.clear()
+            else:
+                self._indexes.pop(user_id, None)
+
+
+# 같은 로컬 저장소를 쓰는 매니저끼리는 색인도 공유
+# (한쪽에서 추가한 메모리가 다른 쪽 색인에 누락되지 않도록)
+_indexes: Dict[str, LocalSearchIndex] = {}
+_indexes_lock = threading.Lock()
+
+
+def open_search_index(store_key: str, max_users: int = 256) -> LocalSearchIndex:
+    """로컬 저장소별 공유 LocalSearchIndex 반환"""
+    with _indexes_lock:
+        if store_key not in _indexes:
+            _indexes[store_key] = LocalSearchIndex(max_users=max_users)
+        return _indexes[store_key]
@@ -0,0 +1,786 @@
+"""
+로컬 메모리 저장소 - 사용자별 샤드(스냅샷 + append-only 작업 로그)
+매 쓰기마다 전체 파일을 다시 쓰지 않고 작업 기록 한 줄만 추가하며,
+사용자 샤드는 처음 접근할 때만 로드하고 유휴 상태가 되면 RAM에서 내림
+write-behind 모드에서는 로그 기록을 버퍼에 모았다가 백그라운드에서 한 번에 기록
+삭제는 tombstone 레코드로 남기고, 죽은 레코드 비율이 높아진 샤드는 백그라운드에서 압축
+"""
+
+import json
+import os
+import time
+import atexit
+import logging
+import threading
+from itertools import islice
+from collections import OrderedDict
+from typing import Dict, List, Optional, Any, Iterator, Tuple
+from pathlib import Path
+from urllib.parse import quote, unquote
+
+logger = logging.getLogger(__name__)
+
+
+def _apply_record(memories: Dict[str, Dict[str, Any]], record: Dict[str, Any]):
+    """작업 레코드를 {memory_id: entry} 상태에 반영 (멱등)"""
+    op = record.get("op")
+
+    if op == "add":
+        entry = record.get("memory", {})
+        if "id" in entry:
+            memories[entry["id"]] = entry
+    elif op == "delete":
+        memories.pop(record.get("id"), None)
+    elif op == "delete_many":
+        for memory_id in record.get("ids", []):
+            memories.pop(memory_id, None)
+    elif op == "clear":
+        memories.clear()
+    elif op == "update":
+        entry = memories.get(record.get("id"))
+        if entry is not None:
+            if record.get("text") is not None:
+                entry["text"] = record["text"]
+            if record.get("metadata"):
+                entry.setdefault("metadata", {}).update(record["metadata"])
+
+
+def _read_log(log_file: Path) -> Iterator[Dict[str, Any]]:
+    """JSONL 작업 로그 읽기 (손상된 줄은 건너뜀)"""
+    with open(log_file, 'r', encoding='utf-8') as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                yield json.loads(line)
+            except json.JSONDecodeError:
+                # 비정상 종료로 잘린 마지막 줄은 무시
+                logger.warning(f"손상된 로그 레코드 건너뜀: {log_file.name}")
+
+
+def _read_entries(snapshot_file: Path) -> Dict[str, Dict[str, Any]]:
+    """스냅샷 파일(엔트리 목록) 읽기 → {memory_id: entry}"""
+    with open(snapshot_file, 'r', encoding='utf-8') as f:
+        entries = json.load(f)
+    return {
+        entry["id"]: entry
+        for entry in entries
+        if isinstance(entry, dict) and "id" in entry
+    }
+
+
+def _read_legacy_file(data_dir: Path) -> Dict[str, Dict[str, Dict[str, Any]]]:
+    """단일 파일(local_memories.json/log) 저장소 읽기 → {user_id: {memory_id: entry}}"""
+    legacy_snapshot = data_dir / "local_memories.json"
+    legacy_log = data_dir / "local_memories.log"
+
+    memories: Dict[str, Dict[str, Dict[str, Any]]] = {}
+    if legacy_snapshot.exists():
+        with open(legacy_snapshot, 'r', encoding='utf-8') as f:
+            for user_id, entries in json.load(f).items():
+                memories[user_id] = {
+                    entry["id"]: entry
+                    for entry in entries
+                    if isinstance(entry, dict) and "id" in entry
+                }
+    if legacy_log.exists():
+        for record in _read_log(legacy_log):
+            if record.get("user_id"):
+                _apply_record(memories.setdefault(record["user_id"], {}), record)
+    return memories
+
+
+def read_stored_memories(data_dir: Path) -> Dict[str, Dict[str, Dict[str, Any]]]:
+    """
+    저장소를 열지 않고 파일에서 모든 사용자 메모리 읽기 (일회성 가져오기용)
+
+    LocalMemoryStore와 달리 백그라운드 스레드를 띄우거나 파일을 옮기지 않음
+
+    Returns:
+        {user_id: {memory_id: entry}} (단일 파일 저장소 + 사용자별 샤드)
+    """
+    data_dir = Path(data_dir)
+    memories = _read_legacy_file(data_dir)
+
+    shard_dir = data_dir / "local_memories"
+    if shard_dir.is_dir():
+        names = {
+            path.stem for path in shard_dir.iterdir()
+            if path.suffix in (".json", ".log")
+        }
+        for name in sorted(names):
+            shard: Dict[str, Dict[str, Any]] = {}
+            snapshot_file = shard_dir / f"{name}.json"
+            log_file = shard_dir / f"{name}.log"
+            if snapshot_file.exists():
+                shard = _read_entries(snapshot_file)
+            if log_file.exists():
+                for record in _read_log(log_file):
+                    _apply_record(shard, record)
+            memories.setdefault(unquote(name), {}).update(shard)
+    return memories
+
+
+class _UserShard:
+    """한 사용자의 메모리 샤드 (스냅샷 파일 + 작업 로그)"""
+
+    def __init__(self, user_id: str, shard_dir: Path, snapshot_interval: int):
+        self.user_id = user_id
+        name = quote(user_id, safe="")
+        self.snapshot_file = shard_dir / f"{name}.json"
+        self.log_file = shard_dir / f"{name}.log"
+        self.snapshot_interval = snapshot_interval
+
+        # {memory_id: entry} (삽입 순서 유지)
+        self.memories: Dict[str, Dict[str, Any]] = {}
+        self.ops_since_snapshot = 0
+        self.last_access = time.monotonic()
+        self._log = None
+
+        # write-behind 모드에서 아직 디스크에 기록되지 않은 로그 줄
+        self.pending: List[str] = []
+
+        # 살아있는 엔트리의 직렬화 크기 / 스냅샷 + 로그 전체 크기 (죽은 레코드 비율 계산용)
+        self.entry_bytes: Dict[str, int] = {}
+        self.live_bytes = 0
+        self.file_bytes = 0
+
+        # 통계 (카테고리별 개수, 마지막 시각) - 작업마다 증분 갱신
+        self.entry_category: Dict[str, str] = {}
+        self.categories: Dict[str, int] = {}
+        self._last_updated = ""
+        self._last_updated_stale = False
+
+        self._load()
+
+    def _load(self):
+        """스냅샷 로드 후 작업 로그 재생"""
+        if self.snapshot_file.exists():
+            try:
+                self.memories = _read_entries(self.snapshot_file)
+            except Exception as e:
+                logger.error(f"로컬 메모리 스냅샷 로드 실패 ({self.user_id}): {e}")
+
+        if self.log_file.exists():
+            for record in _read_log(self.log_file):
+                _apply_record(self.memories, record)
+                self.ops_since_snapshot += 1
+
+        for memory_id, entry in self.memories.items():
+            self._track(memory_id, entry)
+        for path in (self.snapshot_file, self.log_file):
+            if path.exists():
+                self.file_bytes += path.stat().st_size
+
+    @staticmethod
+    def _size(entry: Dict[str, Any]) -> int:
+        return len(json.dumps(entry, ensure_ascii=False).encode("utf-8"))
+
+    def _track(self, memory_id: str, entry: Optional[Dict[str, Any]]):
+        """엔트리 크기와 통계 갱신 (entry가 None이면 삭제)"""
+        self.live_bytes -= self.entry_bytes.pop(memory_id, 0)
+
+        old_category = self.entry_category.pop(memory_id, None)
+        if old_category is not None:
+            self.categories[old_category] -= 1
+            if self.categories[old_category] <= 0:
+                del self.categories[old_category]
+            if entry is None:
+                # 가장 최근 메모리가 지워졌을 수 있으므로 다음 조회 때 다시 계산
+                self._last_updated_stale = True
+
+        if entry is not None:
+            size = self._size(entry)
+            self.entry_bytes[memory_id] = size
+            self.live_bytes += size
+
+            metadata = entry.get("metadata", {}) or {}
+            category = metadata.get("category") or "uncategorized"
+            self.entry_category[memory_id] = category
+            self.categories[category] = self.categories.get(category, 0) + 1
+            self._last_updated = max(self._last_updated, metadata.get("timestamp", "") or "")
+
+    def _reset_stats(self):
+        self.entry_category.clear()
+        self.categories.clear()
+        self._last_updated = ""
+        self._last_updated_stale = False
+
+    def rebuild_stats(self):
+        """현재 메모리에서 통계 다시 계산"""
+        self._reset_stats()
+        for memory_id, entry in self.memories.items():
+            self._track(memory_id, entry)
+
+    @property
+    def last_updated(self) -> str:
+        """메모리 메타데이터 timestamp의 최댓값"""
+        if self._last_updated_stale:
+            self._last_updated = max(
+                ((entry.get("metadata", {}) or {}).get("timestamp", "") or "" for entry in self.memories.values()),
+                default=""
+            )
+            self._last_updated_stale = False
+        return self._last_updated
+
+    def _track_record(self, record: Dict[str, Any]):
+        """적용된 작업 레코드에 맞춰 살아있는 크기 갱신"""
+        op = record.get("op")
+        if op == "add":
+            memory_id = record.get("memory", {}).get("id")
+            self._track(memory_id, self.memories.get(memory_id))
+        elif op == "update":
+            self._track(record.get("id"), self.memories.get(record.get("id")))
+        elif op == "delete":
+            self._track(record.get("id"), None)
+        elif op == "delete_many":
+            for memory_id in record.get("ids", []):
+                self._track(memory_id, None)
+        elif op == "clear":
+            self.entry_bytes.clear()
+            self.live_bytes = 0
+            self._reset_stats()
+
+    @property
+    def dead_bytes(self) -> int:
+        """스냅샷 + 로그 중 더 이상 상태에 기여하지 않는 바이트 (삭제/덮어쓴 레코드, tombstone)"""
+        return max(0, self.file_bytes - self.live_bytes)
+
+    @property
+    def dead_ratio(self) -> float:
+        return self.dead_bytes / self.file_bytes if self.file_bytes else 0.0
+
+    def append(self, record: Dict[str, Any], buffered: bool = False):
+        """
+        작업 레코드를 적용하고 로그에 한 줄 추가
+
+        Args:
+            record: 작업 레코드
+            buffered: True면 디스크 기록을 flush() 호출 시점으로 미룸
+        """
+        _apply_record(self.memories, record)
+        self._track_record(record)
+        line = json.dumps(record, ensure_ascii=False) + "\n"
+        self.pending.append(line)
+        self.file_bytes += len(line.encode("utf-8"))
+
+        self.ops_since_snapshot += 1
+        if self.ops_since_snapshot >= self.snapshot_interval:
+            self.snapshot()
+        elif not buffered:
+            self.flush(sync=False)
+
+    def flush(self, sync: bool = True):
+        """
+        버퍼된 로그 줄을 한 번의 쓰기로 기록
+
+        Args:
+            sync: True면 fsync까지 수행 (group commit)
+        """
+        if not self.pending:
+            return
+
+        if self._log is None:
+            self._log = open(self.log_file, 'a', encoding='utf-8')
+        self._log.write("".join(self.pending))
+        self._log.flush()
+        if sync:
+            os.fsync(self._log.fileno())
+        self.pending = []
+
+    def snapshot(self):
+        """현재 상태를 스냅샷으로 저장하고 로그 비우기 (압축: 죽은 레코드 제거)"""
+        tmp_file = self.snapshot_file.with_suffix(".json.tmp")
+        with open(tmp_file, 'w', encoding='utf-8') as f:
+            json.dump(list(self.memories.values()), f, ensure_ascii=False)
+            f.flush()
+            os.fsync(f.fileno())
+            snapshot_bytes = f.tell()
+        os.replace(tmp_file, self.snapshot_file)
+
+        # 스냅샷이 확정된 뒤에 로그를 비움 (재생은 멱등이므로 중간 실패도 안전)
+        # 버퍼된 로그 줄은 스냅샷에 이미 반영되었으므로 버림
+        self.pending = []
+        self.close()
+        open(self.log_file, 'w', encoding='utf-8').close()
+        self.ops_since_snapshot = 0
+        self.file_bytes = snapshot_bytes
+
+    def close(self):
+        """버퍼를 기록하고 로그 파일 닫기"""
+        self.flush()
+        if self._log is not None:
+            self._log.close()
+            self._log = None
+
+
+class LocalMemoryStore:
+    """
+    사용자별 샤드로 나뉜 로컬 메모리 저장소
+
+    - data_dir/local_memories/ 아래 사용자마다 스냅샷(.json)과 작업 로그(.log)
+    - 쓰기(add/delete/update)는 해당 사용자 로그에 한 줄 추가 (O(1))
+    - 샤드는 처음 접근할 때 로드하고, 유휴 시간이 지나거나
+      활성 샤드 수가 상한을 넘으면 RAM에서 내림 (LRU)
+    - write-behind 모드: 로그 줄을 메모리 버퍼에 모았다가 백그라운드 스레드가
+      N개 작업 또는 T ms마다 샤드별로 한 번에 기록 (버퍼가 가득 차면 호출자가 직접 기록)
+    - 삭제는 tombstone 레코드 추가 (O(1)), 백그라운드 compactor가 죽은 바이트 비율이
+      임계값을 넘은 샤드를 스냅샷으로 다시 써서 정리
+    """
+
+    def __init__(
+        self,
+        data_dir: Path,
+        snapshot_interval: int = 1000,
+        idle_seconds: int = 600,
+        max_active_shards: int = 256,
+        write_behind: bool = False,
+        flush_ops: int = 64,
+        flush_interval_ms: int = 200,
+        max_buffered_ops: int = 4096,
+        compaction_dead_ratio: float = 0.5,
+        compaction_min_bytes: int = 64 * 1024,
+        compaction_interval_seconds: float = 30.0
+    ):
+        """
+        저장소 초기화
+
+        Args:
+            data_dir: 데이터 디렉토리
+            snapshot_interval: 스냅샷을 다시 쓰기까지의 샤드별 로그 작업 수
+            idle_seconds: 이 시간 동안 접근이 없으면 샤드를 RAM에서 내림
+            max_active_shards: 동시에 RAM에 유지할 최대 샤드 수
+            write_behind: 로그 기록을 백그라운드로 미룰지 여부
+            flush_ops: 이 개수만큼 작업이 쌓이면 flush
+            flush_interval_ms: 버퍼된 작업이 있으면 이 간격마다 flush
+            max_buffered_ops: 버퍼 상한 (초과 시 호출 스레드에서 즉시 flush)
+            compaction_dead_ratio: 샤드 압축을 시작할 죽은 바이트 비율
+            compaction_min_bytes: 이보다 작은 샤드는 압축하지 않음
+            compaction_interval_seconds: compactor 점검 주기
+        """
+        self.data_dir = Path(data_dir)
+        self.shard_dir = self.data_dir / "local_memories"
+        self.shard_dir.mkdir(parents=True, exist_ok=True)
+        self.key = str(self.shard_dir.resolve())
+
+        self.snapshot_interval = snapshot_interval
+        self.idle_seconds = idle_seconds
+        self.max_active_shards = max_active_shards
+
+        self._shards: "OrderedDict[str, _UserShard]" = OrderedDict()
+        self._lock = threading.RLock()
+
+        self.write_behind = write_behind
+        self.flush_ops = flush_ops
+        self.flush_interval = flush_interval_ms / 1000.0
+        self.max_buffered_ops = max_buffered_ops
+        self._buffered_ops = 0
+        self._flush_event = threading.Event()
+        self._closed = False
+        self._flusher = None
+
+        self.compaction_dead_ratio = compaction_dead_ratio
+        self.compaction_min_bytes = compaction_min_bytes
+        self.compaction_interval = compaction_interval_seconds
+        self._compact_event = threading.Event()
+        self.compactions = 0
+
+        self._migrate_legacy()
+
+        self._compactor = threading.Thread(
+            target=self._compact_loop,
+            name="local-memory-compactor",
+            daemon=True
+        )
+        self._compactor.start()
+
+        if self.write_behind:
+            self._flusher = threading.Thread(
+                target=self._flush_loop,
+                name="local-memory-flusher",
+                daemon=True
+            )
+            self._flusher.start()
+            # 프로세스 종료 시 남은 버퍼 강제 기록
+            atexit.register(self.close)
+
+    def _migrate_legacy(self):
+        """단일 파일(local_memories.json/log) 저장소를 사용자별 샤드로 분할"""
+        legacy_snapshot = self.data_dir / "local_memories.json"
+        legacy_log = self.data_dir / "local_memories.log"
+        if not legacy_snapshot.exists() and not legacy_log.exists():
+            return
+
+        try:
+            memories = _read_legacy_file(self.data_dir)
+
+            for user_id, entries in memories.items():
+                shard = _UserShard(user_id, self.shard_dir, self.snapshot_interval)
+                shard.memories.update(entries)
+                shard.snapshot()
+
+            for legacy_file in (legacy_snapshot, legacy_log):
+                if legacy_file.exists():
+                    os.replace(legacy_file, legacy_file.with_name(legacy_file.name + ".migrated"))
+            logger.info(f"기존 로컬 메모리를 사용자별 샤드로 분할: {len(memories)}명")
+        except Exception as e:
+            logger.error(f"기존 로컬 메모리 분할 실패: {e}")
+
+    # ------------------------------------------------------------------
+    # 샤드 관리
+    # ------------------------------------------------------------------
+
+    def _shard(self, user_id: str) -> _UserShard:
+        """사용자 샤드 가져오기 (없으면 로드, 호출자가 잠금 보유)"""
+        shard = self._shards.get(user_id)
+        if shard is None:
+            shard = _UserShard(user_id, self.shard_dir, self.snapshot_interval)
+            self._shards[user_id] = shard
+            logger.debug(f"로컬 메모리 샤드 로드: {user_id} ({len(shard.memories)}개)")
+        else:
+            self._shards.move_to_end(user_id)
+
+        shard.last_access = time.monotonic()
+        self._evict()
+        return shard
+
+    def _evict(self):
+        """유휴 샤드 및 상한 초과 샤드를 RAM에서 내림 (호출자가 잠금 보유)"""
+        now = time.monotonic()
+        while self._shards:
+            user_id, shard = next(iter(self._shards.items()))
+            idle = now - shard.last_access > self.idle_seconds
+            if not idle and len(self._shards) <= self.max_active_shards:
+                break
+            shard.close()
+            del self._shards[user_id]
+            logger.debug(f"로컬 메모리 샤드 해제: {user_id}")
+
+    def _flush_loop(self):
+        """백그라운드 flusher: N개 작업 또는 T ms마다 버퍼 기록"""
+        while not self._closed:
+            self._flush_event.wait(timeout=self.flush_interval)
+            self._flush_event.clear()
+            if self._closed:
+                break
+            with self._lock:
+                self._flush_all()
+                # 접근이 없어도 유휴 샤드는 주기적으로 해제
+                self._evict()
+
+    def _flush_all(self):
+        """모든 샤드의 버퍼를 기록 (호출자가 잠금 보유)"""
+        if not self._buffered_ops:
+            return
+        for shard in self._shards.values():
+            try:
+                shard.flush()
+            except Exception as e:
+                logger.error(f"로컬 메모리 로그 기록 실패 ({shard.user_id}): {e}")
+        self._buffered_ops = 0
+
+    def flush(self):
+        """버퍼된 모든 작업을 즉시 기록"""
+        with self._lock:
+            self._flush_all()
+
+    def _needs_compaction(self, shard: _UserShard) -> bool:
+        return (
+            shard.file_bytes >= self.compaction_min_bytes
+            and shard.dead_ratio >= self.compaction_dead_ratio
+        )
+
+    def _compact_loop(self):
+        """백그라운드 compactor: 죽은 레코드 비율이 높은 샤드를 다시 씀"""
+        while not self._closed:
+            self._compact_event.wait(timeout=self.compaction_interval)
+            self._compact_event.clear()
+            if self._closed:
+                break
+            self.compact()
+
+    def compact(self, force: bool = False) -> int:
+        """
+        로드된 샤드 중 압축 대상 샤드를 스냅샷으로 다시 쓰기
+
+        Args:
+            force: True면 임계값과 관계없이 죽은 레코드가 있는 모든 샤드 압축
+
+        Returns:
+            int: 압축한 샤드 수
+        """
+        with self._lock:
+            targets = [
+                shard for shard in self._shards.values()
+                if (shard.dead_bytes > 0 if force else self._needs_compaction(shard))
+            ]
+
+        compacted = 0
+        for shard in targets:
+            # 샤드마다 잠금을 따로 잡아 다른 사용자의 쓰기를 오래 막지 않음
+            with self._lock:
+                if self._shards.get(shard.user_id) is not shard:
+                    continue
+                before = shard.file_bytes
+                try:
+                    shard.snapshot()
+                except Exception as e:
+                    logger.error(f"로컬 메모리 압축 실패 ({shard.user_id}): {e}")
+                    continue
+                compacted += 1
+                self.compactions += 1
+                logger.info(
+                    f"로컬 메모리 샤드 압축: {shard.user_id} "
+                    f"({before} → {shard.file_bytes} bytes)"
+                )
+        return compacted
+
+    def storage_stats(self) -> Dict[str, Any]:
+        """로드된 샤드의 살아있는/죽은 바이트 통계"""
+        with self._lock:
+            live = sum(shard.live_bytes for shard in self._shards.values())
+            total = sum(shard.file_bytes for shard in self._shards.values())
+            return {
+                "loaded_shards": len(self._shards),
+                "live_bytes": live,
+                "dead_bytes": max(0, total - live),
+                "dead_ratio": (total - live) / total if total else 0.0,
+                "compactions": self.compactions
+            }
+
+    def _has_shard_files(self, user_id: str) -> bool:
+        """샤드 파일 존재 여부 (로드하지 않음)"""
+        name = quote(user_id, safe="")
+        return (
+            (self.shard_dir / f"{name}.json").exists()
+            or (self.shard_dir / f"{name}.log").exists()
+        )
+
+    def user_ids(self) -> List[str]:
+        """샤드 파일이 있는 사용자 목록"""
+        names = {
+            path.stem for path in self.shard_dir.iterdir()
+            if path.suffix in (".json", ".log")
+        }
+        return sorted(unquote(name) for name in names)
+
+    def iter_all(self) -> Iterator[Tuple[str, Dict[str, Any]]]:
+        """모든 사용자의 (user_id, entry) 순회 (샤드를 하나씩 로드)"""
+        for user_id in self.user_ids():
+            for entry in self.get_user_memories(user_id):
+                yield user_id, entry
+
+    # ------------------------------------------------------------------
+    # 쓰기
+    # ------------------------------------------------------------------
+
+    def _append(self, user_id: str, record: Dict[str, Any]):
+        """사용자 샤드에 작업 레코드 추가"""
+        self._append_many(user_id, [record])
+
+    def _append_many(self, user_id: str, records: List[Dict[str, Any]]):
+        """사용자 샤드에 작업 레코드 여러 개 추가 (디스크 기록은 한 번)"""
+        with self._lock:
+            try:
+                shard = self._shard(user_id)
+                for record in records:
+                    shard.append(record, buffered=True)
+                if not self.write_behind:
+                    shard.flush(sync=False)
+            except Exception as e:
+                # 호출자(수집 큐 재시도 등)가 실패를 알 수 있도록 다시 던짐
+                logger.error(f"로컬 메모리 로그 기록 실패: {e}")
+                raise
+
+            if not self.write_behind:
+                return
+
+            self._buffered_ops += len(records)
+            if self._buffered_ops >= self.max_buffered_ops:
+                # 버퍼 상한 초과: 백그라운드를 기다리지 않고 직접 기록 (backpressure)
+                self._flush_all()
+            elif self._buffered_ops >= self.flush_ops:
+                self._flush_event.set()
+
+    def add(self, user_id: str, entry: Dict[str, Any]):
+        """메모리 추가"""
+        self._append(user_id, {"op": "add", "memory": entry})
+
+    def add_many(self, user_id: str, entries: List[Dict[str, Any]]):
+        """메모리 여러 개 추가 (로그 기록 한 번)"""
+        if entries:
+            self._append_many(user_id, [{"op": "add", "memory": entry} for entry in entries])
+
+    def _after_delete(self, user_id: str):
+        """삭제 후 압축이 필요하면 compactor 깨우기 (호출자가 잠금 보유)"""
+        shard = self._shards.get(user_id)
+        if shard is not None and self._needs_compaction(shard):
+            self._compact_event.set()
+
+    def delete(self, user_id: str, memory_id: str) -> bool:
+        """메모리 삭제 (tombstone 추가)"""
+        with self._lock:
+            if memory_id not in self._shard(user_id).memories:
+                return False
+            self._append(user_id, {"op": "delete", "id": memory_id})
+            self._after_delete(user_id)
+            return True
+
+    def delete_many(self, user_id: str, memory_ids: List[str]) -> int:
+        """여러 메모리 삭제 - tombstone 레코드 한 줄 (O(삭제 개수))"""
+        with self._lock:
+            existing = self._shard(user_id).memories
+            ids = [memory_id for memory_id in memory_ids if memory_id in existing]
+            if not ids:
+                return 0
+            self._append(user_id, {"op": "delete_many", "ids": ids})
+            self._after_delete(user_id)
+            return len(ids)
+
+    def delete_all(self, user_id: str) -> int:
+        """사용자 메모리 전체 삭제 - clear 레코드 한 줄 (O(1))"""
+        with self._lock:
+            count = len(self._shard(user_id).memories)
+            if count == 0:
+                return 0
+            self._append(user_id, {"op": "clear"})
+            self._after_delete(user_id)
+            return count
+
+    def update(
+        self,
+        user_id: str,
+        memory_id: str,
+        text: Optional[str] = None,
+        metadata: Optional[Dict[str, Any]] = None
+    ) -> bool:
+        """메모리 수정"""
+        with self._lock:
+            if memory_id not in self._shard(user_id).memories:
+                return False
+            self._append(user_id, {
+                "op": "update",
+                "id": memory_id,
+                "text": text,
+                "metadata": metadata or {}
+            })
+            return True
+
+    def snapshot(self):
+        """로드된 모든 샤드를 스냅샷으로 저장"""
+        with self._lock:
+            for shard in self._shards.values():
+                try:
+                    shard.snapshot()
+                except Exception as e:
+                    logger.error(f"로컬 메모리 스냅샷 저장 실패 ({shard.user_id}): {e}")
+
+    def close(self):
+        """버퍼를 기록하고 모든 샤드 로그 닫은 뒤 RAM에서 내림"""
+        self._closed = True
+        self._flush_event.set()
+        self._compact_event.set()
+        for thread in (self._flusher, self._compactor):
+            if thread is not None and thread is not threading.current_thread():
+                thread.join(timeout=5)
+
+        with self._lock:
+            for shard in self._shards.values():
+                try:
+                    shard.close()
+                except Exception as e:
+                    logger.error(f"로컬 메모리 로그 기록 실패 ({shard.user_id}): {e}")
+            self._shards.clear()
+            self._buffered_ops = 0
+
+    # ------------------------------------------------------------------
+    # 읽기
+    # ------------------------------------------------------------------
+
+    def get(self, user_id: str, memory_id: str) -> Optional[Dict[str, Any]]:
+        """ID로 메모리 조회"""
+        with self._lock:
+            return self._shard(user_id).memories.get(memory_id)
+
+    def get_user_memories(
+        self,
+        user_id: str,
+        limit: Optional[int] = None,
+        offset: int = 0
+    ) -> List[Dict[str, Any]]:
+        """사용자의 메모리 목록 (추가 순서)"""
+        with self._lock:
+            # 필요한 구간만 복사 (전체 목록을 만들지 않음)
+            values = self._shard(user_id).memories.values()
+            end = offset + limit if limit else None
+            return list(islice(values, offset, end))
+
+    def page(
+        self,
+        user_id: str,
+        limit: int = 20,
+        cursor: Optional[str] = None,
+        order: str = "asc"
+    ) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+        """
+        커서 기반 페이지 조회 (커서는 추가 순서상의 위치)
+
+        Args:
+            order: "asc"면 추가 순서, "desc"면 최신 메모리부터 (위치도 뒤에서부터 셈)
+
+        Returns:
+            (엔트리 목록, 다음 페이지 커서 또는 None)
+        """
+        offset = int(cursor) if cursor else 0
+        with self._lock:
+            memories = self._shard(user_id).memories
+            values = reversed(memories.values()) if order == "desc" else memories.values()
+            entries = list(islice(values, offset, offset + limit))
+            has_more = offset + len(entries) < len(memories)
+        return entries, str(offset + len(entries)) if has_more else None
+
+    def has_user(self, user_id: str) -> bool:
+        """사용자 메모리 존재 여부"""
+        with self._lock:
+            if user_id not in self._shards and not self._has_shard_files(user_id):
+                return False
+            return bool(self._shard(user_id).memories)
+
+    def count(self, user_id: str) -> int:
+        """사용자 메모리 개수"""
+        with self._lock:
+            return len(self._shard(user_id).memories)
+
+    def stats(self, user_id: str) -> Dict[str, Any]:
+        """사용자 메모리 집계 (총 개수, 카테고리별 개수, 마지막 시각) - 증분 유지된 값 읽기"""
+        with self._lock:
+            shard = self._shard(user_id)
+            categories = dict(shard.categories)
+            return {
+                "total_memories": sum(categories.values()),
+                "categories": categories,
+                "last_updated": shard.last_updated
+            }
+
+    def rebuild_stats(self, user_id: Optional[str] = None):
+        """샤드 통계 다시 계산 (user_id가 없으면 로드된 모든 샤드)"""
+        with self._lock:
+            shards = [self._shard(user_id)] if user_id is not None else list(self._shards.values())
+            for shard in shards:
+                shard.rebuild_stats()
+
+
+# 같은 디렉토리를 가리키는 저장소는 프로세스 내에서 공유
+# (여러 서비스가 각자 샤드를 로드하면 RAM 낭비 + 상태 불일치)
+_stores: Dict[str, LocalMemoryStore] = {}
+_stores_lock = threading.Lock()
+
+
+def open_local_store(data_dir: Path, **kwargs) -> LocalMemoryStore:
+    """data_dir별 공유 LocalMemoryStore 반환"""
+    key = str(Path(data_dir).resolve())
+    with _stores_lock:
+        if key not in _stores:
+            _stores[key] = LocalMemoryStore(data_dir, **kwargs)
+        return _stores[key]
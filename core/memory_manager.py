@@ -3,13 +3,15 @@ mem0 기반 메모리 관리 시스템
 mem0 공식 문서 참고: https://github.com/mem0ai/mem0
 """
 
+import copy
 import json
 import logging
-from typing import Dict, List, Optional, Any
+import threading
+from typing import Dict, List, Optional, Any, AsyncIterator, Callable, Tuple
+from contextlib import asynccontextmanager
 from datetime import datetime
 from pathlib import Path
 import sys
-import requests
 
 # 프로젝트 경로 추가
 sys.path.append(str(Path(__file__).parent.parent))
@@ -17,6 +19,19 @@ sys.path.append(str(Path(__file__).parent.parent))
 from mem0 import Memory
 import ollama
 from config.settings import load_config, AppConfig
+from core.embedding_cache import get_embedding_cache, install_cache
+from core.memory_pool import MemoryPool
+from core.memory_stats import MemoryStats, open_memory_stats
+from core.backend_health import CircuitBreaker, HealthMonitor, client_probe, http_probe
+from core.executor import configure_executor, get_executor, run_blocking
+from core.vector_store_ops import (
+    ensure_payload_index,
+    open_qdrant_local,
+    fetch_vectors,
+    insert_memories,
+    scroll_page,
+    search_by_vectors
+)
 
 logger = logging.getLogger(__name__)
 
@@ -32,109 +47,250 @@ class MemoryManager:
             config: 애플리케이션 설정
         """
         self.config = config or load_config()
-        self.user_memories = {}  # 사용자별 메모리 인스턴스
 
-        # Qdrant 연결 확인
-        self.use_qdrant = self._check_qdrant()
+        # mem0/Ollama 동기 호출은 제한된 스레드 풀에서 실행 (이벤트 루프 블로킹 방지)
+        configure_executor(self.config.blocking_workers, self.config.blocking_max_pending)
+
+        # 사용자별 메모리 인스턴스 풀 (크기/유휴 시간 제한 LRU)
+        self.user_memories = MemoryPool(
+            self._create_user_memory,
+            max_size=self.config.memory.memory_pool_size,
+            idle_seconds=self.config.memory.memory_pool_idle_seconds
+        )
+
+        # 멀티테넌트 모드: 컬렉션 하나를 공유하고 user_id 페이로드로 사용자 구분
+        self.multi_tenant = self.config.database.multi_tenant
+
+        # 모든 서비스가 공유하는 임베딩 캐시 (모델 이름이 키에 포함)
+        self.embedding_cache = get_embedding_cache(self.config)
 
         # data_dir을 Path 객체로 확인
         if not isinstance(self.config.data_dir, Path):
             self.config.data_dir = Path(self.config.data_dir)
 
-        # mem0 설정
-        if self.use_qdrant:
-            # Qdrant 사용
-            self.mem0_config = {
-                "llm": {
-                    "provider": "ollama",
-                    "config": {
-                        "model": self.config.models.chat_model,
-                        "temperature": 0.7,
-                        "max_tokens": 1000,
-                        "ollama_base_url": self.config.ollama_host
-                    }
-                },
-                "embedder": {
-                    "provider": "ollama",
-                    "config": {
-                        "model": self.config.models.embedding_model,
-                        "ollama_base_url": self.config.ollama_host
-                    }
-                },
-                "vector_store": {
-                    "provider": "qdrant",
-                    "config": {
-                        "host": self.config.database.qdrant_host,
-                        "port": self.config.database.qdrant_port,
-                        "collection_name": self.config.database.collection_name,
-                    }
-                },
-                "version": "v1.1"
+        # 백엔드별 사용자 통계 카운터 (추가/삭제/수정 때 증분 갱신, 재시작 후에도 유지)
+        self.backend_stats = {
+            backend: open_memory_stats(self.config.data_dir / f"memory_stats_{backend}.json")
+            for backend in ("qdrant", "chroma")
+        }
+        self._rebuilding: set = set()
+        self._rebuilding_lock = threading.Lock()
+
+        # 임베디드 Qdrant: 서버/HTTP 없이 같은 프로세스에서 디스크 저장소를 직접 사용
+        self.qdrant_local = self.config.database.vector_db_type == "qdrant_local"
+        # 상대 경로는 다른 데이터 경로(sqlite_path 등)처럼 base_dir 기준 (실행 위치와 무관)
+        qdrant_path = Path(self.config.database.qdrant_path)
+        if not qdrant_path.is_absolute():
+            qdrant_path = Path(self.config.base_dir) / qdrant_path
+        self.qdrant_path = str(qdrant_path.resolve())
+        if self.qdrant_local:
+            qdrant_store = {
+                "collection_name": self.config.database.collection_name,
+                "path": self.qdrant_path,
+                "on_disk": True
             }
         else:
-            # ChromaDB 폴백
-            self.mem0_config = {
-                "llm": {
-                    "provider": "ollama",
-                    "config": {
-                        "model": self.config.models.chat_model,
-                        "temperature": 0.7,
-                        "max_tokens": 1000,
-                        "ollama_base_url": self.config.ollama_host
-                    }
-                },
-                "embedder": {
-                    "provider": "ollama",
-                    "config": {
-                        "model": self.config.models.embedding_model,
-                        "ollama_base_url": self.config.ollama_host
-                    }
-                },
-                "vector_store": {
-                    "provider": "chroma",
-                    "config": {
-                        "collection_name": "memories",
-                        "path": str(self.config.data_dir / "chroma_db")
-                    }
-                },
-                "version": "v1.1"
+            qdrant_store = {
+                "host": self.config.database.qdrant_host,
+                "port": self.config.database.qdrant_port,
+                "collection_name": self.config.database.collection_name,
             }
 
+        # 백엔드별 mem0 설정 (Qdrant 장애 시 ChromaDB로 전환)
+        self.mem0_configs = {
+            "qdrant": self._build_mem0_config({
+                "provider": "qdrant",
+                "config": qdrant_store
+            }),
+            "chroma": self._build_mem0_config({
+                "provider": "chroma",
+                "config": {
+                    "collection_name": "memories",
+                    "path": str(self.config.data_dir / "chroma_db")
+                }
+            })
+        }
+        self._default_memories: Dict[str, Optional[Memory]] = {}
+        self._default_lock = threading.Lock()
+
+        # Qdrant 상태 감시 (백그라운드 헬스 체크 + 차단기, 요청 경로는 캐시된 상태만 읽음)
+        database = self.config.database
+        if self.qdrant_local:
+            probe = client_probe(lambda: open_qdrant_local(self.qdrant_path))
+        else:
+            probe = http_probe(
+                f"http://{database.qdrant_host}:{database.qdrant_port}/",
+                database.qdrant_probe_timeout
+            )
+        self.qdrant_monitor = HealthMonitor(
+            "Qdrant",
+            probe,
+            CircuitBreaker(database.qdrant_failure_threshold),
+            interval=database.qdrant_health_interval,
+            on_change=self._on_backend_change
+        )
+        if self.qdrant_monitor.check():
+            if self.qdrant_local:
+                logger.info(f"✅ 임베디드 Qdrant 사용: {self.qdrant_path}")
+            else:
+                logger.info("✅ Qdrant 서버 연결 성공")
+        else:
+            self.qdrant_monitor.breaker.trip()
+            logger.warning("Qdrant 연결 실패 - ChromaDB 사용 (복구되면 자동 전환)")
+        self.qdrant_monitor.start()
+
         # 기본 메모리 인스턴스 생성
         self._initialize_default_memory()
 
-    def _check_qdrant(self) -> bool:
-        """Qdrant 서버 연결 확인"""
-        try:
-            response = requests.get(
-                f"http://{self.config.database.qdrant_host}:{self.config.database.qdrant_port}/",
-                timeout=2
-            )
-            if response.status_code == 200:
-                logger.info("✅ Qdrant 서버 연결 성공")
-                return True
-        except Exception as e:
-            logger.warning(f"Qdrant 연결 실패: {e}")
+    def _build_mem0_config(self, vector_store: Dict[str, Any]) -> Dict[str, Any]:
+        """벡터 저장소 설정으로 mem0 설정 생성"""
+        return {
+            "llm": {
+                "provider": "ollama",
+                "config": {
+                    "model": self.config.models.chat_model,
+                    "temperature": 0.7,
+                    "max_tokens": 1000,
+                    "ollama_base_url": self.config.ollama_host
+                }
+            },
+            "embedder": {
+                "provider": "ollama",
+                "config": {
+                    "model": self.config.models.embedding_model,
+                    "ollama_base_url": self.config.ollama_host
+                }
+            },
+            "vector_store": vector_store,
+            "version": "v1.1"
+        }
+
+    def _resolve_config(self, config: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Memory 생성 직전 설정 보완
+
+        임베디드 Qdrant는 공유 클라이언트를 넘겨 인스턴스마다 저장소를 따로 열지 않도록 함
+        (설정 dict는 깊은 복사되므로 클라이언트는 생성 직전에만 넣음)
+        """
+        vector_store = config["vector_store"]
+        if vector_store["provider"] == "qdrant" and "path" in vector_store["config"]:
+            config = dict(config)
+            config["vector_store"] = {
+                "provider": "qdrant",
+                "config": dict(
+                    vector_store["config"],
+                    client=open_qdrant_local(vector_store["config"]["path"])
+                )
+            }
+        return config
+
+    @property
+    def backend(self) -> str:
+        """현재 요청을 보낼 백엔드 (캐시된 헬스 체크 결과, 네트워크 호출 없음)"""
+        return "qdrant" if self.qdrant_monitor.healthy else "chroma"
+
+    @property
+    def use_qdrant(self) -> bool:
+        return self.backend == "qdrant"
+
+    @property
+    def mem0_config(self) -> Dict[str, Any]:
+        """현재 백엔드의 mem0 설정"""
+        return self.mem0_configs[self.backend]
+
+    @property
+    def memory_stats(self) -> MemoryStats:
+        """현재 백엔드의 통계 카운터"""
+        return self.backend_stats[self.backend]
+
+    @property
+    def default_memory(self) -> Optional[Memory]:
+        """현재 백엔드의 기본 메모리 인스턴스"""
+        return self._get_default_memory()
 
-        return False
+    def _on_backend_change(self, healthy: bool):
+        """백엔드 전환 (통계 카운터는 백엔드별로 따로 유지하므로 버리지 않음)"""
+        logger.info(f"벡터 저장소 전환: {'Qdrant' if healthy else 'ChromaDB'}")
+
+    def _on_backend_error(self, error: Exception) -> bool:
+        """
+        요청 실패 처리
+
+        Qdrant로 보낸 요청이 실패하면 바로 헬스 체크를 하고, 응답이 없으면 차단기를 열어
+        이후 요청이 타임아웃을 기다리지 않고 ChromaDB로 가도록 함
+
+        Returns:
+            bool: 폴백으로 재시도할 수 있으면 True
+        """
+        if not self.use_qdrant or self.qdrant_monitor.check():
+            return False
+        logger.warning(f"Qdrant 요청 실패: {error}")
+        self.qdrant_monitor.trip()
+        return True
+
+    def get_backend_status(self) -> Dict[str, Any]:
+        """백엔드 상태 (현재 백엔드, 차단기 상태)"""
+        status = self.qdrant_monitor.stats()
+        status["backend"] = self.backend
+        return status
+
+    def close(self):
+        """헬스 체크 스레드와 메모리 인스턴스 정리"""
+        self.qdrant_monitor.stop()
+        self.user_memories.clear()
+        for stats in self.backend_stats.values():
+            stats.save()
 
     def _initialize_default_memory(self):
         """기본 메모리 인스턴스 초기화"""
+        memory = self._get_default_memory()
+        if memory is not None:
+            if self.use_qdrant:
+                logger.info("mem0 메모리 시스템 초기화 완료 (Qdrant 사용)")
+            else:
+                logger.info("mem0 메모리 시스템 초기화 완료 (ChromaDB 사용)")
+
+    def _get_default_memory(self) -> Optional[Memory]:
+        """현재 백엔드의 기본 메모리 인스턴스 (처음 쓸 때 생성)"""
+        backend = self.backend
+        with self._default_lock:
+            if backend in self._default_memories:
+                return self._default_memories[backend]
+
+            memory = self._create_default_memory(backend)
+            if memory is None and backend == "qdrant":
+                # Qdrant 인스턴스를 만들 수 없으면 차단기를 열고 ChromaDB 사용
+                self.qdrant_monitor.trip()
+                backend = "chroma"
+                if backend in self._default_memories:
+                    return self._default_memories[backend]
+                memory = self._create_default_memory(backend)
+
+            # ChromaDB 실패는 이전처럼 고정 (Qdrant는 복구 후 다시 시도)
+            if memory is not None or backend == "chroma":
+                self._default_memories[backend] = memory
+            return memory
+
+    def _create_default_memory(self, backend: str) -> Optional[Memory]:
+        """백엔드의 기본 메모리 인스턴스 생성"""
         try:
-            if not self.use_qdrant:
+            if backend == "chroma":
                 # ChromaDB 디렉토리 생성
                 chroma_dir = self.config.data_dir / "chroma_db"
                 chroma_dir.mkdir(parents=True, exist_ok=True)
 
-            self.default_memory = Memory.from_config(self.mem0_config)
+            memory = Memory.from_config(self._resolve_config(self.mem0_configs[backend]))
+            install_cache(memory, self.embedding_cache, self.config.models.embedding_model)
 
-            if self.use_qdrant:
-                logger.info("mem0 메모리 시스템 초기화 완료 (Qdrant 사용)")
-            else:
-                logger.info("mem0 메모리 시스템 초기화 완료 (ChromaDB 사용)")
+            if self.multi_tenant:
+                # 모든 검색이 user_id로 필터링되므로 페이로드 인덱스 필요
+                ensure_payload_index(memory.vector_store, "user_id")
+            return memory
 
         except Exception as e:
-            logger.error(f"mem0 초기화 실패: {e}")
+            logger.error(f"mem0 초기화 실패 ({backend}): {e}")
+            if backend == "qdrant":
+                return None
             # 최소 설정으로 재시도
             try:
                 # 더 간단한 설정으로 재시도
@@ -147,16 +303,17 @@ class MemoryManager:
                         }
                     }
                 }
-                self.default_memory = Memory.from_config(simple_config)
+                memory = Memory.from_config(simple_config)
                 logger.warning("간소화된 설정으로 mem0 초기화 완료")
+                return memory
             except Exception as e2:
                 logger.error(f"mem0 초기화 완전 실패: {e2}")
                 # 메모리 없이도 기본 동작은 가능하도록
-                self.default_memory = None
+                return None
 
     def get_user_memory(self, user_id: str) -> Optional[Memory]:
         """
-        사용자별 메모리 인스턴스 가져오기
+        사용자별 메모리 인스턴스 가져오기 (현재 백엔드 기준)
 
         Args:
             user_id: 사용자 ID
@@ -164,31 +321,145 @@ class MemoryManager:
         Returns:
             Memory: 사용자 메모리 인스턴스
         """
-        if self.default_memory is None:
-            logger.warning("메모리 시스템이 초기화되지 않았습니다")
-            return None
+        return self._acquire_user_memory(user_id, borrow=False)[0]
 
-        if user_id not in self.user_memories:
-            # 사용자별 컬렉션 이름 생성
-            user_collection = f"user_{user_id}_memories"
+    def _acquire_user_memory(self, user_id: str, borrow: bool = True) -> Tuple[Optional[Memory], bool]:
+        """
+        사용자별 메모리 인스턴스 가져오기
 
-            user_config = self.mem0_config.copy()
-            user_config["vector_store"]["config"]["collection_name"] = user_collection
+        Returns:
+            (인스턴스, 풀에서 빌렸는지 여부 - True면 사용 후 user_memories.release 필요)
+        """
+        default_memory = self._get_default_memory()
+        if default_memory is None:
+            logger.warning("메모리 시스템이 초기화되지 않았습니다")
+            return None, False
+
+        if self.multi_tenant:
+            return default_memory, False
+
+        # 풀 키에 백엔드를 포함해 전환 후에도 다른 백엔드의 인스턴스를 섞어 쓰지 않음
+        key = f"{self.backend}/{user_id}"
+        memory = self.user_memories.acquire(key) if borrow else self.user_memories.get(key)
+        if memory is None:
+            return default_memory, False
+        return memory, borrow
+
+    @asynccontextmanager
+    async def _user_memory(self, user_id: str) -> AsyncIterator[Optional[Memory]]:
+        """요청 동안 사용자 메모리 인스턴스 빌리기 (그 사이 풀에서 내보내져도 연결을 닫지 않음)"""
+        memory, borrowed = await run_blocking(self._acquire_user_memory, user_id)
+        try:
+            yield memory
+        finally:
+            if borrowed:
+                self.user_memories.release(memory)
 
+    async def _read_with_failover(self, user_id: str, func: Callable[[Memory], Any]) -> Any:
+        """
+        읽기 호출 실행 - Qdrant가 응답하지 않으면 차단기를 열고 ChromaDB로 한 번 재시도
+        """
+        async with self._user_memory(user_id) as memory:
+            if memory is None:
+                raise RuntimeError("메모리 시스템을 사용할 수 없습니다")
             try:
-                self.user_memories[user_id] = Memory.from_config(user_config)
-                logger.info(f"사용자 {user_id}의 메모리 인스턴스 생성")
+                return await run_blocking(func, memory)
             except Exception as e:
-                logger.error(f"사용자 메모리 생성 실패: {e}")
-                return self.default_memory
+                if not await run_blocking(self._on_backend_error, e):
+                    raise
+                error = e
+
+        # 차단기가 열렸으므로 다시 빌리면 폴백 백엔드의 인스턴스
+        async with self._user_memory(user_id) as memory:
+            if memory is None:
+                raise error
+            return await run_blocking(func, memory)
+
+    def _check_owner(self, memory: Memory, memory_id: str, user_id: str) -> bool:
+        """
+        메모리 소유자 확인
+
+        사용자별 컬렉션은 컬렉션 자체로 격리되지만, 멀티테넌트 모드에서는
+        ID만으로 다른 사용자의 메모리에 접근할 수 있으므로 페이로드의 user_id 확인
+        """
+        if not self.multi_tenant:
+            return True
+        item = memory.get(memory_id)
+        if not item or item.get("user_id") != user_id:
+            logger.warning(f"다른 사용자의 메모리 접근 거부: {memory_id}")
+            return False
+        return True
+
+    def _create_user_memory(self, key: str) -> Optional[Memory]:
+        """사용자별 컬렉션을 쓰는 메모리 인스턴스 생성 (풀 factory, 키는 "백엔드/사용자 ID")"""
+        backend, user_id = key.split("/", 1)
+
+        # 사용자별 컬렉션 이름 생성 (설정은 깊은 복사 - 공유 dict 변경 방지)
+        user_collection = f"user_{user_id}_memories"
+
+        user_config = copy.deepcopy(self.mem0_configs[backend])
+        user_config["vector_store"]["config"]["collection_name"] = user_collection
+
+        try:
+            memory = Memory.from_config(self._resolve_config(user_config))
+            install_cache(memory, self.embedding_cache, self.config.models.embedding_model)
+            logger.info(f"사용자 {user_id}의 메모리 인스턴스 생성")
+            return memory
+        except Exception as e:
+            logger.error(f"사용자 메모리 생성 실패: {e}")
+            if backend == "qdrant":
+                self.qdrant_monitor.check_now()
+            return None
+
+    def get_pool_stats(self) -> Dict[str, Any]:
+        """사용자 메모리 인스턴스 풀 통계 (hit/miss/eviction)"""
+        return self.user_memories.stats()
+
+    def _record_add_events(self, user_id: str, result: Any, metadata: Dict[str, Any]):
+        """
+        mem0 add 결과를 통계에 반영
+
+        mem0는 추론 결과에 따라 기존 메모리를 수정/삭제할 수도 있으므로
+        ADD 이벤트만 있을 때만 증분 반영하고, 그 외에는 카운터를 버려 다음 조회 때 다시 계산
+        """
+        if isinstance(result, dict):
+            result = result.get("results", [result])
+        if not isinstance(result, list):
+            self.memory_stats.invalidate(user_id)
+            return
+
+        items = [item for item in result if isinstance(item, dict)]
+        if len(items) != len(result) or any(item.get("event", "ADD") != "ADD" for item in items):
+            self.memory_stats.invalidate(user_id)
+            return
 
-        return self.user_memories[user_id]
+        for _ in items:
+            self.memory_stats.on_add(user_id, metadata)
+
+    async def _stats_metadata(
+        self,
+        memory: Memory,
+        memory_id: str,
+        user_id: str
+    ) -> Optional[Dict[str, Any]]:
+        """수정/삭제 전 메타데이터 조회 (통계가 계산된 사용자만, 실패하면 카운터를 버림)"""
+        if not self.memory_stats.has(user_id):
+            return None
+        try:
+            item = await run_blocking(memory.get, memory_id)
+        except Exception:
+            item = None
+        if not item:
+            self.memory_stats.invalidate(user_id)
+            return None
+        return item.get("metadata") or {}
 
     async def add_memory(
         self,
         text: str,
         user_id: str,
-        metadata: Optional[Dict[str, Any]] = None
+        metadata: Optional[Dict[str, Any]] = None,
+        raise_errors: bool = False
     ) -> str:
         """
         메모리 추가
@@ -197,56 +468,147 @@ class MemoryManager:
             text: 저장할 텍스트
             user_id: 사용자 ID
             metadata: 추가 메타데이터
+            raise_errors: 실패 시 임시 ID 대신 예외를 던짐 (수집 큐 재시도용)
 
         Returns:
             str: 메모리 ID
         """
         try:
-            memory = self.get_user_memory(user_id)
-            if memory is None:
-                logger.warning("메모리 시스템을 사용할 수 없습니다")
-                return f"temp_{datetime.now().timestamp()}"
-
-            # 메타데이터 준비
-            if metadata is None:
-                metadata = {}
-
-            metadata.update({
-                "user_id": user_id,
-                "timestamp": datetime.now().isoformat(),
-                "source": "manual" if metadata.get("source") is None else metadata["source"]
-            })
-
-            # mem0에 메모리 추가
-            result = memory.add(
-                text,
-                user_id=user_id,
-                metadata=metadata
-            )
-
-            # mem0는 리스트를 반환할 수 있음
-            if isinstance(result, list):
-                if result and len(result) > 0:
-                    memory_id = result[0].get("id", str(datetime.now().timestamp()))
-                else:
-                    # 빈 리스트인 경우 임시 ID
+            async with self._user_memory(user_id) as memory:
+                if memory is None:
+                    logger.warning("메모리 시스템을 사용할 수 없습니다")
+                    if raise_errors:
+                        raise RuntimeError("메모리 시스템을 사용할 수 없습니다")
+                    return f"temp_{datetime.now().timestamp()}"
+
+                # 메타데이터 준비
+                if metadata is None:
+                    metadata = {}
+
+                metadata.update({
+                    "user_id": user_id,
+                    "timestamp": datetime.now().isoformat(),
+                    "source": "manual" if metadata.get("source") is None else metadata["source"]
+                })
+
+                # mem0에 메모리 추가
+                result = await run_blocking(
+                    memory.add,
+                    text,
+                    user_id=user_id,
+                    metadata=metadata
+                )
+
+                # mem0는 리스트를 반환할 수 있음
+                if isinstance(result, list):
+                    if result and len(result) > 0:
+                        memory_id = result[0].get("id", str(datetime.now().timestamp()))
+                    else:
+                        # 빈 리스트인 경우 임시 ID
+                        memory_id = f"mem_{datetime.now().timestamp()}"
+                elif isinstance(result, dict):
+                    memory_id = result.get("id", str(datetime.now().timestamp()))
+                elif result is None:
+                    # None인 경우 임시 ID
                     memory_id = f"mem_{datetime.now().timestamp()}"
-            elif isinstance(result, dict):
-                memory_id = result.get("id", str(datetime.now().timestamp()))
-            elif result is None:
-                # None인 경우 임시 ID
-                memory_id = f"mem_{datetime.now().timestamp()}"
-            else:
-                memory_id = str(result)
+                else:
+                    memory_id = str(result)
 
-            logger.info(f"메모리 추가 완료: {memory_id}")
-            return memory_id
+                self._record_add_events(user_id, result, metadata)
+
+                logger.info(f"메모리 추가 완료: {memory_id}")
+                return memory_id
 
         except Exception as e:
             logger.error(f"메모리 추가 실패: {e}")
+            if raise_errors:
+                raise
             # 실패해도 임시 ID 반환
             return f"temp_{datetime.now().timestamp()}"
 
+    async def add_memories(
+        self,
+        items: List[Any],
+        user_id: str,
+        raise_errors: bool = False
+    ) -> List[str]:
+        """
+        메모리 여러 개 추가 (배치 임베딩 + 청크 upsert)
+
+        Args:
+            items: 텍스트 또는 {"text": ..., "metadata": {...}} 목록
+            user_id: 사용자 ID
+            raise_errors: 실패 시 임시 ID 대신 예외를 던짐 (수집 큐 재시도용)
+
+        Returns:
+            List[str]: 메모리 ID 목록 (입력 순서)
+        """
+        try:
+            async with self._user_memory(user_id) as memory:
+                if memory is None:
+                    logger.warning("메모리 시스템을 사용할 수 없습니다")
+                    if raise_errors:
+                        raise RuntimeError("메모리 시스템을 사용할 수 없습니다")
+                    return [f"temp_{datetime.now().timestamp()}" for _ in items]
+
+                texts, metadatas = [], []
+                timestamp = datetime.now().isoformat()
+                for item in items:
+                    if isinstance(item, str):
+                        item = {"text": item}
+                    metadata = dict(item.get("metadata") or {})
+                    metadata.update({
+                        "user_id": user_id,
+                        "timestamp": timestamp,
+                        "source": metadata.get("source") or "manual"
+                    })
+                    texts.append(item["text"])
+                    metadatas.append(metadata)
+
+                if not texts:
+                    return []
+
+                memory_ids = await run_blocking(self._embed_and_insert, memory, texts, metadatas, user_id)
+                for metadata in metadatas:
+                    self.memory_stats.on_add(user_id, metadata)
+
+                logger.info(f"메모리 일괄 추가 완료: {len(memory_ids)}개")
+                return memory_ids
+
+        except Exception as e:
+            logger.error(f"메모리 일괄 추가 실패: {e}")
+            if raise_errors:
+                raise
+            return [f"temp_{datetime.now().timestamp()}" for _ in items]
+
+    def _embed_and_insert(
+        self,
+        memory: Memory,
+        texts: List[str],
+        metadatas: List[Dict[str, Any]],
+        user_id: str
+    ) -> List[str]:
+        """배치 임베딩 후 청크 upsert (블로킹, 실행기에서 호출)"""
+        # 임베딩은 배치 요청 (캐시에 있는 텍스트는 건너뜀)
+        embedder = memory.embedding_model
+        batch_size = self.config.memory.ingest_embed_batch_size
+        vectors = []
+        for start in range(0, len(texts), batch_size):
+            chunk = texts[start:start + batch_size]
+            if hasattr(embedder, "embed_batch"):
+                vectors.extend(embedder.embed_batch(chunk, "add"))
+            else:
+                vectors.extend(embedder.embed(text, "add") for text in chunk)
+
+        return insert_memories(
+            memory.vector_store,
+            vectors,
+            texts,
+            metadatas,
+            user_id,
+            batch_size=self.config.memory.ingest_upsert_batch_size
+        )
+
     async def search_memories(
         self,
         query: str,
@@ -267,15 +629,10 @@ class MemoryManager:
             List[Dict]: 검색 결과
         """
         try:
-            memory = self.get_user_memory(user_id)
-            if memory is None:
-                return []
-
-            # mem0 검색
-            results = memory.search(
-                query=query,
-                user_id=user_id,
-                limit=limit
+            # mem0 검색 (Qdrant 장애 시 ChromaDB로 재시도)
+            results = await self._read_with_failover(
+                user_id,
+                lambda memory: memory.search(query=query, user_id=user_id, limit=limit)
             )
 
             # 결과가 리스트가 아닌 경우 처리
@@ -302,37 +659,69 @@ class MemoryManager:
         limit: int = 100
     ) -> List[Dict[str, Any]]:
         """
-        사용자의 모든 메모리 가져오기
+        사용자의 메모리 가져오기 (필요한 만큼만 페이지 단위로 조회)
 
         Args:
             user_id: 사용자 ID
-            limit: 최대 개수
+            limit: 최대 개수 (0 또는 None이면 전체)
 
         Returns:
             List[Dict]: 메모리 목록
         """
-        try:
-            memory = self.get_user_memory(user_id)
-            if memory is None:
-                return []
-
-            # mem0에서 전체 메모리 가져오기
-            all_memories = memory.get_all(user_id=user_id)
-
-            # 결과가 None이거나 리스트가 아닌 경우 처리
-            if not all_memories or not isinstance(all_memories, list):
-                return []
+        memories: List[Dict[str, Any]] = []
+        page_size = min(limit, 100) if limit else 100
+        async for page in self.iter_memories(user_id, page_size=page_size):
+            memories.extend(page)
+            if limit and len(memories) >= limit:
+                break
+
+        if limit:
+            memories = memories[:limit]
+        logger.info(f"전체 메모리 조회: {len(memories)}개")
+        return memories
+
+    async def list_memories(
+        self,
+        user_id: str,
+        limit: int = 20,
+        cursor: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """
+        메모리 한 페이지 조회 (벡터 저장소 scroll, 비용은 페이지 크기에 비례)
 
-            # 제한 적용
-            if limit and len(all_memories) > limit:
-                all_memories = all_memories[:limit]
+        Args:
+            user_id: 사용자 ID
+            limit: 페이지 크기
+            cursor: 이전 페이지의 next_cursor (첫 페이지는 None)
 
-            logger.info(f"전체 메모리 조회: {len(all_memories)}개")
-            return all_memories
+        Returns:
+            Dict: {"memories": [...], "next_cursor": 다음 커서 또는 None}
+        """
+        try:
+            memories, next_cursor = await self._read_with_failover(
+                user_id,
+                lambda memory: scroll_page(memory.vector_store, user_id, limit, cursor)
+            )
+            return {"memories": memories, "next_cursor": next_cursor}
 
         except Exception as e:
             logger.error(f"메모리 조회 실패: {e}")
-            return []
+            return {"memories": [], "next_cursor": None}
+
+    async def iter_memories(
+        self,
+        user_id: str,
+        page_size: int = 100
+    ) -> AsyncIterator[List[Dict[str, Any]]]:
+        """메모리를 페이지 단위로 순회하는 async generator"""
+        cursor = None
+        while True:
+            page = await self.list_memories(user_id, limit=page_size, cursor=cursor)
+            if page["memories"]:
+                yield page["memories"]
+            cursor = page["next_cursor"]
+            if not cursor:
+                break
 
     async def update_memory(
         self,
@@ -354,24 +743,35 @@ class MemoryManager:
             bool: 성공 여부
         """
         try:
-            memory = self.get_user_memory(user_id)
-            if memory is None:
-                return False
-
-            # 메타데이터 업데이트
-            if metadata is None:
-                metadata = {}
-            metadata["updated_at"] = datetime.now().isoformat()
-
-            # mem0 업데이트
-            memory.update(
-                memory_id=memory_id,
-                text=text,
-                metadata=metadata
-            )
-
-            logger.info(f"메모리 업데이트 완료: {memory_id}")
-            return True
+            async with self._user_memory(user_id) as memory:
+                if memory is None:
+                    return False
+
+                # 메타데이터 업데이트
+                if metadata is None:
+                    metadata = {}
+                metadata["updated_at"] = datetime.now().isoformat()
+
+                if not await run_blocking(self._check_owner, memory, memory_id, user_id):
+                    return False
+
+                old_metadata = await self._stats_metadata(memory, memory_id, user_id)
+
+                # mem0 업데이트
+                await run_blocking(
+                    memory.update,
+                    memory_id=memory_id,
+                    text=text,
+                    metadata=metadata
+                )
+
+                if old_metadata is not None:
+                    new_metadata = dict(old_metadata)
+                    new_metadata.update(metadata)
+                    self.memory_stats.on_update(user_id, old_metadata, new_metadata)
+
+                logger.info(f"메모리 업데이트 완료: {memory_id}")
+                return True
 
         except Exception as e:
             logger.error(f"메모리 업데이트 실패: {e}")
@@ -393,15 +793,23 @@ class MemoryManager:
             bool: 성공 여부
         """
         try:
-            memory = self.get_user_memory(user_id)
-            if memory is None:
-                return False
+            async with self._user_memory(user_id) as memory:
+                if memory is None:
+                    return False
 
-            # mem0에서 삭제
-            memory.delete(memory_id=memory_id)
+                if not await run_blocking(self._check_owner, memory, memory_id, user_id):
+                    return False
 
-            logger.info(f"메모리 삭제 완료: {memory_id}")
-            return True
+                old_metadata = await self._stats_metadata(memory, memory_id, user_id)
+
+                # mem0에서 삭제
+                await run_blocking(memory.delete, memory_id=memory_id)
+
+                if old_metadata is not None:
+                    self.memory_stats.on_delete(user_id, old_metadata)
+
+                logger.info(f"메모리 삭제 완료: {memory_id}")
+                return True
 
         except Exception as e:
             logger.error(f"메모리 삭제 실패: {e}")
@@ -413,27 +821,31 @@ class MemoryManager:
         user_id: str
     ) -> Optional[Dict[str, Any]]:
         """
-        ID로 특정 메모리 가져오기
+        ID로 특정 메모리 가져오기 (벡터 저장소 포인트 조회, O(1))
 
         Args:
             memory_id: 메모리 ID
             user_id: 사용자 ID
 
         Returns:
-            Dict: 메모리 정보
+            Dict: 메모리 정보 (없거나 다른 사용자의 메모리면 None)
         """
         try:
-            memory = self.get_user_memory(user_id)
-            if memory is None:
-                return None
+            async with self._user_memory(user_id) as memory:
+                if memory is None:
+                    return None
 
-            # 전체 메모리에서 ID로 찾기
-            all_memories = await self.get_all_memories(user_id)
-            for mem in all_memories:
-                if mem.get("id") == memory_id:
-                    return mem
+                # mem0 get()은 벡터 저장소의 ID 조회 한 번 (전체 목록을 훑지 않음)
+                item = await run_blocking(memory.get, memory_id)
+                if not item:
+                    return None
 
-            return None
+                owner = item.get("user_id")
+                if owner is not None and owner != user_id:
+                    logger.warning(f"다른 사용자의 메모리 접근 거부: {memory_id}")
+                    return None
+
+                return item
 
         except Exception as e:
             logger.error(f"메모리 조회 실패: {e}")
@@ -446,7 +858,7 @@ class MemoryManager:
         limit: int = 5
     ) -> List[Dict[str, Any]]:
         """
-        관련 메모리 찾기
+        관련 메모리 찾기 (저장된 벡터로 직접 kNN, 재임베딩 없음)
 
         Args:
             memory_id: 기준 메모리 ID
@@ -454,30 +866,102 @@ class MemoryManager:
             limit: 최대 개수
 
         Returns:
-            List[Dict]: 관련 메모리 목록
+            List[Dict]: 관련 메모리 목록 (기준 메모리 제외)
+        """
+        related = await self.get_related_memories_bulk([memory_id], user_id, limit)
+        return related.get(memory_id, [])
+
+    async def get_related_memories_bulk(
+        self,
+        memory_ids: List[str],
+        user_id: str,
+        limit: int = 5
+    ) -> Dict[str, List[Dict[str, Any]]]:
+        """
+        여러 기준 메모리의 관련 메모리를 한 번에 찾기
+
+        저장된 벡터를 한 번에 조회한 뒤 배치 kNN 한 번으로 처리하고,
+        기준 메모리 자신은 쿼리 필터에서 제외
+
+        Args:
+            memory_ids: 기준 메모리 ID 목록
+            user_id: 사용자 ID
+            limit: 기준 메모리별 최대 개수
+
+        Returns:
+            Dict[str, List[Dict]]: 기준 메모리 ID → 관련 메모리 목록
         """
         try:
-            # 기준 메모리 가져오기
-            base_memory = await self.get_memory_by_id(memory_id, user_id)
-            if not base_memory:
-                return []
-
-            # 기준 메모리의 텍스트로 유사한 메모리 검색
-            related = await self.search_memories(
-                query=base_memory.get("text", ""),
-                user_id=user_id,
-                limit=limit + 1  # 자기 자신 포함
-            )
+            async with self._user_memory(user_id) as memory:
+                if memory is None or not memory_ids:
+                    return {}
 
-            # 자기 자신 제외
-            related = [r for r in related if r.get("id") != memory_id]
+                memory_ids, related = await run_blocking(
+                    self._related_by_vectors, memory, memory_ids, user_id, limit
+                )
 
-            return related[:limit]
+                # 벡터를 가져올 수 없는 경우에만 텍스트로 검색
+                for memory_id in memory_ids:
+                    if memory_id not in related:
+                        related[memory_id] = await self._related_by_text(memory_id, user_id, limit)
+
+                return related
 
         except Exception as e:
             logger.error(f"관련 메모리 검색 실패: {e}")
+            return {}
+
+    def _related_by_vectors(
+        self,
+        memory: Memory,
+        memory_ids: List[str],
+        user_id: str,
+        limit: int
+    ):
+        """
+        저장된 벡터로 배치 kNN (블로킹, 실행기에서 호출)
+
+        Returns:
+            (접근 가능한 기준 ID 목록, 기준 ID → 관련 메모리 목록)
+        """
+        memory_ids = [
+            memory_id for memory_id in memory_ids
+            if self._check_owner(memory, memory_id, user_id)
+        ]
+
+        vectors = fetch_vectors(memory.vector_store, memory_ids)
+        found = [memory_id for memory_id in memory_ids if memory_id in vectors]
+
+        related: Dict[str, List[Dict[str, Any]]] = {}
+        if found:
+            results = search_by_vectors(
+                memory.vector_store,
+                [vectors[memory_id] for memory_id in found],
+                limit=limit,
+                user_id=user_id,
+                exclude_ids=found
+            )
+            related.update(zip(found, results))
+        return memory_ids, related
+
+    async def _related_by_text(
+        self,
+        memory_id: str,
+        user_id: str,
+        limit: int
+    ) -> List[Dict[str, Any]]:
+        """기준 메모리 텍스트로 검색 (저장된 벡터가 없을 때의 폴백)"""
+        base_memory = await self.get_memory_by_id(memory_id, user_id)
+        if not base_memory:
             return []
 
+        related = await self.search_memories(
+            query=base_memory.get("memory") or base_memory.get("text", ""),
+            user_id=user_id,
+            limit=limit + 1  # 자기 자신 포함
+        )
+        return [r for r in related if r.get("id") != memory_id][:limit]
+
     async def extract_memories_from_conversation(
         self,
         conversation: str,
@@ -494,28 +978,31 @@ class MemoryManager:
             List[str]: 추출된 메모리 ID 목록
         """
         try:
-            memory = self.get_user_memory(user_id)
-            if memory is None:
-                return []
+            async with self._user_memory(user_id) as memory:
+                if memory is None:
+                    return []
+
+                # mem0의 자동 추출 기능 사용
+                extracted = await run_blocking(
+                    memory.add,
+                    conversation,
+                    user_id=user_id,
+                    metadata={
+                        "source": "conversation",
+                        "auto_extracted": True,
+                        "timestamp": datetime.now().isoformat()
+                    }
+                )
 
-            # mem0의 자동 추출 기능 사용
-            extracted = memory.add(
-                conversation,
-                user_id=user_id,
-                metadata={
-                    "source": "conversation",
-                    "auto_extracted": True,
-                    "timestamp": datetime.now().isoformat()
-                }
-            )
+                self._record_add_events(user_id, extracted, {"source": "conversation"})
 
-            # 추출된 메모리 ID 목록 반환
-            if isinstance(extracted, list):
-                return [item.get("id", str(item)) for item in extracted]
-            elif isinstance(extracted, dict):
-                return [extracted.get("id", str(extracted))]
-            else:
-                return [str(extracted)]
+                # 추출된 메모리 ID 목록 반환
+                if isinstance(extracted, list):
+                    return [item.get("id", str(item)) for item in extracted]
+                elif isinstance(extracted, dict):
+                    return [extracted.get("id", str(extracted))]
+                else:
+                    return [str(extracted)]
 
         except Exception as e:
             logger.error(f"대화에서 메모리 추출 실패: {e}")
@@ -523,7 +1010,10 @@ class MemoryManager:
 
     def get_statistics(self, user_id: str) -> Dict[str, Any]:
         """
-        사용자 메모리 통계
+        사용자 메모리 통계 (증분 갱신되는 카운터 조회)
+
+        카운터가 없거나 stale이면 저장소 순회는 백그라운드에서 시작하고 마지막으로 알던 값
+        (처음 조회하는 사용자는 0)을 바로 반환 - 화면 렌더링이 전체 순회를 기다리지 않음
 
         Args:
             user_id: 사용자 ID
@@ -532,27 +1022,13 @@ class MemoryManager:
             Dict: 통계 정보
         """
         try:
-            memories = self.get_all_memories(user_id)
-            if not isinstance(memories, list):
-                memories = []
-
-            # 카테고리별 분류
-            categories = {}
-            for mem in memories:
-                metadata = mem.get("metadata", {})
-                category = metadata.get("category", "uncategorized")
-                categories[category] = categories.get(category, 0) + 1
-
-            stats = {
-                "total_memories": len(memories),
-                "categories": categories,
-                "last_updated": max(
-                    (m.get("metadata", {}).get("timestamp", "") for m in memories),
-                    default=""
-                ) if memories else "",
-                "storage_type": "Qdrant" if self.use_qdrant else "ChromaDB"
-            }
+            stats = self.memory_stats.get(user_id)
+            if stats is None or self.memory_stats.is_stale(user_id):
+                self._schedule_rebuild(user_id)
+            if stats is None:
+                stats = {"total_memories": 0, "categories": {}, "last_updated": ""}
 
+            stats["storage_type"] = "Qdrant" if self.use_qdrant else "ChromaDB"
             return stats
 
         except Exception as e:
@@ -562,4 +1038,55 @@ class MemoryManager:
                 "categories": {},
                 "last_updated": "",
                 "storage_type": "Unknown"
-            }
\ No newline at end of file
+            }
+
+    def _schedule_rebuild(self, user_id: str):
+        """사용자 통계 재계산을 실행기에서 시작 (같은 백엔드/사용자는 동시에 하나만)"""
+        key = f"{self.backend}/{user_id}"
+        with self._rebuilding_lock:
+            if key in self._rebuilding:
+                return
+            self._rebuilding.add(key)
+
+        def rebuild():
+            try:
+                self.rebuild_statistics(user_id)
+            except Exception as e:
+                logger.warning(f"통계 재계산 실패 ({user_id}): {e}")
+            finally:
+                with self._rebuilding_lock:
+                    self._rebuilding.discard(key)
+
+        get_executor().submit(rebuild)
+
+    def rebuild_statistics(self, user_id: str) -> Dict[str, Any]:
+        """
+        저장소를 페이지 단위로 순회하여 사용자 통계 카운터 다시 계산
+
+        Args:
+            user_id: 사용자 ID
+
+        Returns:
+            Dict: 다시 계산한 통계
+        """
+        # 순회 중에 백엔드가 바뀌어도 순회한 저장소의 카운터에 반영
+        memory_stats = self.memory_stats
+        memory, borrowed = self._acquire_user_memory(user_id)
+        if memory is None:
+            # 저장소를 읽을 수 없으면 0으로 덮어쓰지 않고 마지막 값 유지
+            return memory_stats.get(user_id)
+        memories: List[Dict[str, Any]] = []
+        try:
+            cursor = None
+            while True:
+                page, cursor = scroll_page(memory.vector_store, user_id, 256, cursor)
+                memories.extend(page)
+                if not cursor:
+                    break
+        finally:
+            if borrowed:
+                self.user_memories.release(memory)
+
+        memory_stats.load(user_id, memories)
+        logger.info(f"📊 통계 재계산: {user_id} ({len(memories)}개)")
+        return memory_stats.get(user_id)
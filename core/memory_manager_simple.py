@@ -5,7 +5,7 @@
 
 import json
 import logging
-from typing import Dict, List, Optional, Any
+from typing import Dict, List, Optional, Any, AsyncIterator
 from datetime import datetime
 from pathlib import Path
 import sys
@@ -13,7 +13,20 @@ import sys
 sys.path.append(str(Path(__file__).parent.parent))
 
 from mem0 import Memory
+import ollama
 from config.settings import load_config, AppConfig
+from core.local_store import open_local_store
+from core.sqlite_store import SQLiteMemoryStore
+from core.local_index import open_search_index
+from core.vector_index import open_vector_index
+from core.vector_store_ops import (
+    fetch_vectors,
+    insert_memories,
+    point_id,
+    search_by_vectors
+)
+from core.embedding_cache import get_embedding_cache, install_cache, ollama_embed_batch
+from core.executor import configure_executor, run_blocking
 
 logger = logging.getLogger(__name__)
 
@@ -29,6 +42,9 @@ class SimpleMemoryManager:
         if not isinstance(self.config.data_dir, Path):
             self.config.data_dir = Path(self.config.data_dir)
 
+        # mem0/Ollama 동기 호출은 제한된 스레드 풀에서 실행 (이벤트 루프 블로킹 방지)
+        configure_executor(self.config.blocking_workers, self.config.blocking_max_pending)
+
         # mem0 설정 (Ollama 임베딩 사용)
         self.mem0_config = {
             "llm": {
@@ -56,6 +72,10 @@ class SimpleMemoryManager:
             }
         }
 
+        # 모든 서비스가 공유하는 임베딩 캐시
+        self.embedding_cache = get_embedding_cache(self.config)
+        self.embedding_model_name = self.mem0_config["embedder"]["config"]["model"]
+
         # 메모리 인스턴스 생성
         try:
             # ChromaDB 디렉토리 생성
@@ -63,40 +83,177 @@ class SimpleMemoryManager:
             chroma_dir.mkdir(parents=True, exist_ok=True)
 
             self.memory = Memory.from_config(self.mem0_config)
+            install_cache(self.memory, self.embedding_cache, self.embedding_model_name)
             logger.info("간소화된 메모리 시스템 초기화 완료")
         except Exception as e:
             logger.error(f"메모리 초기화 실패: {e}")
             self.memory = None
 
         # 로컬 메모리 저장소 (백업)
-        self.local_memories_file = self.config.data_dir / "local_memories.json"
-        self.local_memories = self._load_local_memories()
+        self.local_store = self._create_local_store()
+
+        # 로컬 폴백 검색용 사용자별 역색인 (첫 검색 시 구축, 이후 증분 갱신)
+        self.local_index = open_search_index(
+            self.local_store.key,
+            max_users=self.config.memory.local_max_active_shards
+        )
+
+        # 로컬 의미 검색 폴백용 사용자별 임베딩 행렬 (벡터 DB 없이 사용)
+        self.vector_index = open_vector_index(
+            self.config.data_dir,
+            max_users=self.config.memory.local_max_active_shards,
+            dtype=self.config.memory.local_vector_dtype
+        )
+        # 로컬 저장소와 대조를 마친 사용자 (비정상 종료로 빠진 임베딩은 첫 폴백 검색 때 보충)
+        self._vectors_reconciled: set = set()
+
+    def _create_local_store(self):
+        """설정에 따라 로컬 저장소 생성 (SQLite 또는 사용자별 샤드 파일)"""
+        db_type = self.config.database.metadata_db_type
+
+        if db_type == "sqlite":
+            sqlite_path = Path(self.config.database.sqlite_path)
+            if not sqlite_path.is_absolute():
+                sqlite_path = Path(self.config.base_dir) / sqlite_path
+            try:
+                return SQLiteMemoryStore(sqlite_path, legacy_dir=self.config.data_dir)
+            except Exception as e:
+                logger.error(f"SQLite 저장소 초기화 실패, 파일 저장소 사용: {e}")
+        elif db_type != "file":
+            logger.warning(f"로컬 저장소로 지원하지 않는 DB 타입: {db_type}, 파일 저장소 사용")
+
+        return open_local_store(
+            self.config.data_dir,
+            snapshot_interval=self.config.memory.local_snapshot_interval,
+            idle_seconds=self.config.memory.local_shard_idle_seconds,
+            max_active_shards=self.config.memory.local_max_active_shards,
+            write_behind=self.config.memory.local_write_behind,
+            flush_ops=self.config.memory.local_flush_ops,
+            flush_interval_ms=self.config.memory.local_flush_interval_ms,
+            max_buffered_ops=self.config.memory.local_max_buffered_ops,
+            compaction_dead_ratio=self.config.memory.local_compaction_dead_ratio,
+            compaction_min_bytes=self.config.memory.local_compaction_min_bytes,
+            compaction_interval_seconds=self.config.memory.local_compaction_interval_seconds
+        )
+
+    def _embed(self, text: str, memory_action: str = "search") -> List[float]:
+        """텍스트 임베딩 (캐시 우선, mem0 임베더가 없으면 Ollama 직접 호출)"""
+        if self.memory:
+            return self.memory.embedding_model.embed(text, memory_action)
+
+        vector = self.embedding_cache.get(self.embedding_model_name, text)
+        if vector is None:
+            embedder_config = self.mem0_config["embedder"]["config"]
+            client = ollama.Client(host=embedder_config["ollama_base_url"])
+            response = client.embeddings(model=self.embedding_model_name, prompt=text)
+            vector = response["embedding"]
+            self.embedding_cache.put(self.embedding_model_name, text, vector)
+        return vector
+
+    def _embed_batch(self, texts: List[str]) -> List[List[float]]:
+        """여러 텍스트 임베딩 (캐시 우선, 나머지는 Ollama 다중 입력 요청)"""
+        batch_size = self.config.memory.ingest_embed_batch_size
+        if self.memory:
+            vectors = []
+            for start in range(0, len(texts), batch_size):
+                vectors.extend(self.memory.embedding_model.embed_batch(texts[start:start + batch_size], "add"))
+            return vectors
+
+        cached = {text: self.embedding_cache.get(self.embedding_model_name, text) for text in texts}
+        missing = [text for text, vector in cached.items() if vector is None]
+        if missing:
+            embedder_config = self.mem0_config["embedder"]["config"]
+            client = ollama.Client(host=embedder_config["ollama_base_url"])
+            fresh = dict(zip(missing, ollama_embed_batch(client, self.embedding_model_name, missing, batch_size)))
+            self.embedding_cache.put_many(self.embedding_model_name, fresh)
+            cached.update(fresh)
+        return [cached[text] for text in texts]
+
+    def _store_vectors(
+        self,
+        user_id: str,
+        entries: List[Dict[str, Any]],
+        metadatas: List[Dict[str, Any]]
+    ):
+        """
+        로컬에 기록한 메모리를 임베딩해 mem0 벡터 저장소와 로컬 임베딩 행렬에 저장 (블로킹)
+
+        로컬 저장은 이미 끝났으므로 임베딩이나 mem0 저장이 실패해도 경고만 남김
+        mem0 포인트 ID는 로컬 ID에서 만들었으므로 다시 저장하면 같은 포인트를 덮어씀
+        """
+        texts = [entry["text"] for entry in entries]
+        try:
+            vectors = self._embed_batch(texts)
+        except Exception as e:
+            # 다음 폴백 검색 때 다시 대조해 빠진 임베딩 보충
+            self._vectors_reconciled.discard(user_id)
+            logger.warning(f"임베딩 실패, 로컬만 저장 (BM25 폴백만 사용): {e}")
+            return
 
-    def _load_local_memories(self) -> Dict[str, List[Dict]]:
-        """로컬 메모리 로드"""
-        if self.local_memories_file.exists():
+        if self.memory:
             try:
-                with open(self.local_memories_file, 'r', encoding='utf-8') as f:
-                    return json.load(f)
-            except:
-                pass
-        return {}
-
-    def _save_local_memories(self):
-        """로컬 메모리 저장"""
+                insert_memories(
+                    self.memory.vector_store,
+                    vectors,
+                    texts,
+                    metadatas,
+                    user_id,
+                    batch_size=self.config.memory.ingest_upsert_batch_size,
+                    ids=[entry["metadata"]["mem0_ids"][0] for entry in entries]
+                )
+            except Exception as e:
+                logger.warning(f"mem0 저장 실패, 로컬만 저장: {e}")
+
+        # 로컬 의미 검색 폴백용 임베딩 보관 (mem0 저장이 실패해도 - 그때가 폴백이 필요한 때)
         try:
-            with open(self.local_memories_file, 'w', encoding='utf-8') as f:
-                json.dump(self.local_memories, f, ensure_ascii=False, indent=2)
+            for entry, vector in zip(entries, vectors):
+                self.vector_index.add(user_id, entry["id"], vector)
         except Exception as e:
-            logger.error(f"로컬 메모리 저장 실패: {e}")
+            self._vectors_reconciled.discard(user_id)
+            logger.warning(f"로컬 임베딩 저장 실패 (BM25 폴백만 사용): {e}")
+
+    def _reconcile_vectors(self, user_id: str) -> bool:
+        """
+        로컬 임베딩 행렬을 로컬 저장소와 대조 (사용자별 한 번, 블로킹)
+
+        벡터 색인은 save_interval개마다 저장되므로 비정상 종료 뒤에는 최근 메모리의 벡터가 빠져 있을 수 있음
+        빠진 메모리는 다시 임베딩해 채우고, 저장소에서 지워진 메모리의 벡터는 제거
+
+        Returns:
+            bool: 색인이 저장소와 일치하면 True (임베딩 실패 시 False - BM25 폴백 사용)
+        """
+        if user_id in self._vectors_reconciled:
+            return True
+        try:
+            entries = self.local_store.get_user_memories(user_id)
+            missing = self.vector_index.reconcile(user_id, [entry["id"] for entry in entries])
+            if missing:
+                texts = {entry["id"]: entry["text"] for entry in entries}
+                vectors = self._embed_batch([texts[memory_id] for memory_id in missing])
+                for memory_id, vector in zip(missing, vectors):
+                    self.vector_index.add(user_id, memory_id, vector)
+                logger.info(f"🧮 빠진 로컬 임베딩 보충: {user_id} ({len(missing)}개)")
+        except Exception as e:
+            logger.warning(f"⚠️ 로컬 임베딩 대조 실패, BM25 검색 사용: {e}")
+            return False
+
+        self._vectors_reconciled.add(user_id)
+        return True
 
     async def add_memory(
         self,
         text: str,
         user_id: str,
-        metadata: Optional[Dict[str, Any]] = None
+        metadata: Optional[Dict[str, Any]] = None,
+        raise_errors: bool = False,
+        job_id: Optional[str] = None
     ) -> str:
-        """메모리 추가 (로컬 저장 포함)"""
+        """
+        메모리 추가 (로컬 저장 포함)
+
+        raise_errors면 로컬 저장 실패 시 error_ ID 대신 예외를 던짐 (수집 큐 재시도용)
+        job_id가 있으면 메모리 ID를 작업 ID에서 만들어 재시도해도 같은 엔트리/포인트를 덮어씀
+        """
         try:
             if metadata is None:
                 metadata = {}
@@ -108,41 +265,103 @@ class SimpleMemoryManager:
                 "source": metadata.get("source", "manual")
             })
 
-            # 메모리 ID 생성
-            memory_id = f"mem_{user_id}_{datetime.now().timestamp()}"
-
-            # 로컬 저장
-            if user_id not in self.local_memories:
-                self.local_memories[user_id] = []
+            # 메모리 ID 생성 (수집 큐 작업이면 작업 ID 기준 - 부분 저장 후 재시도해도 중복 없음)
+            memory_id = f"mem_{user_id}_{job_id or datetime.now().timestamp()}"
 
+            # 로컬 저장 (로그에 한 줄 추가)
             memory_entry = {
                 "id": memory_id,
                 "text": text,
-                "metadata": metadata
+                "metadata": dict(metadata)
             }
+            if self.memory:
+                # 삭제 때 mem0 사본도 지울 수 있도록 로컬 ID에서 만든 포인트 ID를 함께 기록 (기록은 한 번)
+                memory_entry["metadata"]["mem0_ids"] = [point_id(user_id, memory_id)]
 
-            self.local_memories[user_id].append(memory_entry)
-            self._save_local_memories()
+            self.local_store.add(user_id, memory_entry)
+            self.local_index.add(user_id, memory_entry)
 
-            # mem0에도 저장 시도
-            if self.memory:
-                try:
-                    self.memory.add(
-                        messages=[{"role": "user", "content": text}],
-                        user_id=user_id,
-                        metadata=metadata,
-                        infer=False  # 자동 번역/추론 비활성화 - 원본 언어 그대로 저장
-                    )
-                except Exception as e:
-                    logger.warning(f"mem0 저장 실패, 로컬만 저장: {e}")
+            # mem0 벡터 저장소(infer=False와 같은 페이로드)와 로컬 임베딩 행렬에 같은 임베딩 저장
+            await run_blocking(self._store_vectors, user_id, [memory_entry], [metadata])
 
             logger.info(f"메모리 추가 완료: {memory_id}")
             return memory_id
 
         except Exception as e:
             logger.error(f"메모리 추가 실패: {e}")
+            if raise_errors:
+                raise
             return f"error_{datetime.now().timestamp()}"
 
+    async def add_memories(
+        self,
+        items: List[Any],
+        user_id: str,
+        raise_errors: bool = False,
+        job_id: Optional[str] = None
+    ) -> List[str]:
+        """
+        메모리 여러 개 추가
+
+        로컬 저장소에 먼저 배치당 한 번 기록하고, 임베딩은 다중 입력 요청으로,
+        mem0 벡터 저장소에는 로컬 ID에서 만든 포인트 ID로 청크 단위 upsert
+
+        Args:
+            items: 텍스트 또는 {"text": ..., "metadata": {...}} 목록
+            user_id: 사용자 ID
+            raise_errors: 로컬 저장 실패 시 빈 목록 대신 예외를 던짐 (수집 큐 재시도용)
+            job_id: 수집 큐 작업 ID (있으면 메모리 ID를 여기서 만들어 재시도해도 같은 엔트리를 덮어씀)
+
+        Returns:
+            List[str]: 메모리 ID 목록 (입력 순서)
+        """
+        try:
+            now = datetime.now()
+            id_prefix = f"mem_{user_id}_{job_id or now.timestamp()}"
+            entries = []
+            for i, item in enumerate(items):
+                if isinstance(item, str):
+                    item = {"text": item}
+                metadata = dict(item.get("metadata") or {})
+                metadata.update({
+                    "user_id": user_id,
+                    "timestamp": now.isoformat(),
+                    "source": metadata.get("source", "manual")
+                })
+                entries.append({
+                    "id": f"{id_prefix}_{i}",
+                    "text": item["text"],
+                    "metadata": metadata
+                })
+
+            if not entries:
+                return []
+
+            # mem0 페이로드에는 로컬 전용 필드(mem0_ids)를 넣지 않음
+            metadatas = [dict(entry["metadata"]) for entry in entries]
+            if self.memory:
+                # 포인트 ID는 로컬 ID에서 결정적으로 만들어 로컬 엔트리에 미리 기록
+                # (삭제 때 mem0 사본도 지울 수 있고, 재시도하면 같은 포인트를 덮어씀)
+                for entry in entries:
+                    entry["metadata"]["mem0_ids"] = [point_id(user_id, entry["id"])]
+
+            # 로컬 저장을 먼저 (배치당 로그 기록/트랜잭션 한 번) - 실패하면 mem0에 아무것도 남기지 않음
+            self.local_store.add_many(user_id, entries)
+            for entry in entries:
+                self.local_index.add(user_id, entry)
+
+            # 임베딩은 다중 입력 요청으로, mem0에는 청크 단위 upsert
+            await run_blocking(self._store_vectors, user_id, entries, metadatas)
+
+            logger.info(f"메모리 일괄 추가 완료: {len(entries)}개")
+            return [entry["id"] for entry in entries]
+
+        except Exception as e:
+            logger.error(f"메모리 일괄 추가 실패: {e}")
+            if raise_errors:
+                raise
+            return []
+
     async def search_memories(
         self,
         query: str,
@@ -157,7 +376,9 @@ class SimpleMemoryManager:
         if self.memory:
             try:
                 logger.info(f"🔍 mem0 벡터 검색 시도: '{query}'")
-                mem0_results = self.memory.search(query=query, user_id=user_id, limit=limit)
+                mem0_results = await run_blocking(
+                    self.memory.search, query=query, user_id=user_id, limit=limit
+                )
 
                 if mem0_results:
                     # mem0 결과 형식: {'results': [...]}
@@ -199,53 +420,62 @@ class SimpleMemoryManager:
                     logger.warning(f"⚠️ mem0 검색 결과 없음")
 
             except Exception as e:
-                logger.warning(f"⚠️ mem0 벡터 검색 실패, 로컬 검색으로 폴백: {e}")
-                import traceback
-                traceback.print_exc()
-
-        # 로컬 검색 폴백 (개선된 유사도 계산)
-        logger.info(f"📝 로컬 텍스트 유사도 검색 사용")
-        if user_id in self.local_memories:
-            query_lower = query.lower()
-            query_terms = set(query_lower.split())
-
-            scored_results = []
-            for memory in self.local_memories[user_id]:
-                text_lower = memory["text"].lower()
-                text_terms = set(text_lower.split())
-
-                # 유사도 점수 계산
-                score = 0.0
-
-                # 1. 완전 일치
-                if query_lower in text_lower:
-                    score = 0.95
-
-                # 2. 부분 일치
-                elif any(term in text_lower for term in query_terms):
-                    # Jaccard 유사도 (단순 버전)
-                    intersection = query_terms & text_terms
-                    union = query_terms | text_terms
-                    if union:
-                        score = 0.5 + (0.4 * len(intersection) / len(union))
-
-                # 임계값 적용
-                if threshold and score < threshold:
-                    continue
-
-                if score > 0:
-                    scored_results.append({
+                logger.exception(f"⚠️ mem0 벡터 검색 실패, 로컬 검색으로 폴백: {e}")
+
+        # 로컬 의미 검색 폴백 (보관된 임베딩 행렬과 행렬-벡터 곱 한 번)
+        # 빠진 임베딩을 먼저 보충하고, 보충하지 못하면 일부 메모리만 찾는 대신 BM25 사용
+        if (
+            self.local_store.has_user(user_id)
+            and await run_blocking(self._reconcile_vectors, user_id)
+            and self.vector_index.has_vectors(user_id)
+        ):
+            try:
+                query_vector = await run_blocking(self._embed, query, "search")
+                hits = await run_blocking(
+                    self.vector_index.search, user_id, query_vector, limit=limit, threshold=threshold
+                )
+                for score, memory_id in hits:
+                    memory = self.local_store.get(user_id, memory_id)
+                    if memory is None:
+                        continue
+                    results.append({
                         "id": memory["id"],
                         "text": memory["text"],
                         "score": score,
                         "metadata": memory["metadata"]
                     })
 
-            # 점수 순으로 정렬
-            scored_results.sort(key=lambda x: x["score"], reverse=True)
-            results = scored_results[:limit]
+                if results:
+                    logger.info(f"🧮 로컬 벡터 검색 완료: {len(results)}개 결과")
+                    return results
+            except Exception as e:
+                logger.warning(f"⚠️ 로컬 벡터 검색 실패, BM25 검색으로 폴백: {e}")
 
-            logger.info(f"📝 로컬 검색 완료: {len(results)}개 결과")
+        # 로컬 검색 폴백 (문자 n-gram 역색인 + BM25, 후보 문서만 채점)
+        logger.info(f"📝 로컬 BM25 검색 사용")
+        if self.local_store.has_user(user_id):
+            try:
+                # 색인 구축(첫 검색)과 채점은 색인 잠금 안에서, 이벤트 루프 밖 실행기에서
+                hits = await run_blocking(
+                    self.local_index.search,
+                    user_id,
+                    lambda: self.local_store.get_user_memories(user_id),
+                    query,
+                    limit=limit,
+                    threshold=threshold
+                )
+                results = [
+                    {
+                        "id": memory["id"],
+                        "text": memory["text"],
+                        "score": score,
+                        "metadata": memory["metadata"]
+                    }
+                    for score, memory in hits
+                ]
+                logger.info(f"📝 로컬 검색 완료: {len(results)}개 결과")
+            except Exception as e:
+                logger.warning(f"⚠️ 로컬 BM25 검색 실패: {e}")
         else:
             logger.warning(f"⚠️ 사용자 {user_id}의 로컬 메모리 없음")
 
@@ -257,66 +487,205 @@ class SimpleMemoryManager:
     async def get_all_memories(
         self,
         user_id: str,
-        limit: int = 100
+        limit: int = 100,
+        order: str = "asc"
     ) -> List[Dict[str, Any]]:
-        """모든 메모리 가져오기"""
-        memories = []
+        """
+        메모리 가져오기 (필요한 만큼만 페이지 단위로 조회)
+
+        모든 메모리는 로컬 저장소에 먼저 기록되므로 로컬 저장소를 기준으로 나열
+        (mem0 사본을 합치면 같은 메모리가 ID만 달리해 두 번 나옴)
+        order="desc"면 최신 메모리부터 limit개
+        """
+        memories: List[Dict[str, Any]] = []
+        page_size = min(limit, 100) if limit else 100
+        async for page in self.iter_memories(user_id, page_size=page_size, order=order):
+            memories.extend(page)
+            if limit and len(memories) >= limit:
+                break
+
+        if limit:
+            memories = memories[:limit]
+        logger.info(f"전체 메모리 조회: {len(memories)}개")
+        return memories
+
+    async def list_memories(
+        self,
+        user_id: str,
+        limit: int = 20,
+        cursor: Optional[str] = None,
+        order: str = "asc"
+    ) -> Dict[str, Any]:
+        """
+        메모리 한 페이지 조회 (로컬 저장소 커서, 비용은 페이지 크기에 비례)
+
+        Args:
+            order: "asc"면 추가 순서, "desc"면 최신 메모리부터
+
+        Returns:
+            Dict: {"memories": [...], "next_cursor": 다음 커서 또는 None}
+        """
+        try:
+            memories, next_cursor = self.local_store.page(
+                user_id, limit=limit, cursor=cursor, order=order
+            )
+            return {"memories": memories, "next_cursor": next_cursor}
+        except Exception as e:
+            logger.error(f"메모리 조회 실패: {e}")
+            return {"memories": [], "next_cursor": None}
+
+    async def iter_memories(
+        self,
+        user_id: str,
+        page_size: int = 100,
+        order: str = "asc"
+    ) -> AsyncIterator[List[Dict[str, Any]]]:
+        """메모리를 페이지 단위로 순회하는 async generator"""
+        cursor = None
+        while True:
+            page = await self.list_memories(user_id, limit=page_size, cursor=cursor, order=order)
+            if page["memories"]:
+                yield page["memories"]
+            cursor = page["next_cursor"]
+            if not cursor:
+                break
+
+    async def get_memory_by_id(
+        self,
+        memory_id: str,
+        user_id: str
+    ) -> Optional[Dict[str, Any]]:
+        """
+        ID로 메모리 조회 (O(1))
+
+        로컬 저장소의 ID 색인을 먼저 보고, 없으면 mem0 벡터 저장소에서 ID로 조회
+        """
+        memory = self.local_store.get(user_id, memory_id)
+        if memory is not None:
+            return memory
 
-        # mem0에서 가져오기
         if self.memory:
             try:
-                mem0_memories = self.memory.get_all(user_id=user_id)
-                if mem0_memories:
-                    # mem0 결과 형식 처리: {'results': [...]} 또는 리스트
-                    if isinstance(mem0_memories, dict):
-                        actual_memories = mem0_memories.get('results', [])
-                    elif isinstance(mem0_memories, list):
-                        actual_memories = mem0_memories
-                    else:
-                        actual_memories = []
-
-                    # 표준 형식으로 변환
-                    for mem in actual_memories:
-                        if isinstance(mem, dict):
-                            memories.append({
-                                "id": mem.get("id", ""),
-                                "text": mem.get("memory", mem.get("text", "")),
-                                "metadata": mem.get("metadata", {})
-                            })
-                        elif isinstance(mem, str):
-                            # 문자열인 경우 건너뛰기
-                            logger.warning(f"문자열 메모리 발견, 건너뜀: {mem[:50]}...")
-                            continue
-                        else:
-                            # 객체 형태
-                            memories.append({
-                                "id": getattr(mem, "id", ""),
-                                "text": getattr(mem, "memory", getattr(mem, "text", str(mem))),
-                                "metadata": getattr(mem, "metadata", {})
-                            })
-
-                    logger.info(f"mem0에서 {len(memories)}개 메모리 로드")
+                item = await run_blocking(self.memory.get, memory_id)
+                if item and item.get("user_id") in (None, user_id):
+                    return {
+                        "id": item.get("id", memory_id),
+                        "text": item.get("memory", item.get("text", "")),
+                        "metadata": item.get("metadata", {})
+                    }
             except Exception as e:
-                logger.warning(f"mem0 조회 실패: {e}")
-                import traceback
-                traceback.print_exc()
-
-        # 로컬 메모리 추가
-        if user_id in self.local_memories:
-            local = self.local_memories[user_id]
-            # mem0 메모리와 중복 제거
-            mem0_ids = {m.get("id") for m in memories}
-
-            for memory in local:
-                if isinstance(memory, dict) and memory.get("id") not in mem0_ids:
-                    memories.append(memory)
-
-        # 제한 적용
-        if limit and len(memories) > limit:
-            memories = memories[:limit]
+                logger.warning(f"mem0 ID 조회 실패: {e}")
 
-        logger.info(f"전체 메모리 조회: {len(memories)}개")
-        return memories
+        return None
+
+    async def get_related_memories(
+        self,
+        memory_id: str,
+        user_id: str,
+        limit: int = 5,
+        threshold: Optional[float] = None
+    ) -> List[Dict[str, Any]]:
+        """관련 메모리 찾기 (저장된 벡터 재사용, 기준 메모리 제외)"""
+        related = await self.get_related_memories_bulk([memory_id], user_id, limit, threshold)
+        return related.get(memory_id, [])
+
+    async def get_related_memories_bulk(
+        self,
+        memory_ids: List[str],
+        user_id: str,
+        limit: int = 5,
+        threshold: Optional[float] = None
+    ) -> Dict[str, List[Dict[str, Any]]]:
+        """
+        여러 기준 메모리의 관련 메모리를 한 번에 찾기
+
+        1. 로컬 임베딩 행렬: 행렬 곱 한 번으로 모든 기준 메모리 처리
+        2. mem0 벡터 저장소: 저장된 벡터를 ID로 조회해 배치 kNN
+        3. 둘 다 없으면 기준 메모리 텍스트로 검색
+        """
+        related: Dict[str, List[Dict[str, Any]]] = {}
+
+        try:
+            recommended = await run_blocking(
+                self.vector_index.recommend, user_id, memory_ids, limit=limit, threshold=threshold
+            )
+            for base_id, hits in recommended.items():
+                entries = []
+                for score, memory_id in hits:
+                    memory = self.local_store.get(user_id, memory_id)
+                    if memory is not None:
+                        entries.append({
+                            "id": memory["id"],
+                            "text": memory["text"],
+                            "score": score,
+                            "metadata": memory["metadata"]
+                        })
+                related[base_id] = entries
+        except Exception as e:
+            logger.warning(f"로컬 관련 메모리 검색 실패: {e}")
+
+        remaining = [memory_id for memory_id in memory_ids if memory_id not in related]
+        if remaining and self.memory:
+            try:
+                vectors = await run_blocking(fetch_vectors, self.memory.vector_store, remaining)
+                found = [memory_id for memory_id in remaining if memory_id in vectors]
+                if found:
+                    results = await run_blocking(
+                        search_by_vectors,
+                        self.memory.vector_store,
+                        [vectors[memory_id] for memory_id in found],
+                        limit=limit,
+                        user_id=user_id,
+                        exclude_ids=found
+                    )
+                    for base_id, hits in zip(found, results):
+                        related[base_id] = [
+                            {
+                                "id": hit["id"],
+                                "text": hit.get("memory", ""),
+                                "score": hit.get("score", 0.0),
+                                "metadata": hit.get("metadata", {})
+                            }
+                            for hit in hits
+                        ]
+            except Exception as e:
+                logger.warning(f"mem0 관련 메모리 검색 실패: {e}")
+
+        # 저장된 벡터가 없는 메모리만 텍스트로 검색 (재임베딩)
+        for memory_id in memory_ids:
+            if memory_id in related:
+                continue
+            base_memory = await self.get_memory_by_id(memory_id, user_id)
+            if not base_memory:
+                related[memory_id] = []
+                continue
+            results = await self.search_memories(
+                base_memory["text"], user_id, limit=limit + 1, threshold=threshold
+            )
+            related[memory_id] = [r for r in results if r.get("id") != memory_id][:limit]
+
+        return related
+
+    @staticmethod
+    def _mem0_ids(memory_id: str, entry: Optional[Dict[str, Any]]) -> List[str]:
+        """
+        삭제할 mem0 메모리 ID
+
+        로컬 엔트리면 추가할 때 기록한 mem0 ID, 로컬에 없는 ID(mem0 검색 결과 등)는 그대로 사용
+        """
+        if entry is None:
+            return [memory_id]
+        return list((entry.get("metadata") or {}).get("mem0_ids") or [])
+
+    async def _delete_mem0(self, mem0_ids: List[str]):
+        """mem0 벡터 저장소에서 메모리 삭제 (실패는 경고만 남김)"""
+        if not self.memory:
+            return
+        for mem0_id in mem0_ids:
+            try:
+                await run_blocking(self.memory.delete, memory_id=mem0_id)
+            except Exception as e:
+                logger.warning(f"mem0 메모리 삭제 실패 ({mem0_id}): {e}")
 
     async def delete_memory(
         self,
@@ -325,20 +694,14 @@ class SimpleMemoryManager:
     ) -> bool:
         """메모리 삭제"""
         try:
-            # mem0에서 삭제
-            if self.memory:
-                try:
-                    self.memory.delete(memory_id=memory_id)
-                except:
-                    pass
-
-            # 로컬에서 삭제
-            if user_id in self.local_memories:
-                self.local_memories[user_id] = [
-                    m for m in self.local_memories[user_id]
-                    if m["id"] != memory_id
-                ]
-                self._save_local_memories()
+            # mem0에서 삭제 (로컬 ID는 기록해 둔 mem0 ID로 변환)
+            entry = self.local_store.get(user_id, memory_id)
+            await self._delete_mem0(self._mem0_ids(memory_id, entry))
+
+            # 로컬에서 삭제 (삭제 레코드 추가)
+            self.local_store.delete(user_id, memory_id)
+            self.local_index.remove(user_id, memory_id)
+            self.vector_index.remove(user_id, memory_id)
 
             logger.info(f"메모리 삭제 완료: {memory_id}")
             return True
@@ -347,18 +710,67 @@ class SimpleMemoryManager:
             logger.error(f"메모리 삭제 실패: {e}")
             return False
 
+    async def delete_memories(
+        self,
+        memory_ids: List[str],
+        user_id: str
+    ) -> int:
+        """
+        여러 메모리 삭제 (로컬 저장소에는 삭제 레코드 한 번만 기록)
+
+        Returns:
+            int: 로컬에서 삭제된 메모리 수
+        """
+        try:
+            mem0_ids: List[str] = []
+            for memory_id in memory_ids:
+                mem0_ids.extend(self._mem0_ids(memory_id, self.local_store.get(user_id, memory_id)))
+            await self._delete_mem0(mem0_ids)
+
+            deleted = self.local_store.delete_many(user_id, list(memory_ids))
+            for memory_id in memory_ids:
+                self.local_index.remove(user_id, memory_id)
+            self.vector_index.remove_many(user_id, list(memory_ids))
+
+            logger.info(f"메모리 {deleted}개 삭제 완료: {user_id}")
+            return deleted
+
+        except Exception as e:
+            logger.error(f"메모리 일괄 삭제 실패: {e}")
+            return 0
+
+    async def delete_all_memories(self, user_id: str) -> int:
+        """
+        사용자 메모리 전체 삭제 (개별 조회/삭제 없이 한 번에)
+
+        Returns:
+            int: 로컬에서 삭제된 메모리 수
+        """
+        try:
+            if self.memory:
+                try:
+                    await run_blocking(self.memory.delete_all, user_id=user_id)
+                except Exception as e:
+                    logger.warning(f"mem0 전체 삭제 실패: {e}")
+
+            deleted = self.local_store.delete_all(user_id)
+            self.local_index.drop(user_id)
+            self.vector_index.drop(user_id)
+
+            logger.info(f"사용자 메모리 전체 삭제 완료: {user_id} ({deleted}개)")
+            return deleted
+
+        except Exception as e:
+            logger.error(f"메모리 전체 삭제 실패: {e}")
+            return 0
+
     def get_statistics(self, user_id: str) -> Dict[str, Any]:
         """통계 정보"""
-        memories = self.local_memories.get(user_id, [])
-
-        categories = {}
-        for mem in memories:
-            category = mem.get("metadata", {}).get("category", "uncategorized")
-            categories[category] = categories.get(category, 0) + 1
-
-        return {
-            "total_memories": len(memories),
-            "categories": categories,
-            "last_updated": memories[-1]["metadata"]["timestamp"] if memories else "",
-            "storage_type": "Local + ChromaDB"
-        }
\ No newline at end of file
+        stats = self.local_store.stats(user_id)
+        stats["storage_type"] = "Local + ChromaDB"
+        return stats
+
+    def rebuild_statistics(self, user_id: str) -> Dict[str, Any]:
+        """저장소를 다시 읽어 통계 카운터 재계산"""
+        self.local_store.rebuild_stats(user_id)
+        return self.get_statistics(user_id)
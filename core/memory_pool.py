@@ -0,0 +1,244 @@
+"""
+사용자별 mem0 Memory 인스턴스 풀
+Memory.from_config는 벡터 저장소/임베더/LLM 클라이언트를 새로 만들기 때문에
+크기와 유휴 시간으로 제한된 LRU에 보관하고, 내보낼 때 클라이언트 연결을 닫음
+"""
+
+import time
+import logging
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future
+from contextlib import contextmanager
+from typing import Dict, List, Optional, Any, Callable, Iterator, Tuple
+
+from core.vector_store_ops import close_vector_store
+
+logger = logging.getLogger(__name__)
+
+
+def release_memory(memory: Any):
+    """Memory 인스턴스가 잡고 있는 연결 해제 (벡터 저장소 클라이언트, 히스토리 DB)"""
+    if memory is None:
+        return
+    try:
+        close_vector_store(memory.vector_store)
+    except Exception as e:
+        logger.debug(f"벡터 저장소 연결 해제 실패: {e}")
+
+    history_db = getattr(memory, "db", None)
+    try:
+        if hasattr(history_db, "close"):
+            history_db.close()
+        elif hasattr(history_db, "connection"):
+            history_db.connection.close()
+    except Exception as e:
+        logger.debug(f"히스토리 DB 연결 해제 실패: {e}")
+
+
+class MemoryPool:
+    """
+    크기/유휴 시간 제한 LRU 풀
+
+    - get(): 있으면 재사용(hit), 없으면 factory로 생성(miss)
+    - 생성은 풀 잠금 밖에서 실행하고, 같은 사용자를 동시에 요청한 호출자만 생성 결과를 기다림
+    - max_size를 넘거나 idle_seconds 동안 쓰이지 않은 인스턴스는 내보내고 연결 해제
+    - acquire()/lease()로 빌린 인스턴스는 내보내져도 마지막 release() 때까지 연결을 닫지 않음
+    """
+
+    def __init__(
+        self,
+        factory: Callable[[str], Any],
+        max_size: int = 64,
+        idle_seconds: float = 900,
+        on_evict: Callable[[Any], None] = release_memory
+    ):
+        """
+        풀 초기화
+
+        Args:
+            factory: 사용자 ID로 Memory 인스턴스를 만드는 함수 (실패 시 None 또는 예외)
+            max_size: 최대 인스턴스 수
+            idle_seconds: 이 시간 동안 쓰이지 않으면 내보냄
+            on_evict: 내보낼 때 호출할 정리 함수
+        """
+        self.factory = factory
+        self.max_size = max_size
+        self.idle_seconds = idle_seconds
+        self.on_evict = on_evict
+
+        # 사용자 ID → (인스턴스, 마지막 사용 시각), 앞쪽이 가장 오래 쓰이지 않은 항목
+        self._entries: "OrderedDict[str, Tuple[Any, float]]" = OrderedDict()
+        # 생성 중인 사용자 ID → 생성 결과 (같은 사용자의 다른 호출자가 기다림)
+        self._creating: Dict[str, Future] = {}
+        # id(인스턴스) → 빌려 간 호출자 수, 빌려 간 상태에서 내보내진 인스턴스
+        self._borrowers: Dict[int, int] = {}
+        self._retired: Dict[int, Tuple[str, Any]] = {}
+        self._lock = threading.RLock()
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, user_id: str) -> bool:
+        return user_id in self._entries
+
+    def get(self, user_id: str) -> Optional[Any]:
+        """사용자 인스턴스 가져오기 (없으면 생성)"""
+        return self._get(user_id, borrow=False)
+
+    def acquire(self, user_id: str) -> Optional[Any]:
+        """사용자 인스턴스 빌리기 (사용이 끝나면 release() 호출)"""
+        return self._get(user_id, borrow=True)
+
+    def release(self, memory: Any):
+        """빌린 인스턴스 반납 (이미 내보내진 인스턴스면 마지막 반납 때 연결 해제)"""
+        if memory is None:
+            return
+        with self._lock:
+            key = id(memory)
+            count = self._borrowers.get(key, 0) - 1
+            if count > 0:
+                self._borrowers[key] = count
+                return
+            self._borrowers.pop(key, None)
+            retired = self._retired.pop(key, None)
+        if retired is not None:
+            self._close([retired])
+
+    @contextmanager
+    def lease(self, user_id: str) -> Iterator[Optional[Any]]:
+        """with 블록 동안 사용자 인스턴스 빌리기"""
+        memory = self.acquire(user_id)
+        try:
+            yield memory
+        finally:
+            self.release(memory)
+
+    def _get(self, user_id: str, borrow: bool) -> Optional[Any]:
+        now = time.monotonic()
+        with self._lock:
+            closing = self._evict_idle(now)
+
+            entry = self._entries.get(user_id)
+            if entry is not None:
+                self._entries[user_id] = (entry[0], now)
+                self._entries.move_to_end(user_id)
+                self.hits += 1
+                if borrow:
+                    self._borrow(entry[0])
+            else:
+                future = self._creating.get(user_id)
+                creator = future is None
+                if creator:
+                    future = self._creating[user_id] = Future()
+                    self.misses += 1
+        self._close(closing)
+
+        if entry is not None:
+            return entry[0]
+        if not creator:
+            # 같은 사용자를 생성 중인 호출자를 기다린 뒤 풀에서 다시 조회
+            return self._get(user_id, borrow) if future.result() is not None else None
+        return self._create(user_id, future, borrow)
+
+    def _create(self, user_id: str, future: Future, borrow: bool) -> Optional[Any]:
+        """인스턴스 생성 (풀 잠금 밖에서 실행, 다른 사용자의 조회를 막지 않음)"""
+        try:
+            memory = self.factory(user_id)
+        except BaseException as e:
+            with self._lock:
+                self._creating.pop(user_id, None)
+            future.set_exception(e)
+            raise
+
+        closing = []
+        with self._lock:
+            self._creating.pop(user_id, None)
+            if memory is not None:
+                self._entries[user_id] = (memory, time.monotonic())
+                if borrow:
+                    self._borrow(memory)
+                while len(self._entries) > self.max_size:
+                    closing.extend(self._evict_oldest())
+        future.set_result(memory)
+        self._close(closing)
+        return memory
+
+    def _borrow(self, memory: Any):
+        """빌려 간 호출자 수 증가 (호출자가 잠금 보유)"""
+        key = id(memory)
+        self._borrowers[key] = self._borrowers.get(key, 0) + 1
+
+    def _retire(self, user_id: str, memory: Any) -> List[Tuple[str, Any]]:
+        """
+        풀에서 빠진 인스턴스 처리 (호출자가 잠금 보유)
+
+        Returns:
+            바로 연결을 해제할 (사용자 ID, 인스턴스) 목록 - 빌려 간 호출자가 있으면 반납 때로 미룸
+        """
+        if self._borrowers.get(id(memory)):
+            self._retired[id(memory)] = (user_id, memory)
+            return []
+        return [(user_id, memory)]
+
+    def _close(self, retired: List[Tuple[str, Any]]):
+        """연결 해제 (잠금 밖에서 호출)"""
+        for user_id, memory in retired:
+            try:
+                self.on_evict(memory)
+            except Exception as e:
+                logger.warning(f"메모리 인스턴스 정리 실패 ({user_id}): {e}")
+            logger.debug(f"사용자 {user_id}의 메모리 인스턴스 해제")
+
+    def _evict_oldest(self) -> List[Tuple[str, Any]]:
+        """가장 오래 쓰이지 않은 인스턴스 내보내기 (호출자가 잠금 보유)"""
+        user_id, (memory, _) = self._entries.popitem(last=False)
+        self.evictions += 1
+        return self._retire(user_id, memory)
+
+    def _evict_idle(self, now: float) -> List[Tuple[str, Any]]:
+        """유휴 인스턴스 내보내기 - LRU 순서라 앞쪽만 확인 (호출자가 잠금 보유)"""
+        closing = []
+        while self._entries:
+            _, last_used = next(iter(self._entries.values()))
+            if now - last_used < self.idle_seconds:
+                break
+            closing.extend(self._evict_oldest())
+        return closing
+
+    def discard(self, user_id: str):
+        """사용자 인스턴스 내보내기"""
+        closing = []
+        with self._lock:
+            entry = self._entries.pop(user_id, None)
+            if entry is not None:
+                closing = self._retire(user_id, entry[0])
+        self._close(closing)
+
+    def clear(self):
+        """모든 인스턴스 내보내기"""
+        closing = []
+        with self._lock:
+            for user_id, (memory, _) in self._entries.items():
+                closing.extend(self._retire(user_id, memory))
+            self._entries.clear()
+        self._close(closing)
+
+    def stats(self) -> Dict[str, Any]:
+        """풀 사용 통계"""
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "size": len(self._entries),
+                "max_size": self.max_size,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "borrowed": len(self._borrowers),
+                "retired": len(self._retired),
+                "hit_rate": self.hits / total if total else 0.0
+            }
@@ -0,0 +1,180 @@
+"""
+사용자별 메모리 통계 카운터
+추가/삭제/수정 때마다 총 개수, 카테고리별 개수, 마지막 시각을 증분 갱신하여
+통계 조회를 전체 메모리 순회 없이 처리 (처음 조회할 때만 저장소에서 한 번 계산)
+카운터는 파일에 저장해 재시작 후에도 다시 계산하지 않음
+"""
+
+import os
+import json
+import atexit
+import logging
+import threading
+from pathlib import Path
+from typing import Dict, Optional, Any, Iterable
+
+logger = logging.getLogger(__name__)
+
+
+def _category(metadata: Optional[Dict[str, Any]]) -> str:
+    return (metadata or {}).get("category") or "uncategorized"
+
+
+def _timestamp(metadata: Optional[Dict[str, Any]]) -> str:
+    return (metadata or {}).get("timestamp", "") or ""
+
+
+class MemoryStats:
+    """
+    사용자별 통계 카운터
+
+    - 아직 계산하지 않은 사용자의 변경은 무시 (처음 조회할 때 저장소에서 계산)
+    - 마지막 시각은 삭제로 줄어들지 않음 (rebuild하면 정확히 다시 계산)
+    - path가 있으면 정상 종료 때 저장하고 다음 시작 때 읽음. 비정상 종료 뒤에 읽은 카운터와
+      변경 내용을 알 수 없어 버린 카운터는 stale - 마지막 값을 보여 주면서 다시 계산
+    """
+
+    def __init__(self, path: Optional[Path] = None):
+        self._users: Dict[str, Dict[str, Any]] = {}
+        self._stale: set = set()
+        self._lock = threading.Lock()
+        self.path = Path(path) if path else None
+        if self.path is not None:
+            self._load()
+            atexit.register(self.save)
+
+    def _load(self):
+        """저장된 카운터 읽기 (정상 종료 때 저장된 파일이 아니면 모두 stale)"""
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except FileNotFoundError:
+            return
+        except Exception as e:
+            logger.warning(f"통계 파일 로드 실패, 다시 계산: {e}")
+            return
+
+        self._users = data.get("users", {})
+        self._stale = set(data.get("stale", [])) & set(self._users)
+        if not data.get("clean"):
+            self._stale = set(self._users)
+        try:
+            # 이번 실행이 비정상 종료되면 다음 시작 때 알 수 있도록 표시
+            self._write(clean=False)
+        except Exception as e:
+            logger.warning(f"통계 파일 기록 실패: {e}")
+
+    def _write(self, clean: bool):
+        """카운터를 파일로 원자적으로 기록 (호출자가 잠금 보유)"""
+        tmp_file = self.path.with_suffix(".json.tmp")
+        with open(tmp_file, 'w', encoding='utf-8') as f:
+            json.dump({
+                "clean": clean,
+                "users": self._users,
+                "stale": sorted(self._stale)
+            }, f, ensure_ascii=False)
+        os.replace(tmp_file, self.path)
+
+    def save(self):
+        """카운터 저장 (종료 시)"""
+        if self.path is None:
+            return
+        with self._lock:
+            try:
+                self._write(clean=True)
+            except Exception as e:
+                logger.warning(f"통계 파일 저장 실패: {e}")
+
+    def has(self, user_id: str) -> bool:
+        """사용자 카운터가 계산되어 있는지 여부"""
+        return user_id in self._users
+
+    def is_stale(self, user_id: str) -> bool:
+        """마지막 값만 있고 다시 계산해야 하는지 여부"""
+        return user_id in self._stale
+
+    def load(self, user_id: str, memories: Iterable[Dict[str, Any]]):
+        """메모리 목록으로 사용자 카운터 다시 계산"""
+        categories: Dict[str, int] = {}
+        last_updated = ""
+        for memory in memories:
+            metadata = memory.get("metadata", {})
+            category = _category(metadata)
+            categories[category] = categories.get(category, 0) + 1
+            last_updated = max(last_updated, _timestamp(metadata))
+
+        with self._lock:
+            self._users[user_id] = {"categories": categories, "last_updated": last_updated}
+            self._stale.discard(user_id)
+
+    def on_add(self, user_id: str, metadata: Optional[Dict[str, Any]]):
+        """메모리 추가 반영"""
+        with self._lock:
+            stats = self._users.get(user_id)
+            if stats is None:
+                return
+            category = _category(metadata)
+            stats["categories"][category] = stats["categories"].get(category, 0) + 1
+            stats["last_updated"] = max(stats["last_updated"], _timestamp(metadata))
+
+    def on_delete(self, user_id: str, metadata: Optional[Dict[str, Any]]):
+        """메모리 삭제 반영"""
+        with self._lock:
+            stats = self._users.get(user_id)
+            if stats is None:
+                return
+            category = _category(metadata)
+            count = stats["categories"].get(category, 0) - 1
+            if count > 0:
+                stats["categories"][category] = count
+            else:
+                stats["categories"].pop(category, None)
+
+    def on_update(
+        self,
+        user_id: str,
+        old_metadata: Optional[Dict[str, Any]],
+        new_metadata: Optional[Dict[str, Any]]
+    ):
+        """메모리 수정 반영 (카테고리 이동 + 마지막 시각)"""
+        self.on_delete(user_id, old_metadata)
+        self.on_add(user_id, new_metadata)
+
+    def invalidate(self, user_id: str):
+        """사용자 카운터를 stale로 표시 (변경 내용을 알 수 없을 때, 마지막 값은 두고 다시 계산)"""
+        with self._lock:
+            if user_id in self._users:
+                self._stale.add(user_id)
+
+    def clear(self):
+        """모든 사용자 카운터 버리기"""
+        with self._lock:
+            self._users.clear()
+            self._stale.clear()
+
+    def get(self, user_id: str) -> Optional[Dict[str, Any]]:
+        """사용자 통계 (계산되지 않았으면 None)"""
+        with self._lock:
+            stats = self._users.get(user_id)
+            if stats is None:
+                return None
+            categories = dict(stats["categories"])
+            return {
+                "total_memories": sum(categories.values()),
+                "categories": categories,
+                "last_updated": stats["last_updated"]
+            }
+
+
+# 같은 파일을 쓰는 매니저끼리는 카운터 공유 (저장할 때 서로 덮어쓰지 않도록)
+_stats: Dict[str, MemoryStats] = {}
+_stats_lock = threading.Lock()
+
+
+def open_memory_stats(path: Path) -> MemoryStats:
+    """파일별 공유 MemoryStats 반환"""
+    key = str(Path(path).resolve())
+    with _stats_lock:
+        if key not in _stats:
+            _stats[key] = MemoryStats(path)
+        return _stats[key]
@@ -0,0 +1,46 @@
+"""
+Ollama 스트리밍 채팅
+ollama.AsyncClient(stream=True)로 생성되는 토큰을 바로 전달 (첫 토큰까지의 시간 단축)
+"""
+
+import logging
+from typing import Dict, List, Any, AsyncIterator
+
+import ollama
+
+logger = logging.getLogger(__name__)
+
+
+async def stream_chat(
+    host: str,
+    model: str,
+    messages: List[Dict[str, str]],
+    options: Dict[str, Any]
+) -> AsyncIterator[str]:
+    """
+    채팅 응답을 토큰(조각) 단위로 생성하는 async generator
+
+    Args:
+        host: Ollama 서버 주소
+        model: 모델 이름
+        messages: 채팅 메시지 목록
+        options: 생성 옵션
+
+    Yields:
+        str: 응답 텍스트 조각
+    """
+    client = ollama.AsyncClient(host=host)
+    try:
+        stream = await client.chat(model=model, messages=messages, options=options, stream=True)
+        async for part in stream:
+            content = part["message"]["content"]
+            if content:
+                yield content
+    finally:
+        # 호출한 이벤트 루프가 닫히기 전에 HTTP 연결 정리
+        http_client = getattr(client, "_client", None)
+        if http_client is not None and hasattr(http_client, "aclose"):
+            try:
+                await http_client.aclose()
+            except Exception as e:
+                logger.debug(f"Ollama 스트림 연결 정리 실패: {e}")
@@ -0,0 +1,253 @@
+"""
+대화 세션 저장소
+세션별 최근 대화를 LRU + 유휴 TTL + 메모리 상한으로 관리하고,
+선택적으로 SQLite에 기록해 재시작 후에도 복구 (자주 쓰는 세션만 RAM에 유지)
+"""
+
+import json
+import time
+import sqlite3
+import logging
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Dict, List, Optional, Any, Tuple
+
+logger = logging.getLogger(__name__)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS sessions (
+    session_id TEXT PRIMARY KEY,
+    messages TEXT NOT NULL,
+    updated_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_sessions_updated ON sessions(updated_at);
+"""
+
+
+def _size(messages: List[Dict[str, str]]) -> int:
+    """세션이 차지하는 대략적인 바이트 수 (내용 길이 기준)"""
+    return sum(len(m.get("content", "")) * 2 + 64 for m in messages)
+
+
+class SessionStore:
+    """
+    세션별 대화 히스토리 저장소
+
+    - RAM: 최근 사용 순 LRU, max_sessions / max_bytes를 넘거나 idle_seconds 동안
+      쓰이지 않은 세션은 내보냄
+    - db_path가 있으면 변경마다 SQLite에 기록하고, RAM에 없는 세션은 조회 시 다시 읽음
+      (retention_days가 지난 세션은 열 때 삭제)
+    """
+
+    def __init__(
+        self,
+        max_messages: int = 20,
+        max_sessions: int = 1000,
+        idle_seconds: float = 3600,
+        max_bytes: int = 32 * 1024 * 1024,
+        db_path: Optional[Path] = None,
+        retention_days: float = 7
+    ):
+        """
+        저장소 초기화
+
+        Args:
+            max_messages: 세션당 유지할 최근 메시지 수
+            max_sessions: RAM에 유지할 최대 세션 수
+            idle_seconds: 이 시간 동안 쓰이지 않은 세션은 RAM에서 내보냄
+            max_bytes: RAM에 유지할 세션 내용의 대략적인 상한
+            db_path: SQLite 파일 경로 (None이면 RAM에만 보관)
+            retention_days: 디스크에 보관할 기간 (0이면 무기한)
+        """
+        self.max_messages = max_messages
+        self.max_sessions = max_sessions
+        self.idle_seconds = idle_seconds
+        self.max_bytes = max_bytes
+
+        # 세션 ID → (메시지 목록, 마지막 사용 시각, 크기), 앞쪽이 가장 오래 쓰이지 않은 세션
+        self._sessions: "OrderedDict[str, Tuple[List[Dict[str, str]], float, int]]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.RLock()
+
+        self.evictions = 0
+        self.loads = 0
+
+        self._conn: Optional[sqlite3.Connection] = None
+        if db_path is not None:
+            self._open_db(Path(db_path), retention_days)
+
+    def _open_db(self, db_path: Path, retention_days: float):
+        """SQLite 열기 및 보관 기간이 지난 세션 삭제"""
+        try:
+            db_path.parent.mkdir(parents=True, exist_ok=True)
+            self._conn = sqlite3.connect(
+                str(db_path),
+                check_same_thread=False,
+                isolation_level=None
+            )
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.executescript(SCHEMA)
+
+            if retention_days:
+                cutoff = time.time() - retention_days * 86400
+                deleted = self._conn.execute(
+                    "DELETE FROM sessions WHERE updated_at < ?", (cutoff,)
+                ).rowcount
+                if deleted:
+                    logger.info(f"🗑️ 보관 기간이 지난 세션 {deleted}개 삭제")
+        except Exception as e:
+            logger.warning(f"세션 DB를 열 수 없어 RAM에만 보관: {e}")
+            self._conn = None
+
+    def __contains__(self, session_id: str) -> bool:
+        with self._lock:
+            return session_id in self._sessions or self._load(session_id) is not None
+
+    def __len__(self) -> int:
+        return len(self._sessions)
+
+    def get(self, session_id: str) -> List[Dict[str, str]]:
+        """세션 히스토리 (복사본, 없으면 빈 목록)"""
+        with self._lock:
+            messages = self._touch(session_id)
+            return list(messages) if messages is not None else []
+
+    def append(self, session_id: str, *messages: Dict[str, str]):
+        """세션에 메시지 추가 (최근 max_messages개만 유지)"""
+        with self._lock:
+            history = self._touch(session_id) or []
+            history = (history + list(messages))[-self.max_messages:]
+            self._set(session_id, history)
+            self._persist(session_id, history)
+            self._evict()
+
+    def delete(self, session_id: str):
+        """세션 삭제 (RAM + 디스크)"""
+        with self._lock:
+            self._drop(session_id)
+            if self._conn is not None:
+                try:
+                    self._conn.execute("DELETE FROM sessions WHERE session_id = ?", (session_id,))
+                except Exception as e:
+                    logger.warning(f"세션 삭제 기록 실패: {e}")
+
+    def _touch(self, session_id: str) -> Optional[List[Dict[str, str]]]:
+        """세션을 최근 사용으로 표시하고 반환 (RAM에 없으면 디스크에서 읽음, 호출자가 잠금 보유)"""
+        self._evict_idle(time.monotonic())
+        entry = self._sessions.get(session_id)
+        if entry is not None:
+            self._sessions[session_id] = (entry[0], time.monotonic(), entry[2])
+            self._sessions.move_to_end(session_id)
+            return entry[0]
+
+        messages = self._load(session_id)
+        if messages is not None:
+            self.loads += 1
+            self._set(session_id, messages)
+            self._evict()
+        return messages
+
+    def _set(self, session_id: str, messages: List[Dict[str, str]]):
+        """RAM에 세션 저장 (호출자가 잠금 보유)"""
+        self._drop(session_id)
+        size = _size(messages)
+        self._sessions[session_id] = (messages, time.monotonic(), size)
+        self._bytes += size
+
+    def _drop(self, session_id: str):
+        """RAM에서 세션 제거 (호출자가 잠금 보유)"""
+        entry = self._sessions.pop(session_id, None)
+        if entry is not None:
+            self._bytes -= entry[2]
+
+    def _evict(self):
+        """개수/메모리 상한을 넘으면 가장 오래 쓰이지 않은 세션부터 내보냄 (호출자가 잠금 보유)"""
+        while len(self._sessions) > 1 and (
+            len(self._sessions) > self.max_sessions or self._bytes > self.max_bytes
+        ):
+            self._evict_oldest()
+
+    def _evict_idle(self, now: float):
+        """유휴 세션 내보내기 - LRU 순서라 앞쪽만 확인 (호출자가 잠금 보유)"""
+        while self._sessions:
+            _, last_used, _ = next(iter(self._sessions.values()))
+            if now - last_used < self.idle_seconds:
+                break
+            self._evict_oldest()
+
+    def _evict_oldest(self):
+        """가장 오래 쓰이지 않은 세션 내보내기 (디스크에는 이미 기록되어 있음)"""
+        session_id, (_, _, size) = self._sessions.popitem(last=False)
+        self._bytes -= size
+        self.evictions += 1
+        logger.debug(f"세션 {session_id[:8]} RAM에서 내보냄")
+
+    def _load(self, session_id: str) -> Optional[List[Dict[str, str]]]:
+        """디스크에서 세션 읽기"""
+        if self._conn is None:
+            return None
+        try:
+            row = self._conn.execute(
+                "SELECT messages FROM sessions WHERE session_id = ?", (session_id,)
+            ).fetchone()
+            return json.loads(row[0]) if row else None
+        except Exception as e:
+            logger.warning(f"세션 읽기 실패: {e}")
+            return None
+
+    def _persist(self, session_id: str, messages: List[Dict[str, str]]):
+        """디스크에 세션 기록"""
+        if self._conn is None:
+            return
+        try:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO sessions (session_id, messages, updated_at) VALUES (?, ?, ?)",
+                (session_id, json.dumps(messages, ensure_ascii=False), time.time())
+            )
+        except Exception as e:
+            logger.warning(f"세션 기록 실패: {e}")
+
+    def stats(self) -> Dict[str, Any]:
+        """저장소 상태"""
+        with self._lock:
+            return {
+                "active": len(self._sessions),
+                "max_sessions": self.max_sessions,
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+                "evictions": self.evictions,
+                "loads": self.loads,
+                "persistent": self._conn is not None
+            }
+
+    def close(self):
+        """DB 연결 닫기"""
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+
+def create_session_store(config: Any, name: str) -> SessionStore:
+    """
+    서비스용 세션 저장소 생성
+
+    Args:
+        config: AppConfig
+        name: 서비스 이름 (data_dir/sessions/<name>.db)
+    """
+    memory_config = config.memory
+    db_path = (
+        Path(config.data_dir) / "sessions" / f"{name}.db"
+        if memory_config.session_persist else None
+    )
+    return SessionStore(
+        max_messages=memory_config.session_max_messages,
+        max_sessions=memory_config.session_max_active,
+        idle_seconds=memory_config.session_idle_seconds,
+        max_bytes=memory_config.session_max_bytes,
+        db_path=db_path,
+        retention_days=memory_config.session_retention_days
+    )
@@ -0,0 +1,433 @@
+"""
+SQLite 기반 로컬 메모리 저장소
+DatabaseConfig.sqlite_path에 저장하며, 사용자별 조회/개수 집계를 인덱스로 처리
+"""
+
+import json
+import sqlite3
+import logging
+import threading
+from typing import Dict, List, Optional, Any, Tuple
+from pathlib import Path
+
+logger = logging.getLogger(__name__)
+
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS memories (
+    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+    id TEXT NOT NULL UNIQUE,
+    user_id TEXT NOT NULL,
+    text TEXT NOT NULL,
+    metadata TEXT NOT NULL DEFAULT '{}',
+    category TEXT,
+    timestamp TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_memories_user_seq ON memories(user_id, seq);
+CREATE INDEX IF NOT EXISTS idx_memories_user_timestamp ON memories(user_id, timestamp);
+CREATE INDEX IF NOT EXISTS idx_memories_user_category ON memories(user_id, category);
+
+-- 저장소 상태 플래그 (기존 파일 저장소 가져오기 완료 여부 등)
+CREATE TABLE IF NOT EXISTS store_meta (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+
+-- 사용자/카테고리별 집계 (트리거로 증분 유지, stats()는 이 테이블만 읽음)
+CREATE TABLE IF NOT EXISTS memory_stats (
+    user_id TEXT NOT NULL,
+    category TEXT NOT NULL,
+    count INTEGER NOT NULL DEFAULT 0,
+    last_updated TEXT,
+    PRIMARY KEY (user_id, category)
+);
+
+CREATE TRIGGER IF NOT EXISTS memories_stats_insert AFTER INSERT ON memories BEGIN
+    INSERT INTO memory_stats (user_id, category, count, last_updated)
+    VALUES (NEW.user_id, COALESCE(NULLIF(NEW.category, ''), 'uncategorized'), 1, NEW.timestamp)
+    ON CONFLICT (user_id, category) DO UPDATE SET
+        count = count + 1,
+        last_updated = MAX(COALESCE(last_updated, ''), COALESCE(excluded.last_updated, ''));
+END;
+
+DROP TRIGGER IF EXISTS memories_stats_delete;
+CREATE TRIGGER memories_stats_delete AFTER DELETE ON memories BEGIN
+    UPDATE memory_stats SET count = count - 1
+    WHERE user_id = OLD.user_id AND category = COALESCE(NULLIF(OLD.category, ''), 'uncategorized');
+    -- 가장 최근 메모리가 지워졌을 때만 마지막 시각 다시 계산 ((user_id, category) 인덱스 사용)
+    UPDATE memory_stats SET last_updated = (
+        SELECT MAX(timestamp) FROM memories
+        WHERE user_id = OLD.user_id
+          AND COALESCE(NULLIF(category, ''), 'uncategorized') = COALESCE(NULLIF(OLD.category, ''), 'uncategorized')
+    )
+    WHERE user_id = OLD.user_id
+      AND category = COALESCE(NULLIF(OLD.category, ''), 'uncategorized')
+      AND COALESCE(OLD.timestamp, '') >= COALESCE(last_updated, '');
+    DELETE FROM memory_stats WHERE user_id = OLD.user_id AND count <= 0;
+END;
+
+CREATE TRIGGER IF NOT EXISTS memories_stats_update AFTER UPDATE OF category, timestamp ON memories BEGIN
+    UPDATE memory_stats SET count = count - 1
+    WHERE user_id = OLD.user_id AND category = COALESCE(NULLIF(OLD.category, ''), 'uncategorized');
+    DELETE FROM memory_stats WHERE user_id = OLD.user_id AND count <= 0;
+    INSERT INTO memory_stats (user_id, category, count, last_updated)
+    VALUES (NEW.user_id, COALESCE(NULLIF(NEW.category, ''), 'uncategorized'), 1, NEW.timestamp)
+    ON CONFLICT (user_id, category) DO UPDATE SET
+        count = count + 1,
+        last_updated = MAX(COALESCE(last_updated, ''), COALESCE(excluded.last_updated, ''));
+END;
+"""
+
+REBUILD_STATS = """
+DELETE FROM memory_stats {where};
+INSERT INTO memory_stats (user_id, category, count, last_updated)
+SELECT user_id, COALESCE(NULLIF(category, ''), 'uncategorized'), COUNT(*), MAX(timestamp)
+FROM memories {where}
+GROUP BY user_id, COALESCE(NULLIF(category, ''), 'uncategorized');
+"""
+
+
+class SQLiteMemoryStore:
+    """
+    SQLite(WAL 모드) 로컬 메모리 저장소
+
+    LocalMemoryStore와 같은 인터페이스를 제공하지만
+    전체 메모리를 RAM에 올리지 않고 필요한 행만 조회
+    """
+
+    def __init__(self, db_path: Path, legacy_dir: Optional[Path] = None):
+        """
+        저장소 초기화
+
+        Args:
+            db_path: SQLite 파일 경로
+            legacy_dir: 기존 local_memories.json/log가 있는 디렉토리 (최초 1회 가져오기)
+        """
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self.key = str(self.db_path.resolve())
+
+        self._lock = threading.RLock()
+        self._conn = sqlite3.connect(
+            str(self.db_path),
+            check_same_thread=False,
+            isolation_level=None  # autocommit, 트랜잭션은 명시적으로 사용
+        )
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        # INSERT OR REPLACE로 지워지는 행에도 삭제 트리거가 동작하도록
+        self._conn.execute("PRAGMA recursive_triggers=ON")
+        self._conn.executescript(SCHEMA)
+
+        # 집계 테이블이 생기기 전에 만든 DB는 한 번 다시 계산
+        row = self._conn.execute(
+            "SELECT EXISTS(SELECT 1 FROM memories), EXISTS(SELECT 1 FROM memory_stats)"
+        ).fetchone()
+        if row[0] and not row[1]:
+            self.rebuild_stats()
+
+        if legacy_dir is not None:
+            self._import_legacy(Path(legacy_dir))
+
+        logger.info(f"SQLite 로컬 저장소 초기화 완료: {self.db_path}")
+
+    def _get_meta(self, key: str) -> Optional[str]:
+        with self._lock:
+            row = self._conn.execute("SELECT value FROM store_meta WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else None
+
+    def _set_meta(self, key: str, value: str):
+        """상태 플래그 기록 (호출자가 잠금 보유)"""
+        self._conn.execute(
+            "INSERT OR REPLACE INTO store_meta (key, value) VALUES (?, ?)", (key, value)
+        )
+
+    def _import_legacy(self, legacy_dir: Path):
+        """
+        기존 파일 저장소(단일 파일 또는 사용자별 샤드)를 한 번만 가져오기
+
+        완료 여부는 store_meta에 기록 (메모리를 모두 지운 뒤 재시작해도 다시 가져오지 않음)
+        """
+        if self._get_meta("legacy_imported"):
+            return
+
+        shard_dir = legacy_dir / "local_memories"
+        has_legacy = (
+            (legacy_dir / "local_memories.json").exists()
+            or (legacy_dir / "local_memories.log").exists()
+            or (shard_dir.is_dir() and any(shard_dir.iterdir()))
+        )
+
+        with self._lock:
+            # 플래그가 생기기 전에 이미 가져온 DB (행이 있으면 가져오기가 끝난 것으로 봄)
+            row = self._conn.execute("SELECT EXISTS(SELECT 1 FROM memories)").fetchone()
+            if not has_legacy or row[0]:
+                self._set_meta("legacy_imported", "1")
+                return
+
+        from core.local_store import read_stored_memories
+
+        try:
+            # 저장소를 열지 않고 스냅샷/로그 파일을 직접 읽음 (스레드/파일 이동 없음)
+            memories = read_stored_memories(legacy_dir)
+            imported = 0
+            with self._lock:
+                self._conn.execute("BEGIN")
+                try:
+                    for user_id, entries in memories.items():
+                        for entry in entries.values():
+                            self._insert(user_id, entry)
+                            imported += 1
+                    self._set_meta("legacy_imported", "1")
+                    self._conn.execute("COMMIT")
+                except Exception:
+                    self._conn.execute("ROLLBACK")
+                    raise
+            if imported:
+                logger.info(f"기존 로컬 메모리 {imported}개를 SQLite로 가져옴")
+        except Exception as e:
+            logger.error(f"기존 로컬 메모리 가져오기 실패: {e}")
+
+    # ------------------------------------------------------------------
+    # 쓰기
+    # ------------------------------------------------------------------
+
+    def _insert(self, user_id: str, entry: Dict[str, Any]):
+        """행 삽입 (호출자가 잠금 보유)"""
+        metadata = entry.get("metadata", {}) or {}
+        self._conn.execute(
+            "INSERT OR REPLACE INTO memories (id, user_id, text, metadata, category, timestamp) "
+            "VALUES (?, ?, ?, ?, ?, ?)",
+            (
+                entry["id"],
+                user_id,
+                entry.get("text", ""),
+                json.dumps(metadata, ensure_ascii=False),
+                metadata.get("category"),
+                metadata.get("timestamp")
+            )
+        )
+
+    def add(self, user_id: str, entry: Dict[str, Any]):
+        """메모리 추가"""
+        with self._lock:
+            self._insert(user_id, entry)
+
+    def add_many(self, user_id: str, entries: List[Dict[str, Any]]):
+        """메모리 여러 개 추가 (단일 트랜잭션)"""
+        if not entries:
+            return
+        with self._lock:
+            self._conn.execute("BEGIN")
+            try:
+                for entry in entries:
+                    self._insert(user_id, entry)
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+
+    def delete(self, user_id: str, memory_id: str) -> bool:
+        """메모리 삭제"""
+        with self._lock:
+            cursor = self._conn.execute(
+                "DELETE FROM memories WHERE id = ? AND user_id = ?",
+                (memory_id, user_id)
+            )
+            return cursor.rowcount > 0
+
+    def delete_many(self, user_id: str, memory_ids: List[str]) -> int:
+        """여러 메모리 삭제 (단일 트랜잭션, SQLite 변수 수 제한에 맞춰 나눠 실행)"""
+        if not memory_ids:
+            return 0
+        deleted = 0
+        with self._lock:
+            self._conn.execute("BEGIN")
+            try:
+                for start in range(0, len(memory_ids), 500):
+                    chunk = memory_ids[start:start + 500]
+                    placeholders = ",".join("?" * len(chunk))
+                    cursor = self._conn.execute(
+                        f"DELETE FROM memories WHERE user_id = ? AND id IN ({placeholders})",
+                        (user_id, *chunk)
+                    )
+                    deleted += cursor.rowcount
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+        return deleted
+
+    def delete_all(self, user_id: str) -> int:
+        """사용자 메모리 전체 삭제"""
+        with self._lock:
+            cursor = self._conn.execute(
+                "DELETE FROM memories WHERE user_id = ?", (user_id,)
+            )
+            return cursor.rowcount
+
+    def update(
+        self,
+        user_id: str,
+        memory_id: str,
+        text: Optional[str] = None,
+        metadata: Optional[Dict[str, Any]] = None
+    ) -> bool:
+        """메모리 수정"""
+        with self._lock:
+            entry = self.get(user_id, memory_id)
+            if entry is None:
+                return False
+            if text is not None:
+                entry["text"] = text
+            if metadata:
+                entry["metadata"].update(metadata)
+
+            merged = entry["metadata"]
+            self._conn.execute(
+                "UPDATE memories SET text = ?, metadata = ?, category = ?, timestamp = ? "
+                "WHERE id = ? AND user_id = ?",
+                (
+                    entry["text"],
+                    json.dumps(merged, ensure_ascii=False),
+                    merged.get("category"),
+                    merged.get("timestamp"),
+                    memory_id,
+                    user_id
+                )
+            )
+            return True
+
+    def snapshot(self):
+        """WAL 체크포인트 (LocalMemoryStore.snapshot 대응)"""
+        with self._lock:
+            self._conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+
+    def close(self):
+        """연결 닫기"""
+        with self._lock:
+            self._conn.close()
+
+    # ------------------------------------------------------------------
+    # 읽기
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def _row_to_entry(row: sqlite3.Row) -> Dict[str, Any]:
+        """DB 행을 메모리 엔트리로 변환"""
+        try:
+            metadata = json.loads(row["metadata"]) if row["metadata"] else {}
+        except json.JSONDecodeError:
+            metadata = {}
+        return {
+            "id": row["id"],
+            "text": row["text"],
+            "metadata": metadata
+        }
+
+    def get(self, user_id: str, memory_id: str) -> Optional[Dict[str, Any]]:
+        """ID로 메모리 조회"""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT id, text, metadata FROM memories WHERE id = ? AND user_id = ?",
+                (memory_id, user_id)
+            ).fetchone()
+        return self._row_to_entry(row) if row else None
+
+    def get_user_memories(
+        self,
+        user_id: str,
+        limit: Optional[int] = None,
+        offset: int = 0
+    ) -> List[Dict[str, Any]]:
+        """사용자의 메모리 목록 (추가 순서)"""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT id, text, metadata FROM memories WHERE user_id = ? "
+                "ORDER BY seq LIMIT ? OFFSET ?",
+                (user_id, limit if limit else -1, offset)
+            ).fetchall()
+        return [self._row_to_entry(row) for row in rows]
+
+    def page(
+        self,
+        user_id: str,
+        limit: int = 20,
+        cursor: Optional[str] = None,
+        order: str = "asc"
+    ) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+        """
+        커서 기반 페이지 조회 (커서는 마지막 행의 seq, (user_id, seq) 인덱스로 바로 이동)
+
+        Args:
+            order: "asc"면 추가 순서, "desc"면 최신 메모리부터
+
+        Returns:
+            (엔트리 목록, 다음 페이지 커서 또는 None)
+        """
+        with self._lock:
+            if order == "desc":
+                rows = self._conn.execute(
+                    "SELECT seq, id, text, metadata FROM memories WHERE user_id = ? AND seq < ? "
+                    "ORDER BY seq DESC LIMIT ?",
+                    (user_id, int(cursor) if cursor else 2 ** 63 - 1, limit + 1)
+                ).fetchall()
+            else:
+                rows = self._conn.execute(
+                    "SELECT seq, id, text, metadata FROM memories WHERE user_id = ? AND seq > ? "
+                    "ORDER BY seq LIMIT ?",
+                    (user_id, int(cursor) if cursor else 0, limit + 1)
+                ).fetchall()
+        has_more = len(rows) > limit
+        rows = rows[:limit]
+        next_cursor = str(rows[-1]["seq"]) if has_more else None
+        return [self._row_to_entry(row) for row in rows], next_cursor
+
+    def has_user(self, user_id: str) -> bool:
+        """사용자 메모리 존재 여부"""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT 1 FROM memories WHERE user_id = ? LIMIT 1",
+                (user_id,)
+            ).fetchone()
+        return row is not None
+
+    def count(self, user_id: str) -> int:
+        """사용자 메모리 개수"""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT COUNT(*) FROM memories WHERE user_id = ?",
+                (user_id,)
+            ).fetchone()
+        return row[0]
+
+    def stats(self, user_id: str) -> Dict[str, Any]:
+        """사용자 메모리 집계 (총 개수, 카테고리별 개수, 마지막 시각) - 집계 테이블만 읽음"""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT category, count, last_updated FROM memory_stats WHERE user_id = ?",
+                (user_id,)
+            ).fetchall()
+
+        categories = {row["category"]: row["count"] for row in rows}
+        return {
+            "total_memories": sum(categories.values()),
+            "categories": categories,
+            "last_updated": max((row["last_updated"] or "" for row in rows), default="")
+        }
+
+    def rebuild_stats(self, user_id: Optional[str] = None):
+        """memories 테이블에서 집계 다시 계산 (user_id가 없으면 전체)"""
+        where = "WHERE user_id = ?" if user_id is not None else ""
+        params = (user_id,) if user_id is not None else ()
+        with self._lock:
+            self._conn.execute("BEGIN")
+            try:
+                for statement in REBUILD_STATS.format(where=where).split(";"):
+                    if statement.strip():
+                        self._conn.execute(statement, params)
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
@@ -0,0 +1,475 @@
+"""
+프로세스 내 NumPy 벡터 색인 - 벡터 DB 없이 동작하는 로컬 의미 검색 폴백
+사용자별 임베딩을 float32 행렬로 보관하고, 검색은 행렬-벡터 곱 한 번 + argpartition
+디스크에는 행 우선 원시 행렬(.vec) + ID 사이드카(.meta.json) 세대로 저장하고 numpy.memmap으로 열어
+시작 비용 없이 바로 검색 (여러 워커 프로세스가 같은 페이지 캐시를 공유)
+"""
+
+import json
+import os
+import atexit
+import logging
+import threading
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+from pathlib import Path
+from urllib.parse import quote
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# 세그먼트 파일에 저장할 수 있는 자료형
+SEGMENT_DTYPES = ("float32", "float16")
+
+
+def _segment_files(vector_dir: Path, name: str, generation: int) -> Tuple[Path, Path]:
+    """세대별 세그먼트 파일 경로"""
+    # 사용자 이름은 quote(safe="")로 인코딩되어 "@"가 나오지 않으므로 세대 구분자로 사용
+    return vector_dir / f"{name}@{generation}.vec", vector_dir / f"{name}@{generation}.meta.json"
+
+
+def _read_generation(pointer_file: Path) -> Optional[int]:
+    """포인터 파일의 현재 세대 번호 (없으면 None)"""
+    try:
+        return int(pointer_file.read_text(encoding="utf-8").strip())
+    except (FileNotFoundError, ValueError):
+        return None
+
+
+def _fsync_write(path: Path, data: bytes):
+    with open(path, 'wb') as f:
+        f.write(data)
+        f.flush()
+        os.fsync(f.fileno())
+
+
+def write_segment(vector_dir: Path, name: str, ids: List[str], matrix: np.ndarray, dtype: str = "float32") -> int:
+    """
+    임베딩 세그먼트를 새 세대로 기록하고 포인터 파일을 마지막에 원자적으로 교체
+
+    - <name>@<세대>.vec: (n, dim) 행 우선 원시 행렬, i번째 행은 바이트 오프셋 i * dim * itemsize
+    - <name>@<세대>.meta.json: {"dim", "dtype", "count", "ids"} - ids는 행 순서
+    - <name>.seg: 현재 세대 번호
+
+    행렬과 사이드카가 모두 기록된 뒤에 포인터를 바꾸므로 중간에 죽어도 이전 세대가 그대로 유효하고,
+    memmap으로 열려 있을 수 있는 파일을 덮어쓰지 않음 (Windows에서는 열린 파일 교체 불가)
+
+    Returns:
+        int: 기록한 세대 번호
+    """
+    pointer_file = vector_dir / f"{name}.seg"
+    generation = (_read_generation(pointer_file) or 0) + 1
+    matrix_file, meta_file = _segment_files(vector_dir, name, generation)
+
+    data = np.ascontiguousarray(matrix, dtype=dtype)
+    _fsync_write(matrix_file, data.tobytes())
+    _fsync_write(meta_file, json.dumps({
+        "dim": int(matrix.shape[1]) if matrix.ndim == 2 else 0,
+        "dtype": dtype,
+        "count": len(ids),
+        "ids": ids
+    }).encode("utf-8"))
+
+    tmp_pointer = pointer_file.with_suffix(".seg.tmp")
+    _fsync_write(tmp_pointer, str(generation).encode("utf-8"))
+    os.replace(tmp_pointer, pointer_file)
+
+    remove_stale_segments(vector_dir, name, generation)
+    return generation
+
+
+def remove_stale_segments(vector_dir: Path, name: str, generation: int):
+    """현재 세대가 아닌 세그먼트 파일 정리 (아직 memmap으로 열려 있어 지울 수 없으면 다음 저장 때 다시 시도)"""
+    stale = []
+    prefix = f"{name}@"
+    for path in vector_dir.iterdir():
+        if not path.name.startswith(prefix):
+            continue
+        number = path.name[len(prefix):].split(".", 1)[0]
+        if number.isdigit() and int(number) != generation:
+            stale.append(path)
+
+    for path in stale:
+        try:
+            path.unlink()
+        except FileNotFoundError:
+            continue
+        except OSError as e:
+            logger.debug(f"이전 벡터 세그먼트 정리 보류 ({path.name}): {e}")
+
+
+def read_segment(vector_dir: Path, name: str) -> Optional[Tuple[List[str], np.ndarray]]:
+    """
+    현재 세대의 임베딩 세그먼트를 읽기 전용 memmap으로 열기 (복사 없음)
+
+    Returns:
+        (ID 목록, (n, dim) memmap) 또는 파일이 없거나 불일치하면 None
+    """
+    generation = _read_generation(vector_dir / f"{name}.seg")
+    if generation is None:
+        return None
+    matrix_file, meta_file = _segment_files(vector_dir, name, generation)
+    if not matrix_file.exists() or not meta_file.exists():
+        return None
+    with open(meta_file, 'r', encoding='utf-8') as f:
+        meta = json.load(f)
+
+    ids, dim, dtype = meta["ids"], int(meta["dim"]), meta["dtype"]
+    itemsize = np.dtype(dtype).itemsize
+    if len(ids) != meta["count"] or matrix_file.stat().st_size != len(ids) * dim * itemsize:
+        logger.warning(f"벡터 세그먼트 크기 불일치, 무시: {matrix_file.name}")
+        return None
+    if not ids:
+        return ids, np.zeros((0, dim), dtype=np.float32)
+    return ids, np.memmap(matrix_file, dtype=dtype, mode="r", shape=(len(ids), dim))
+
+
+class UserVectorIndex:
+    """한 사용자의 임베딩 행렬 (행은 L2 정규화되어 내적 = 코사인 유사도)"""
+
+    def __init__(self, dim: Optional[int] = None):
+        self.ids: List[str] = []
+        self.positions: Dict[str, int] = {}
+        self.dim = dim
+        self._matrix = np.zeros((0, dim or 0), dtype=np.float32)
+        self.dirty = False
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    @property
+    def matrix(self) -> np.ndarray:
+        """사용 중인 행만 담은 (n, dim) 행렬 뷰"""
+        return self._matrix[:len(self.ids)]
+
+    def _ensure_writable(self):
+        """읽기 전용 memmap이면 첫 변경 시 RAM(float32)으로 복사"""
+        if not self._matrix.flags.writeable:
+            self._matrix = np.array(self._matrix, dtype=np.float32)
+
+    @staticmethod
+    def _normalize(vector) -> np.ndarray:
+        vector = np.asarray(vector, dtype=np.float32).reshape(-1)
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm > 0 else vector
+
+    def add(self, memory_id: str, vector):
+        """벡터 추가 (용량은 두 배씩 늘려 분할 상환 O(1))"""
+        vector = self._normalize(vector)
+        if self.dim is None or not self.ids:
+            if self.dim != vector.shape[0]:
+                self.dim = vector.shape[0]
+                self._matrix = np.zeros((0, self.dim), dtype=np.float32)
+        if vector.shape[0] != self.dim:
+            logger.warning(f"임베딩 차원 불일치 ({vector.shape[0]} != {self.dim}), 건너뜀")
+            return
+
+        self._ensure_writable()
+        if memory_id in self.positions:
+            self._matrix[self.positions[memory_id]] = vector
+            self.dirty = True
+            return
+
+        n = len(self.ids)
+        if n >= self._matrix.shape[0]:
+            grown = np.zeros((max(16, n * 2), self.dim), dtype=np.float32)
+            grown[:n] = self._matrix[:n]
+            self._matrix = grown
+
+        self._matrix[n] = vector
+        self.ids.append(memory_id)
+        self.positions[memory_id] = n
+        self.dirty = True
+
+    def remove(self, memory_id: str) -> bool:
+        """벡터 제거 (마지막 행과 자리 바꿈, O(1))"""
+        pos = self.positions.pop(memory_id, None)
+        if pos is None:
+            return False
+
+        self._ensure_writable()
+        last = len(self.ids) - 1
+        if pos != last:
+            moved_id = self.ids[last]
+            self._matrix[pos] = self._matrix[last]
+            self.ids[pos] = moved_id
+            self.positions[moved_id] = pos
+        self.ids.pop()
+        self.dirty = True
+        return True
+
+    def search(
+        self,
+        query_vector,
+        limit: int = 10,
+        threshold: Optional[float] = None,
+        exclude: Optional[str] = None
+    ) -> List[Tuple[float, str]]:
+        """
+        코사인 유사도 상위 k개
+
+        Returns:
+            List[(유사도, 메모리 ID)]: 유사도 내림차순
+        """
+        n = len(self.ids)
+        if n == 0 or limit <= 0:
+            return []
+
+        query = self._normalize(query_vector)
+        if query.shape[0] != self.dim:
+            logger.warning(f"쿼리 임베딩 차원 불일치 ({query.shape[0]} != {self.dim})")
+            return []
+
+        # float16 세그먼트도 결과는 float32 (복사본이므로 exclude 처리 가능)
+        scores = np.asarray(self.matrix @ query, dtype=np.float32)
+        if exclude is not None and exclude in self.positions:
+            scores[self.positions[exclude]] = -np.inf
+
+        k = min(limit, n)
+        if k < n:
+            top = np.argpartition(-scores, k - 1)[:k]
+        else:
+            top = np.arange(n)
+        top = top[np.argsort(-scores[top])]
+
+        return self._ranked(scores, top, threshold)
+
+    def _ranked(self, scores: np.ndarray, top: np.ndarray, threshold: Optional[float]) -> List[Tuple[float, str]]:
+        """상위 위치를 (유사도, ID) 목록으로 변환"""
+        results = []
+        for pos in top:
+            score = float(scores[pos])
+            if not np.isfinite(score):
+                continue
+            if threshold is not None and score < threshold:
+                break
+            results.append((score, self.ids[pos]))
+        return results
+
+    def recommend(
+        self,
+        memory_ids: List[str],
+        limit: int = 5,
+        threshold: Optional[float] = None
+    ) -> Dict[str, List[Tuple[float, str]]]:
+        """
+        저장된 벡터 기준 유사 메모리 (재임베딩 없음, 여러 ID를 행렬 곱 한 번으로 처리)
+
+        Returns:
+            Dict[기준 ID, List[(유사도, ID)]]: 기준 메모리 자신은 제외, 없는 ID는 생략
+        """
+        rows = [self.positions[memory_id] for memory_id in memory_ids if memory_id in self.positions]
+        n = len(self.ids)
+        if not rows or limit <= 0:
+            return {}
+
+        # (n, m) 유사도 - 저장된 행은 이미 정규화되어 있음
+        scores = np.asarray(self.matrix @ self.matrix[rows].T, dtype=np.float32)
+        scores[rows, np.arange(len(rows))] = -np.inf
+
+        k = min(limit, n)
+        related = {}
+        for column, pos in enumerate(rows):
+            column_scores = scores[:, column]
+            if k < n:
+                top = np.argpartition(-column_scores, k - 1)[:k]
+            else:
+                top = np.arange(n)
+            top = top[np.argsort(-column_scores[top])]
+            related[self.ids[pos]] = self._ranked(column_scores, top, threshold)
+        return related
+
+
+class LocalVectorIndex:
+    """
+    사용자별 임베딩 행렬 모음
+
+    - data_dir/vectors/ 아래 사용자마다 세대별 <user>@<n>.vec(원시 행렬) + <user>@<n>.meta.json(ID 사이드카),
+      현재 세대는 <user>.seg 포인터 파일이 가리킴
+    - 첫 접근 시 memmap으로 열고(읽기 전용, 복사 없음), 첫 변경 때만 RAM으로 복사
+    - LRU로 상주 사용자 수 제한
+    - 변경분은 save_interval개마다, 해제/종료 시 디스크에 기록
+    """
+
+    def __init__(
+        self,
+        data_dir: Path,
+        max_users: int = 256,
+        save_interval: int = 64,
+        dtype: str = "float32"
+    ):
+        self.vector_dir = Path(data_dir) / "vectors"
+        self.vector_dir.mkdir(parents=True, exist_ok=True)
+        self.key = str(self.vector_dir.resolve())
+        self.max_users = max_users
+        self.save_interval = save_interval
+        if dtype not in SEGMENT_DTYPES:
+            logger.warning(f"지원하지 않는 벡터 자료형: {dtype}, float32 사용")
+            dtype = "float32"
+        self.dtype = dtype
+
+        self._users: "OrderedDict[str, UserVectorIndex]" = OrderedDict()
+        self._changes: Dict[str, int] = {}
+        self._lock = threading.RLock()
+        atexit.register(self.save_all)
+
+    @staticmethod
+    def _name(user_id: str) -> str:
+        return quote(user_id, safe="")
+
+    def _has_segment(self, user_id: str) -> bool:
+        """세그먼트 포인터 파일 존재 여부"""
+        return (self.vector_dir / f"{self._name(user_id)}.seg").exists()
+
+    def _load(self, user_id: str) -> UserVectorIndex:
+        """디스크에서 사용자 세그먼트를 memmap으로 열기 (없으면 빈 색인)"""
+        index = UserVectorIndex()
+        try:
+            segment = read_segment(self.vector_dir, self._name(user_id))
+            if segment is not None:
+                ids, matrix = segment
+                index.dim = matrix.shape[1]
+                index._matrix = matrix
+                index.ids = ids
+                index.positions = {memory_id: i for i, memory_id in enumerate(ids)}
+        except Exception as e:
+            logger.error(f"벡터 파일 로드 실패 ({user_id}): {e}")
+        return index
+
+    def _save(self, user_id: str, index: UserVectorIndex):
+        """사용자 행렬을 세그먼트 파일로 기록"""
+        try:
+            # 변경된 색인은 이미 RAM 복사본이라 이전 세대 memmap을 잡고 있지 않음
+            write_segment(self.vector_dir, self._name(user_id), index.ids, index.matrix, self.dtype)
+            index.dirty = False
+            self._changes[user_id] = 0
+        except Exception as e:
+            logger.error(f"벡터 파일 저장 실패 ({user_id}): {e}")
+
+    def get(self, user_id: str) -> UserVectorIndex:
+        """사용자 색인 가져오기 (없으면 로드)"""
+        with self._lock:
+            index = self._users.get(user_id)
+            if index is None:
+                index = self._load(user_id)
+                self._users[user_id] = index
+            else:
+                self._users.move_to_end(user_id)
+
+            while len(self._users) > self.max_users:
+                old_id, old_index = self._users.popitem(last=False)
+                if old_index.dirty:
+                    self._save(old_id, old_index)
+            return index
+
+    def _changed(self, user_id: str, index: UserVectorIndex, count: int = 1):
+        """변경 횟수 누적, save_interval마다 저장 (호출자가 잠금 보유)"""
+        self._changes[user_id] = self._changes.get(user_id, 0) + count
+        if self._changes[user_id] >= self.save_interval:
+            self._save(user_id, index)
+
+    def add(self, user_id: str, memory_id: str, vector):
+        """임베딩 추가"""
+        with self._lock:
+            index = self.get(user_id)
+            index.add(memory_id, vector)
+            self._changed(user_id, index)
+
+    def remove(self, user_id: str, memory_id: str):
+        """임베딩 제거"""
+        with self._lock:
+            index = self.get(user_id)
+            if index.remove(memory_id):
+                self._changed(user_id, index)
+
+    def remove_many(self, user_id: str, memory_ids: List[str]) -> int:
+        """임베딩 여러 개 제거 (저장은 많아야 한 번)"""
+        with self._lock:
+            index = self.get(user_id)
+            removed = sum(1 for memory_id in memory_ids if index.remove(memory_id))
+            if removed:
+                self._changed(user_id, index, removed)
+            return removed
+
+    def drop(self, user_id: str):
+        """
+        사용자 임베딩 전체 삭제
+
+        RAM 행렬을 버리고 빈 세대를 기록해 이전 세그먼트 파일을 정리
+        (포인터를 지우지 않으므로 세대 번호가 되돌아가 열려 있는 파일을 덮어쓰지 않음)
+        """
+        with self._lock:
+            self._users.pop(user_id, None)
+            self._changes.pop(user_id, None)
+            if self._has_segment(user_id):
+                self._save(user_id, UserVectorIndex())
+
+    def reconcile(self, user_id: str, memory_ids: List[str]) -> List[str]:
+        """
+        로컬 저장소의 메모리 ID 목록에 맞추기
+
+        저장 주기(save_interval) 사이에 비정상 종료되면 세그먼트에 최근 변경이 빠져 있으므로,
+        저장소에 없는 벡터는 제거하고 벡터가 없는 ID를 돌려줌 (호출자가 다시 임베딩)
+
+        Returns:
+            List[str]: 벡터가 없는 메모리 ID (memory_ids 순서)
+        """
+        with self._lock:
+            index = self.get(user_id)
+            wanted = set(memory_ids)
+            stale = [memory_id for memory_id in index.ids if memory_id not in wanted]
+            if stale:
+                self.remove_many(user_id, stale)
+            return [memory_id for memory_id in memory_ids if memory_id not in index.positions]
+
+    def search(
+        self,
+        user_id: str,
+        query_vector,
+        limit: int = 10,
+        threshold: Optional[float] = None,
+        exclude: Optional[str] = None
+    ) -> List[Tuple[float, str]]:
+        """사용자 임베딩에서 코사인 유사도 상위 k개"""
+        with self._lock:
+            return self.get(user_id).search(query_vector, limit, threshold, exclude)
+
+    def recommend(
+        self,
+        user_id: str,
+        memory_ids: List[str],
+        limit: int = 5,
+        threshold: Optional[float] = None
+    ) -> Dict[str, List[Tuple[float, str]]]:
+        """저장된 벡터 기준 유사 메모리 (기준 ID별)"""
+        with self._lock:
+            return self.get(user_id).recommend(memory_ids, limit, threshold)
+
+    def has_vectors(self, user_id: str) -> bool:
+        """사용자 임베딩 존재 여부"""
+        with self._lock:
+            if user_id not in self._users and not self._has_segment(user_id):
+                return False
+            return len(self.get(user_id)) > 0
+
+    def save_all(self):
+        """변경된 모든 사용자 행렬 저장"""
+        with self._lock:
+            for user_id, index in self._users.items():
+                if index.dirty:
+                    self._save(user_id, index)
+
+
+# 같은 data_dir을 쓰는 매니저끼리는 벡터 색인 공유
+_vector_indexes: Dict[str, LocalVectorIndex] = {}
+_vector_indexes_lock = threading.Lock()
+
+
+def open_vector_index(data_dir: Path, **kwargs) -> LocalVectorIndex:
+    """data_dir별 공유 LocalVectorIndex 반환"""
+    key = str((Path(data_dir) / "vectors").resolve())
+    with _vector_indexes_lock:
+        if key not in _vector_indexes:
+            _vector_indexes[key] = LocalVectorIndex(data_dir, **kwargs)
+        return _vector_indexes[key]
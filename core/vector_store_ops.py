@@ -0,0 +1,458 @@
+"""
+mem0 벡터 저장소 직접 접근 도우미
+mem0 Memory API가 제공하지 않는 작업(저장된 벡터 조회 등)을
+백엔드(Qdrant / ChromaDB) 클라이언트로 직접 수행
+"""
+
+import uuid
+import hashlib
+import logging
+import threading
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional, Any, Iterator, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+def get_provider(vector_store: Any) -> str:
+    """mem0 벡터 저장소 객체의 백엔드 이름 ("qdrant", "chroma" 또는 클래스 이름)"""
+    name = type(vector_store).__name__.lower()
+    if "qdrant" in name:
+        return "qdrant"
+    if "chroma" in name:
+        return "chroma"
+    return name
+
+
+def _point_vector(vector: Any) -> Optional[List[float]]:
+    """Qdrant 포인트 벡터 정규화 (이름 있는 벡터는 기본 벡터 사용)"""
+    if vector is None:
+        return None
+    if isinstance(vector, dict):
+        vector = vector.get("") or next(iter(vector.values()), None)
+    return list(vector) if vector is not None else None
+
+
+def fetch_vectors(vector_store: Any, ids: List[str]) -> Dict[str, List[float]]:
+    """
+    저장된 벡터를 ID로 조회 (재임베딩 없이)
+
+    Args:
+        vector_store: mem0 Memory.vector_store
+        ids: 메모리 ID 목록
+
+    Returns:
+        Dict[str, List[float]]: ID → 벡터 (없는 ID는 생략)
+    """
+    if not ids:
+        return {}
+
+    provider = get_provider(vector_store)
+    vectors: Dict[str, List[float]] = {}
+
+    if provider == "qdrant":
+        points = vector_store.client.retrieve(
+            collection_name=vector_store.collection_name,
+            ids=ids,
+            with_payload=False,
+            with_vectors=True
+        )
+        for point in points:
+            vector = _point_vector(point.vector)
+            if vector is not None:
+                vectors[str(point.id)] = vector
+
+    elif provider == "chroma":
+        result = vector_store.collection.get(ids=ids, include=["embeddings"])
+        embeddings = result.get("embeddings")
+        if embeddings is not None:
+            for memory_id, vector in zip(result.get("ids", []), embeddings):
+                if vector is not None:
+                    vectors[memory_id] = list(vector)
+
+    else:
+        logger.warning(f"벡터 조회를 지원하지 않는 저장소: {provider}")
+
+    return vectors
+
+
+# mem0 페이로드 중 메타데이터가 아닌 키 (mem0 Memory._format과 같은 기준)
+_CORE_PAYLOAD_KEYS = {"data", "hash", "created_at", "updated_at", "id"}
+_PROMOTED_PAYLOAD_KEYS = {"user_id", "agent_id", "run_id", "actor_id", "role"}
+
+
+def payload_to_memory(memory_id: str, payload: Dict[str, Any], score: Optional[float] = None) -> Dict[str, Any]:
+    """벡터 저장소 페이로드를 mem0 search() 결과와 같은 형식으로 변환"""
+    payload = payload or {}
+    item = {
+        "id": str(memory_id),
+        "memory": payload.get("data", ""),
+        "hash": payload.get("hash"),
+        "created_at": payload.get("created_at"),
+        "updated_at": payload.get("updated_at"),
+        "metadata": {
+            key: value for key, value in payload.items()
+            if key not in _CORE_PAYLOAD_KEYS and key not in _PROMOTED_PAYLOAD_KEYS
+        }
+    }
+    for key in _PROMOTED_PAYLOAD_KEYS:
+        if key in payload:
+            item[key] = payload[key]
+    if score is not None:
+        item["score"] = score
+    return item
+
+
+def point_id(user_id: str, memory_id: str) -> str:
+    """
+    로컬 메모리 ID에서 만드는 결정적 벡터 저장소 포인트 ID (UUID 형식, Qdrant/ChromaDB 공용)
+
+    같은 메모리를 다시 저장하면 같은 포인트를 덮어쓰므로 재시도해도 중복되지 않음
+    """
+    return str(uuid.uuid5(uuid.NAMESPACE_URL, f"mem0-test/{user_id}/{memory_id}"))
+
+
+def insert_memories(
+    vector_store: Any,
+    vectors: List[List[float]],
+    texts: List[str],
+    metadatas: List[Dict[str, Any]],
+    user_id: str,
+    batch_size: int = 256,
+    ids: Optional[List[str]] = None
+) -> List[str]:
+    """
+    미리 계산한 임베딩으로 메모리 여러 개를 청크 단위 upsert
+
+    mem0 Memory.add(infer=False)와 같은 페이로드(data, hash, created_at, user_id + 메타데이터)를
+    만들기 때문에 저장된 메모리는 mem0 search/get_all/get에서 그대로 조회됨
+
+    Args:
+        ids: 포인트 ID (입력 순서, 없으면 새로 생성 - point_id()로 만들면 재시도가 덮어씀)
+
+    Returns:
+        List[str]: 저장한 메모리 ID (입력 순서)
+    """
+    created_at = datetime.now().astimezone().isoformat()
+    if ids is None:
+        ids = [str(uuid.uuid4()) for _ in texts]
+    payloads = []
+    for text, metadata in zip(texts, metadatas):
+        payload = dict(metadata or {})
+        payload.update({
+            "data": text,
+            "hash": hashlib.md5(text.encode()).hexdigest(),
+            "created_at": created_at,
+            "user_id": user_id
+        })
+        payloads.append(payload)
+
+    for start in range(0, len(ids), batch_size):
+        end = start + batch_size
+        vector_store.insert(vectors=vectors[start:end], payloads=payloads[start:end], ids=ids[start:end])
+    return ids
+
+
+def search_by_vectors(
+    vector_store: Any,
+    vectors: List[List[float]],
+    limit: int = 5,
+    user_id: Optional[str] = None,
+    exclude_ids: Optional[List[str]] = None
+) -> List[List[Dict[str, Any]]]:
+    """
+    저장된 벡터로 직접 kNN 검색 (재임베딩 없음), 여러 쿼리는 한 번에 처리
+
+    Args:
+        vector_store: mem0 Memory.vector_store
+        vectors: 쿼리 벡터 목록
+        limit: 쿼리별 최대 결과 수
+        user_id: 지정하면 해당 사용자 포인트만 검색
+        exclude_ids: 쿼리별로 결과에서 뺄 ID (vectors와 같은 순서, 보통 기준 메모리 자신)
+
+    Returns:
+        List[List[Dict]]: 쿼리별 결과 (mem0 search() 결과 형식)
+    """
+    if not vectors:
+        return []
+    exclude_ids = exclude_ids or [None] * len(vectors)
+    provider = get_provider(vector_store)
+
+    if provider == "qdrant":
+        from qdrant_client import models
+
+        requests = []
+        for vector, exclude_id in zip(vectors, exclude_ids):
+            query_filter = models.Filter(
+                must=[
+                    models.FieldCondition(key="user_id", match=models.MatchValue(value=user_id))
+                ] if user_id else None,
+                # 기준 메모리는 쿼리 필터에서 제외 (limit + 1로 받아 거르지 않음)
+                must_not=[models.HasIdCondition(has_id=[exclude_id])] if exclude_id else None
+            )
+            requests.append((vector, query_filter))
+
+        client = vector_store.client
+        if hasattr(client, "query_batch_points"):
+            responses = client.query_batch_points(
+                collection_name=vector_store.collection_name,
+                requests=[
+                    models.QueryRequest(query=vector, filter=query_filter, limit=limit, with_payload=True)
+                    for vector, query_filter in requests
+                ]
+            )
+            hits_per_query = [response.points for response in responses]
+        else:
+            hits_per_query = client.search_batch(
+                collection_name=vector_store.collection_name,
+                requests=[
+                    models.SearchRequest(vector=vector, filter=query_filter, limit=limit, with_payload=True)
+                    for vector, query_filter in requests
+                ]
+            )
+
+        return [
+            [payload_to_memory(hit.id, hit.payload, hit.score) for hit in hits]
+            for hits in hits_per_query
+        ]
+
+    if provider == "chroma":
+        # ChromaDB는 ID 제외 필터가 없으므로 하나 더 받아서 거름
+        result = vector_store.collection.query(
+            query_embeddings=vectors,
+            n_results=limit + 1,
+            where={"user_id": user_id} if user_id else None,
+            include=["metadatas", "distances"]
+        )
+        results = []
+        for i, exclude_id in enumerate(exclude_ids):
+            ids = result["ids"][i]
+            metadatas = result["metadatas"][i]
+            distances = result["distances"][i]
+            hits = [
+                # mem0 ChromaDB 검색과 같이 거리를 점수로 사용
+                payload_to_memory(memory_id, metadata, distance)
+                for memory_id, metadata, distance in zip(ids, metadatas, distances)
+                if memory_id != exclude_id
+            ]
+            results.append(hits[:limit])
+        return results
+
+    logger.warning(f"벡터 검색을 지원하지 않는 저장소: {provider}")
+    return [[] for _ in vectors]
+
+
+def scroll_page(
+    vector_store: Any,
+    user_id: str,
+    limit: int = 20,
+    cursor: Optional[str] = None
+) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+    """
+    사용자 메모리 한 페이지 조회 (벡터 제외, 저장소 scroll API 사용)
+
+    Args:
+        vector_store: mem0 Memory.vector_store
+        user_id: 사용자 ID
+        limit: 페이지 크기
+        cursor: 이전 페이지가 반환한 커서 (첫 페이지는 None)
+
+    Returns:
+        (mem0 get_all 형식 메모리 목록, 다음 페이지 커서 또는 None)
+    """
+    provider = get_provider(vector_store)
+
+    if provider == "qdrant":
+        from qdrant_client import models
+
+        points, next_offset = vector_store.client.scroll(
+            collection_name=vector_store.collection_name,
+            scroll_filter=models.Filter(
+                must=[models.FieldCondition(key="user_id", match=models.MatchValue(value=user_id))]
+            ),
+            limit=limit,
+            offset=cursor,
+            with_payload=True,
+            with_vectors=False
+        )
+        items = [payload_to_memory(point.id, point.payload) for point in points]
+        return items, str(next_offset) if next_offset is not None else None
+
+    if provider == "chroma":
+        offset = int(cursor) if cursor else 0
+        result = vector_store.collection.get(
+            where={"user_id": user_id},
+            limit=limit + 1,
+            offset=offset,
+            include=["metadatas"]
+        )
+        ids = result.get("ids", [])
+        metadatas = result.get("metadatas") or [{}] * len(ids)
+        items = [
+            payload_to_memory(memory_id, metadata)
+            for memory_id, metadata in zip(ids[:limit], metadatas[:limit])
+        ]
+        return items, str(offset + limit) if len(ids) > limit else None
+
+    logger.warning(f"페이지 조회를 지원하지 않는 저장소: {provider}")
+    return [], None
+
+
+def ensure_payload_index(vector_store: Any, field_name: str = "user_id"):
+    """
+    페이로드 필드 인덱스 생성 (멀티테넌트 컬렉션의 user_id 필터용)
+
+    Qdrant는 keyword 인덱스(가능하면 is_tenant)를 만들고, ChromaDB는 메타데이터 필터를
+    자체 처리하므로 아무것도 하지 않음. 이미 있으면 무시.
+    """
+    if get_provider(vector_store) != "qdrant":
+        return
+
+    from qdrant_client import models
+
+    try:
+        schema = models.KeywordIndexParams(type="keyword", is_tenant=True)
+    except Exception:
+        # is_tenant를 지원하지 않는 구버전 클라이언트
+        schema = models.PayloadSchemaType.KEYWORD
+
+    try:
+        vector_store.client.create_payload_index(
+            collection_name=vector_store.collection_name,
+            field_name=field_name,
+            field_schema=schema
+        )
+        logger.info(f"페이로드 인덱스 생성: {vector_store.collection_name}.{field_name}")
+    except Exception as e:
+        if "already exists" not in str(e).lower():
+            logger.warning(f"페이로드 인덱스 생성 실패 ({field_name}): {e}")
+
+
+def list_collections(vector_store: Any) -> List[str]:
+    """벡터 저장소 서버/경로의 컬렉션 이름 목록"""
+    provider = get_provider(vector_store)
+    if provider == "qdrant":
+        return [c.name for c in vector_store.client.get_collections().collections]
+    if provider == "chroma":
+        # chromadb 0.6부터 list_collections()는 이름 목록을 반환
+        return [getattr(c, "name", c) for c in vector_store.client.list_collections()]
+    logger.warning(f"컬렉션 목록을 지원하지 않는 저장소: {provider}")
+    return []
+
+
+def scroll_points(
+    vector_store: Any,
+    batch_size: int = 256
+) -> Iterator[List[Tuple[str, List[float], Dict[str, Any]]]]:
+    """
+    컬렉션 전체를 배치 단위로 순회 (벡터 + 페이로드)
+
+    Yields:
+        List[(ID, 벡터, 페이로드)]: 최대 batch_size개
+    """
+    provider = get_provider(vector_store)
+
+    if provider == "qdrant":
+        offset = None
+        while True:
+            points, offset = vector_store.client.scroll(
+                collection_name=vector_store.collection_name,
+                limit=batch_size,
+                offset=offset,
+                with_payload=True,
+                with_vectors=True
+            )
+            batch = [
+                (str(point.id), _point_vector(point.vector), point.payload or {})
+                for point in points
+            ]
+            if batch:
+                yield batch
+            if offset is None:
+                break
+
+    elif provider == "chroma":
+        offset = 0
+        while True:
+            result = vector_store.collection.get(
+                limit=batch_size,
+                offset=offset,
+                include=["embeddings", "metadatas"]
+            )
+            ids = result.get("ids", [])
+            if not ids:
+                break
+            embeddings = result.get("embeddings")
+            if embeddings is None:
+                embeddings = [None] * len(ids)
+            metadatas = result.get("metadatas") or [{}] * len(ids)
+            yield [
+                (memory_id, list(vector) if vector is not None else None, metadata or {})
+                for memory_id, vector, metadata in zip(ids, embeddings, metadatas)
+            ]
+            offset += len(ids)
+
+    else:
+        logger.warning(f"순회를 지원하지 않는 저장소: {provider}")
+
+
+# 임베디드 Qdrant(로컬 모드)는 경로마다 프로세스에서 클라이언트 하나만 열 수 있으므로
+# (저장소 파일 잠금) 모든 Memory 인스턴스가 같은 클라이언트를 공유
+_local_clients: Dict[str, Any] = {}
+_local_clients_lock = threading.Lock()
+
+
+def open_qdrant_local(path: str) -> Any:
+    """경로별 공유 임베디드 Qdrant 클라이언트 반환 (HTTP/별도 프로세스 없음)"""
+    key = str(Path(path).resolve())
+    with _local_clients_lock:
+        if key not in _local_clients:
+            from qdrant_client import QdrantClient
+
+            Path(key).mkdir(parents=True, exist_ok=True)
+            _local_clients[key] = QdrantClient(path=key)
+            logger.info(f"임베디드 Qdrant 열기: {key}")
+        return _local_clients[key]
+
+
+def close_qdrant_local():
+    """공유 임베디드 Qdrant 클라이언트 모두 닫기 (프로세스 종료 시)"""
+    with _local_clients_lock:
+        clients = list(_local_clients.values())
+        _local_clients.clear()
+    for client in clients:
+        try:
+            client.close()
+        except Exception as e:
+            logger.debug(f"임베디드 Qdrant 닫기 실패: {e}")
+
+
+def close_vector_store(vector_store: Any):
+    """벡터 저장소 클라이언트 연결 닫기 (지원하지 않는 백엔드는 무시)"""
+    provider = get_provider(vector_store)
+    client = getattr(vector_store, "client", None)
+
+    # ChromaDB 클라이언트는 같은 경로의 인스턴스끼리 시스템을 공유하므로 닫지 않음
+    # 공유 임베디드 Qdrant 클라이언트도 다른 인스턴스가 쓰므로 닫지 않음
+    if provider == "qdrant" and client is not None:
+        with _local_clients_lock:
+            shared = any(client is local for local in _local_clients.values())
+        if not shared:
+            client.close()
+
+
+def extract_memory_ids(result: Any) -> List[str]:
+    """mem0 add() 결과에서 메모리 ID 목록 추출 ({'results': [...]} 또는 리스트)"""
+    if isinstance(result, dict):
+        items = result.get("results", [result] if "id" in result else [])
+    elif isinstance(result, list):
+        items = result
+    else:
+        return []
+
+    return [
+        str(item["id"])
+        for item in items
+        if isinstance(item, dict) and item.get("id")
+    ]
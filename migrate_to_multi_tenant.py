@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+"""
+사용자별 컬렉션(user_<id>_memories)을 멀티테넌트 공유 컬렉션으로 이전
+
+사용법:
+    python migrate_to_multi_tenant.py [--batch-size 256] [--dry-run] [--drop-source]
+
+벡터를 다시 임베딩하지 않고 저장된 벡터와 페이로드를 배치 단위로 복사하며,
+모든 포인트의 페이로드에 user_id를 채움. 이전이 끝나면 설정에서
+database.multi_tenant를 true로 바꾸면 됨.
+"""
+
+import re
+import sys
+import copy
+import argparse
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).parent))
+
+from config.settings import load_config
+from core.vector_store_ops import (
+    ensure_payload_index,
+    list_collections,
+    open_qdrant_local,
+    scroll_points
+)
+
+USER_COLLECTION_PATTERN = re.compile(r"^user_(.+)_memories$")
+
+
+def open_vector_store(base_config: dict, collection_name: str):
+    """mem0 벡터 저장소 객체 생성 (LLM/임베더 없이 벡터 저장소만)"""
+    from mem0.utils.factory import VectorStoreFactory
+
+    config = copy.deepcopy(base_config["vector_store"])
+    config["config"]["collection_name"] = collection_name
+    if config["provider"] == "qdrant" and "path" in config["config"]:
+        # 임베디드 Qdrant는 경로당 클라이언트 하나만 열 수 있으므로 공유 클라이언트 사용
+        config["config"]["client"] = open_qdrant_local(config["config"]["path"])
+    return VectorStoreFactory.create(config["provider"], config["config"])
+
+
+def migrate_collection(source, target, user_id: str, batch_size: int, dry_run: bool) -> int:
+    """한 사용자 컬렉션을 배치 단위로 복사"""
+    copied = 0
+    for batch in scroll_points(source, batch_size=batch_size):
+        ids, vectors, payloads = [], [], []
+        for point_id, vector, payload in batch:
+            if vector is None:
+                print(f"   ⚠️ 벡터 없는 포인트 건너뜀: {point_id}")
+                continue
+            payload = dict(payload)
+            payload["user_id"] = payload.get("user_id") or user_id
+            ids.append(point_id)
+            vectors.append(vector)
+            payloads.append(payload)
+
+        if ids and not dry_run:
+            target.insert(vectors=vectors, payloads=payloads, ids=ids)
+        copied += len(ids)
+    return copied
+
+
+def main():
+    parser = argparse.ArgumentParser(description="사용자별 컬렉션 → 멀티테넌트 컬렉션 이전")
+    parser.add_argument("--batch-size", type=int, default=256, help="한 번에 복사할 포인트 수")
+    parser.add_argument("--dry-run", action="store_true", help="복사하지 않고 개수만 확인")
+    parser.add_argument("--drop-source", action="store_true", help="복사 후 사용자 컬렉션 삭제")
+    args = parser.parse_args()
+
+    print("=" * 60)
+    print("🔀 멀티테넌트 컬렉션 이전")
+    print("=" * 60)
+
+    from core.memory_manager import MemoryManager
+
+    config = load_config()
+    config.database.multi_tenant = True
+    manager = MemoryManager(config)
+
+    if manager.default_memory is None:
+        print("❌ mem0 초기화 실패 - 벡터 저장소 연결을 확인하세요")
+        return 1
+
+    target = manager.default_memory.vector_store
+    ensure_payload_index(target, "user_id")
+    print(f"대상 컬렉션: {getattr(target, 'collection_name', '?')}")
+
+    sources = [
+        (name, match.group(1))
+        for name in list_collections(target)
+        for match in [USER_COLLECTION_PATTERN.match(name)]
+        if match
+    ]
+    if not sources:
+        print("✅ 이전할 사용자 컬렉션이 없습니다")
+        return 0
+
+    total = 0
+    for collection_name, user_id in sources:
+        print(f"\n📦 {collection_name} (user_id={user_id})")
+        try:
+            source = open_vector_store(manager.mem0_config, collection_name)
+            copied = migrate_collection(source, target, user_id, args.batch_size, args.dry_run)
+            total += copied
+            print(f"   ✅ {copied}개 {'확인' if args.dry_run else '복사'}")
+
+            if args.drop_source and not args.dry_run:
+                source.delete_col()
+                print("   🗑️ 원본 컬렉션 삭제")
+        except Exception as e:
+            print(f"   ❌ 이전 실패: {e}")
+
+    print("\n" + "-" * 40)
+    print(f"총 {len(sources)}개 컬렉션, {total}개 메모리")
+    if not args.dry_run:
+        print("설정에서 database.multi_tenant를 true로 바꾸세요")
+    return 0
+
+
+if __name__ == "__main__":
+    try:
+        sys.exit(main())
+    except KeyboardInterrupt:
+        print("\n\n중단됨")
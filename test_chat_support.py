@@ -0,0 +1,285 @@
+#!/usr/bin/env python3
+"""
+채팅 서비스 보조 동작 단위 테스트 (Ollama, mem0 없이 실행)
+
+주요 테스트 항목:
+1. 스트리밍 대화 - 토큰 전달 후 세션 갱신, 생성/준비/마무리 단계 실패 시 대체 응답
+2. 세션 저장소 - 최근 메시지 유지, LRU/유휴/메모리 상한 내보내기, 재시작 후 복구, 보관 기간
+3. 프롬프트 예산 - 설정에서 예산 계산, 우선순위대로 채우기, 최근 히스토리 유지
+
+실행: python -m pytest -q test_chat_support.py
+"""
+
+import sys
+import time
+import asyncio
+import sqlite3
+from pathlib import Path
+
+import pytest
+
+sys.path.append(str(Path(__file__).parent))
+
+from config.settings import AppConfig
+import core.chat_service as chat_service
+import core.chat_service_enhanced as chat_service_enhanced
+import core.memory_manager_simple as memory_manager_simple
+from core.session_store import SessionStore
+from core.context_packer import ContextPacker, count_tokens, MESSAGE_OVERHEAD
+
+
+def message(role, content):
+    return {"role": role, "content": content}
+
+
+# ----------------------------------------------------------------------
+# 1. 스트리밍 대화
+# ----------------------------------------------------------------------
+
+@pytest.fixture(params=[
+    (chat_service, "ChatService", "_extract_and_save_memories"),
+    (chat_service_enhanced, "EnhancedChatService", "_extract_and_save_info")
+], ids=["chat", "enhanced"])
+def make_service(request, tmp_path, monkeypatch):
+    """
+    Ollama 스트림을 가짜 조각 목록으로 바꾼 채팅 서비스 생성 함수
+
+    chunks 항목이 예외면 그 자리에서 스트림이 실패
+    """
+    module, class_name, extract = request.param
+
+    def no_memory(config):
+        raise RuntimeError("벡터 DB 없음")
+
+    monkeypatch.setattr(memory_manager_simple.Memory, "from_config", no_memory)
+    services = []
+
+    def make(chunks):
+        async def fake_stream(host, model, messages, options):
+            for chunk in chunks:
+                if isinstance(chunk, Exception):
+                    raise chunk
+                yield chunk
+
+        async def no_extraction(*args, **kwargs):
+            return []
+
+        monkeypatch.setattr(module, "stream_chat", fake_stream)
+        config = AppConfig(
+            base_dir=tmp_path,
+            data_dir=tmp_path / "data",
+            logs_dir=tmp_path / "logs",
+            uploads_dir=tmp_path / "uploads"
+        )
+        config.memory.ingest_async = False
+        config.memory.session_persist = False
+        service = getattr(module, class_name)(config)
+        monkeypatch.setattr(service, extract, no_extraction)
+        services.append(service)
+        return service
+
+    make.module = module
+    yield make
+    for service in services:
+        service.memory_manager.local_store.close()
+
+
+def stream(service, **kwargs):
+    """chat_stream이 보낸 조각과 채워진 result"""
+    result = {}
+
+    async def scenario():
+        return [
+            chunk async for chunk in service.chat_stream(
+                "안녕", "u1", session_id="s1", use_memory=False, result=result, **kwargs
+            )
+        ]
+
+    return asyncio.run(scenario()), result
+
+
+def test_chat_stream_yields_tokens_then_updates_session(make_service):
+    service = make_service(["안녕", "하세요"])
+
+    chunks, result = stream(service)
+    assert chunks == ["안녕", "하세요"]
+    assert result["response"] == "안녕하세요"
+    assert service.sessions.get("s1") == [message("user", "안녕"), message("assistant", "안녕하세요")]
+
+
+def test_chat_stream_falls_back_when_generation_fails(make_service):
+    service = make_service([ConnectionError("Ollama 연결 실패")])
+
+    chunks, result = stream(service)
+    assert chunks == [make_service.module.FALLBACK_RESPONSE]
+    assert result["response"] == make_service.module.FALLBACK_RESPONSE
+
+
+def test_chat_stream_keeps_partial_response_when_generation_fails(make_service):
+    service = make_service(["안녕", ConnectionError("연결 끊김")])
+
+    chunks, result = stream(service)
+    # 이미 보낸 조각 뒤에 대체 응답을 덧붙이지 않음
+    assert chunks == ["안녕"]
+    assert service.sessions.get("s1")[-1] == message("assistant", "안녕")
+
+
+def test_chat_stream_prepare_failure_yields_error_response(make_service, monkeypatch):
+    service = make_service(["안녕"])
+
+    async def fail(*args, **kwargs):
+        raise RuntimeError("검색 실패")
+
+    monkeypatch.setattr(service, "_prepare_turn", fail)
+    chunks, result = stream(service)
+    assert chunks == [make_service.module.ERROR_RESPONSE]
+    assert result["error"] == "검색 실패"
+    assert service.sessions.get("s1") == []
+
+
+def test_chat_stream_finish_failure_keeps_streamed_text(make_service, monkeypatch):
+    service = make_service(["안녕", "하세요"])
+
+    def fail(*args, **kwargs):
+        raise OSError("세션 저장 실패")
+
+    monkeypatch.setattr(service.sessions, "append", fail)
+    chunks, result = stream(service)
+    assert chunks == ["안녕", "하세요"]
+    assert result["response"] == "안녕하세요"
+    assert result["error"] == "세션 저장 실패"
+
+
+# ----------------------------------------------------------------------
+# 2. 세션 저장소
+# ----------------------------------------------------------------------
+
+def test_session_keeps_recent_messages():
+    store = SessionStore(max_messages=4)
+    for i in range(3):
+        store.append("s1", message("user", f"질문 {i}"), message("assistant", f"답변 {i}"))
+
+    history = store.get("s1")
+    assert [m["content"] for m in history] == ["질문 1", "답변 1", "질문 2", "답변 2"]
+    # 반환값은 복사본
+    history.clear()
+    assert len(store.get("s1")) == 4
+    assert store.get("missing") == []
+
+
+def test_session_lru_eviction():
+    store = SessionStore(max_sessions=2)
+    store.append("s1", message("user", "a"))
+    store.append("s2", message("user", "b"))
+    store.get("s1")
+    store.append("s3", message("user", "c"))
+
+    assert "s1" in store and "s3" in store
+    assert "s2" not in store
+    assert store.stats()["evictions"] == 1
+
+
+def test_session_idle_and_memory_cap_eviction():
+    store = SessionStore(idle_seconds=0.05)
+    store.append("s1", message("user", "a"))
+    time.sleep(0.1)
+    store.append("s2", message("user", "b"))
+    # 유휴 시간이 지난 세션은 다음 접근 때 내보냄
+    assert "s1" not in store and "s2" in store
+
+    store = SessionStore(max_bytes=200)
+    store.append("s1", message("user", "가" * 30))
+    store.append("s2", message("user", "나" * 30))
+    assert len(store) == 1 and "s2" in store
+    assert store.stats()["bytes"] <= 200
+
+
+def test_session_persists_across_restart(tmp_path):
+    db_path = tmp_path / "sessions.db"
+    store = SessionStore(db_path=db_path, max_sessions=1)
+    store.append("s1", message("user", "안녕하세요"))
+    store.append("s2", message("user", "반갑습니다"))
+    # RAM에서 내보낸 세션은 디스크에서 다시 읽음
+    assert store.get("s1") == [message("user", "안녕하세요")]
+    assert store.stats()["loads"] == 1
+    store.delete("s2")
+    store.close()
+
+    reopened = SessionStore(db_path=db_path)
+    try:
+        assert reopened.get("s1") == [message("user", "안녕하세요")]
+        assert reopened.get("s2") == []
+    finally:
+        reopened.close()
+
+
+def test_session_retention_drops_old_sessions(tmp_path):
+    db_path = tmp_path / "sessions.db"
+    store = SessionStore(db_path=db_path)
+    store.append("old", message("user", "오래된 세션"))
+    store.append("new", message("user", "최근 세션"))
+    store.close()
+
+    conn = sqlite3.connect(str(db_path))
+    conn.execute("UPDATE sessions SET updated_at = ? WHERE session_id = 'old'", (time.time() - 8 * 86400,))
+    conn.commit()
+    conn.close()
+
+    reopened = SessionStore(db_path=db_path, retention_days=7)
+    try:
+        assert reopened.get("old") == []
+        assert reopened.get("new") == [message("user", "최근 세션")]
+    finally:
+        reopened.close()
+
+
+# ----------------------------------------------------------------------
+# 3. 프롬프트 예산
+# ----------------------------------------------------------------------
+
+def test_prompt_budget():
+    packer = ContextPacker(num_ctx=1000, num_predict=200)
+    assert packer.prompt_budget == 1000 - 200 - 64
+    assert ContextPacker(num_ctx=1000, num_predict=200, max_prompt_tokens=300).prompt_budget == 300
+
+    system = "시스템 프롬프트"
+    assert packer.available(system) == packer.prompt_budget - count_tokens(system) - MESSAGE_OVERHEAD
+    assert packer.memory_budget(system) == int(packer.available(system) * packer.memory_ratio)
+
+
+def test_prompt_budget_from_config(tmp_path):
+    config = AppConfig(base_dir=tmp_path, data_dir=tmp_path / "data")
+    config.models.model_params["chat"] = {"num_ctx": 4096}
+    config.memory.prompt_max_tokens = 1000
+
+    packer = ContextPacker.from_config(config, 512)
+    assert packer.num_ctx == 4096
+    assert packer.prompt_budget == 1000
+    assert packer.memory_ratio == config.memory.prompt_memory_ratio
+
+
+def test_pack_skips_items_over_budget():
+    packer = ContextPacker()
+    short, long = "짧은 메모리", "긴 메모리 " * 50
+    budget = count_tokens(short) + 1 + count_tokens(short + "2") + 1
+
+    # 중복은 한 번만, 들어가지 않는 항목은 건너뛰고 다음 항목을 계속 시도
+    packed = packer.pack([short, long, short, short + "2"], budget)
+    assert packed == [short, short + "2"]
+    assert packer.pack([long], 0) == []
+
+
+def test_pack_history_keeps_latest_in_order():
+    packer = ContextPacker()
+    messages = [message("user", f"메시지 {i}") for i in range(6)]
+    cost = count_tokens("메시지 0") + MESSAGE_OVERHEAD
+
+    packed = packer.pack_history(messages, cost * 3)
+    assert packed == messages[-3:]
+    # 들어가지 않는 메시지를 만나면 더 오래된 메시지는 넣지 않음
+    messages.insert(4, message("assistant", "아주 긴 답변 " * 100))
+    assert packer.pack_history(messages, cost * 3) == messages[-2:]
+
+
+if __name__ == "__main__":
+    sys.exit(pytest.main([__file__, "-q"]))
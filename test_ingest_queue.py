@@ -0,0 +1,201 @@
+#!/usr/bin/env python3
+"""
+백그라운드 수집 큐 단위 테스트 (Ollama, mem0 없이 실행)
+
+주요 테스트 항목:
+1. 재시도 - 디스크로 spill된 재시도 작업도 시도 횟수/작업 ID 유지
+2. 복구 - 저널에 남은 미완료 작업만 다시 처리
+3. 압축 - 작업이 계속 들어와도 저널 크기 유지, 압축 후에도 spill된 작업 읽기
+
+실행: python -m pytest -q test_ingest_queue.py
+"""
+
+import sys
+import json
+import time
+import asyncio
+import threading
+from collections import Counter
+from pathlib import Path
+
+import pytest
+
+sys.path.append(str(Path(__file__).parent))
+
+import core.ingest_queue as ingest_queue
+from core.ingest_queue import IngestQueue
+
+
+def journal_records(path):
+    if not path.exists():
+        return []
+    return [json.loads(line) for line in path.read_text(encoding="utf-8").splitlines() if line]
+
+
+def wait_until(predicate, timeout=10.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if predicate():
+            return True
+        time.sleep(0.01)
+    return False
+
+
+def test_spilled_retry_keeps_attempts(tmp_path):
+    attempts = Counter()
+    job_ids = {}
+
+    async def handler(job, job_id):
+        attempts[job["name"]] += 1
+        # 재시도해도 같은 작업 ID (handler가 결과 ID를 여기서 만들어 중복 저장 방지)
+        assert job_ids.setdefault(job["name"], job_id) == job_id
+        await asyncio.sleep(0.005)
+        if job["name"] == "bad":
+            raise RuntimeError("저장 실패")
+
+    # 큐 크기 1 - 재시도 작업이 다른 작업 뒤로 밀려 backlog(저널)로 spill됨
+    queue = IngestQueue(
+        handler,
+        workers=1,
+        max_size=1,
+        journal_path=tmp_path / "ingest.jsonl",
+        max_retries=3,
+        retry_delay=0.01
+    )
+    try:
+        bad_id = queue.submit({"name": "bad"})
+        for i in range(30):
+            queue.submit({"name": f"ok{i}"})
+        assert queue.join(timeout=10)
+
+        assert attempts["bad"] == 3
+        assert job_ids["bad"] == bad_id
+        assert all(attempts[f"ok{i}"] == 1 for i in range(30))
+        stats = queue.stats()
+        assert stats["failed"] == 1
+        assert stats["processed"] == 30
+        assert stats["retries"] == 2
+    finally:
+        queue.close()
+
+
+def test_in_memory_retry_gives_up():
+    attempts = Counter()
+
+    async def handler(job, job_id):
+        attempts[job["name"]] += 1
+        raise RuntimeError("저장 실패")
+
+    queue = IngestQueue(handler, workers=1, max_size=1, max_retries=2, retry_delay=0.01)
+    try:
+        queue.submit({"name": "a"})
+        queue.submit({"name": "b"})
+        assert queue.join(timeout=10)
+        assert attempts == {"a": 2, "b": 2}
+        assert queue.stats()["failed"] == 2
+    finally:
+        queue.close()
+
+
+def test_recover_unfinished_jobs(tmp_path):
+    journal = tmp_path / "ingest.jsonl"
+    lines = [
+        {"op": "put", "id": "1", "job": {"name": "done"}},
+        {"op": "put", "id": "2", "job": {"name": "pending"}},
+        {"op": "done", "id": "1"}
+    ]
+    # 비정상 종료로 잘린 마지막 줄은 무시
+    journal.write_text(
+        "".join(json.dumps(line) + "\n" for line in lines) + '{"op": "put", "id": "3", "jo',
+        encoding="utf-8"
+    )
+
+    handled = []
+
+    async def handler(job, job_id):
+        handled.append((job_id, job["name"]))
+
+    queue = IngestQueue(handler, journal_path=journal)
+    try:
+        queue.start()
+        assert queue.join(timeout=10)
+        # 복구된 작업도 저널의 작업 ID 그대로
+        assert handled == [("2", "pending")]
+        # 남은 작업이 없으면 저널을 비움
+        assert journal_records(journal) == []
+    finally:
+        queue.close()
+
+
+def test_journal_compaction(tmp_path, monkeypatch):
+    monkeypatch.setattr(ingest_queue, "COMPACT_MIN_RECORDS", 5)
+    journal = tmp_path / "ingest.jsonl"
+    release = threading.Event()
+    handled = []
+
+    async def handler(job, job_id):
+        if job["name"] == "slow":
+            # 느린 작업 하나가 끝나지 않아 저널이 비워지지 않는 상황
+            while not release.is_set():
+                await asyncio.sleep(0.01)
+        handled.append(job["name"])
+
+    queue = IngestQueue(handler, workers=2, max_size=2, journal_path=journal)
+    try:
+        slow_id = queue.submit({"name": "slow"})
+        for i in range(100):
+            queue.submit({"name": f"job{i}"})
+        assert wait_until(lambda: len(handled) == 100)
+
+        records = journal_records(journal)
+        assert len(records) < 20
+        assert {"op": "put", "id": slow_id, "job": {"name": "slow"}} in records
+
+        release.set()
+        assert queue.join(timeout=10)
+        assert handled[-1] == "slow"
+        assert sorted(handled[:-1]) == sorted(f"job{i}" for i in range(100))
+    finally:
+        release.set()
+        queue.close()
+
+
+def test_compacted_journal_recovers(tmp_path, monkeypatch):
+    monkeypatch.setattr(ingest_queue, "COMPACT_MIN_RECORDS", 5)
+    journal = tmp_path / "ingest.jsonl"
+    release = threading.Event()
+    handled = []
+
+    async def blocking_handler(job, job_id):
+        if job["name"] == "slow":
+            while not release.is_set():
+                await asyncio.sleep(0.01)
+        handled.append(job["name"])
+
+    queue = IngestQueue(blocking_handler, workers=2, journal_path=journal)
+    try:
+        queue.submit({"name": "slow"})
+        for i in range(20):
+            queue.submit({"name": f"job{i}"})
+        assert wait_until(lambda: len(handled) == 20)
+    finally:
+        # 느린 작업을 끝내지 않고 종료 (프로세스가 죽은 상황)
+        queue.close(timeout=0)
+        release.set()
+
+    recovered = []
+
+    async def handler(job, job_id):
+        recovered.append(job["name"])
+
+    reopened = IngestQueue(handler, journal_path=journal)
+    try:
+        reopened.start()
+        assert reopened.join(timeout=10)
+        assert recovered == ["slow"]
+    finally:
+        reopened.close()
+
+
+if __name__ == "__main__":
+    sys.exit(pytest.main([__file__, "-q"]))
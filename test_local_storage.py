@@ -0,0 +1,406 @@
+#!/usr/bin/env python3
+"""
+로컬 저장소/색인 단위 테스트 (Ollama, mem0 없이 실행)
+
+주요 테스트 항목:
+1. 파일 저장소 - 작업 로그 재생, 스냅샷 이후 삭제 유지, 압축, 기록 실패 전달, 페이지 순서, 통계
+2. SQLite 저장소 - 기존 파일 가져오기 1회, 삭제 유지, 통계 트리거, 페이지 순서
+3. BM25 색인 - 추가/삭제와 검색 동시 실행
+4. 벡터 색인 - 세그먼트 세대 교체/중단 복구, 다시 연 뒤 검색, 저장소와 대조, 일괄 제거
+5. 임베딩 캐시 - LRU, 디스크 캐시
+
+실행: python -m pytest -q test_local_storage.py
+"""
+
+import sys
+import json
+import threading
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+sys.path.append(str(Path(__file__).parent))
+
+from core.local_store import LocalMemoryStore, _UserShard
+from core.sqlite_store import SQLiteMemoryStore
+from core.local_index import LocalSearchIndex
+from core.vector_index import LocalVectorIndex, write_segment, read_segment, _segment_files
+from core.embedding_cache import EmbeddingCache
+
+
+def make_entry(memory_id, text=None, category="personal_info", timestamp="2024-01-01T00:00:00"):
+    return {
+        "id": memory_id,
+        "text": text or f"메모리 {memory_id}",
+        "metadata": {"category": category, "timestamp": timestamp}
+    }
+
+
+def page_ids(store, user_id, order="asc", limit=2):
+    """커서를 따라 모든 페이지의 ID 수집"""
+    ids, cursor = [], None
+    while True:
+        entries, cursor = store.page(user_id, limit=limit, cursor=cursor, order=order)
+        ids += [entry["id"] for entry in entries]
+        if not cursor:
+            return ids
+
+
+# ----------------------------------------------------------------------
+# 1. 파일 저장소
+# ----------------------------------------------------------------------
+
+def test_file_store_replays_log_after_restart(tmp_path):
+    store = LocalMemoryStore(tmp_path)
+    store.add_many("u1", [make_entry(f"m{i}") for i in range(5)])
+    store.update("u1", "m0", text="수정된 메모리")
+    store.delete("u1", "m1")
+    store.close()
+
+    reopened = LocalMemoryStore(tmp_path)
+    try:
+        assert [e["id"] for e in reopened.get_user_memories("u1")] == ["m0", "m2", "m3", "m4"]
+        assert reopened.get("u1", "m0")["text"] == "수정된 메모리"
+        assert reopened.get("u1", "m1") is None
+    finally:
+        reopened.close()
+
+
+def test_file_store_snapshot_keeps_deletes(tmp_path):
+    # snapshot_interval마다 스냅샷을 다시 쓰고 로그를 비움
+    store = LocalMemoryStore(tmp_path, snapshot_interval=3)
+    for i in range(4):
+        store.add("u1", make_entry(f"m{i}"))
+    store.delete("u1", "m0")
+    store.close()
+
+    reopened = LocalMemoryStore(tmp_path, snapshot_interval=3)
+    try:
+        assert [e["id"] for e in reopened.get_user_memories("u1")] == ["m1", "m2", "m3"]
+    finally:
+        reopened.close()
+
+
+def test_file_store_compaction_drops_dead_records(tmp_path):
+    store = LocalMemoryStore(tmp_path)
+    try:
+        store.add_many("u1", [make_entry(f"m{i}", text="x" * 200) for i in range(20)])
+        store.delete_many("u1", [f"m{i}" for i in range(15)])
+
+        dead_before = store.storage_stats()["dead_bytes"]
+        assert store.compact(force=True) == 1
+        # 스냅샷에는 목록 구분자만 남음
+        assert store.storage_stats()["dead_bytes"] < dead_before // 10
+        assert store.count("u1") == 5
+    finally:
+        store.close()
+
+    reopened = LocalMemoryStore(tmp_path)
+    try:
+        assert [e["id"] for e in reopened.get_user_memories("u1")] == [f"m{i}" for i in range(15, 20)]
+    finally:
+        reopened.close()
+
+
+def test_file_store_write_failure_raises(tmp_path, monkeypatch):
+    store = LocalMemoryStore(tmp_path)
+    try:
+        store.add("u1", make_entry("m0"))
+
+        def fail(self, sync=True):
+            raise OSError("disk full")
+
+        monkeypatch.setattr(_UserShard, "flush", fail)
+        with pytest.raises(OSError):
+            store.add("u1", make_entry("m1"))
+        with pytest.raises(OSError):
+            store.add_many("u1", [make_entry("m2")])
+    finally:
+        monkeypatch.undo()
+        store.close()
+
+
+def test_file_store_page_order(tmp_path):
+    store = LocalMemoryStore(tmp_path)
+    try:
+        store.add_many("u1", [make_entry(f"m{i}") for i in range(5)])
+        assert page_ids(store, "u1") == ["m0", "m1", "m2", "m3", "m4"]
+        assert page_ids(store, "u1", order="desc") == ["m4", "m3", "m2", "m1", "m0"]
+    finally:
+        store.close()
+
+
+def test_file_store_stats(tmp_path):
+    store = LocalMemoryStore(tmp_path)
+    try:
+        store.add("u1", make_entry("m0", category="preferences", timestamp="2024-01-02"))
+        store.add("u1", make_entry("m1", category=None, timestamp="2024-01-03"))
+        store.delete("u1", "m1")
+        # 같은 ID를 다시 추가해도(수집 재시도) 한 번만 셈
+        store.add("u1", make_entry("m0", category="preferences", timestamp="2024-01-02"))
+        stats = store.stats("u1")
+        assert stats["total_memories"] == 1
+        assert stats["categories"] == {"preferences": 1}
+        assert stats["last_updated"] == "2024-01-02"
+    finally:
+        store.close()
+
+
+# ----------------------------------------------------------------------
+# 2. SQLite 저장소
+# ----------------------------------------------------------------------
+
+def write_legacy_store(legacy_dir, user_id, entries):
+    """단일 파일 형식의 기존 저장소 만들기"""
+    legacy_dir.mkdir(parents=True, exist_ok=True)
+    with open(legacy_dir / "local_memories.json", "w", encoding="utf-8") as f:
+        json.dump({user_id: entries}, f, ensure_ascii=False)
+
+
+def test_sqlite_legacy_import_runs_once(tmp_path):
+    legacy_dir = tmp_path / "data"
+    write_legacy_store(legacy_dir, "u1", [make_entry("m0"), make_entry("m1")])
+    db_path = tmp_path / "memories.db"
+
+    store = SQLiteMemoryStore(db_path, legacy_dir=legacy_dir)
+    assert store.count("u1") == 2
+    # 모두 지운 뒤 재시작해도 기존 파일에서 다시 가져오지 않음
+    assert store.delete_all("u1") == 2
+    store.close()
+
+    reopened = SQLiteMemoryStore(db_path, legacy_dir=legacy_dir)
+    try:
+        assert reopened.count("u1") == 0
+        assert reopened.get("u1", "m0") is None
+    finally:
+        reopened.close()
+
+
+def test_sqlite_delete_survives_restart(tmp_path):
+    legacy_dir = tmp_path / "data"
+    write_legacy_store(legacy_dir, "u1", [make_entry("m0"), make_entry("m1")])
+    db_path = tmp_path / "memories.db"
+
+    store = SQLiteMemoryStore(db_path, legacy_dir=legacy_dir)
+    store.delete("u1", "m0")
+    store.close()
+
+    reopened = SQLiteMemoryStore(db_path, legacy_dir=legacy_dir)
+    try:
+        assert [e["id"] for e in reopened.get_user_memories("u1")] == ["m1"]
+    finally:
+        reopened.close()
+
+
+def test_sqlite_stats_trigger_normalizes_category(tmp_path):
+    store = SQLiteMemoryStore(tmp_path / "memories.db")
+    try:
+        store.add("u1", make_entry("m0", category=None, timestamp="2024-01-01"))
+        store.add("u1", make_entry("m1", category="", timestamp="2024-01-03"))
+        store.add("u1", make_entry("m2", category="preferences", timestamp="2024-01-02"))
+        assert store.stats("u1")["categories"] == {"uncategorized": 2, "preferences": 1}
+        assert store.stats("u1")["last_updated"] == "2024-01-03"
+
+        # 가장 최근 메모리를 지우면 같은 (정규화된) 카테고리에서 마지막 시각을 다시 계산
+        store.delete("u1", "m1")
+        stats = store.stats("u1")
+        assert stats["categories"] == {"uncategorized": 1, "preferences": 1}
+        assert stats["last_updated"] == "2024-01-02"
+
+        store.delete("u1", "m0")
+        assert store.stats("u1")["categories"] == {"preferences": 1}
+    finally:
+        store.close()
+
+
+def test_sqlite_stats_match_rebuild(tmp_path):
+    store = SQLiteMemoryStore(tmp_path / "memories.db")
+    try:
+        store.add_many("u1", [
+            make_entry(f"m{i}", category=["a", None, "", "b"][i % 4], timestamp=f"2024-01-{i + 1:02d}")
+            for i in range(12)
+        ])
+        # 같은 ID를 다시 추가해도(수집 재시도) 한 번만 셈
+        store.add("u1", make_entry("m1", category="a", timestamp="2024-01-02"))
+        store.delete_many("u1", ["m3", "m6", "m9"])
+        store.update("u1", "m0", metadata={"category": "b"})
+        incremental = store.stats("u1")
+        assert incremental["total_memories"] == 9
+        store.rebuild_stats("u1")
+        assert store.stats("u1") == incremental
+    finally:
+        store.close()
+
+
+def test_sqlite_page_order(tmp_path):
+    store = SQLiteMemoryStore(tmp_path / "memories.db")
+    try:
+        store.add_many("u1", [make_entry(f"m{i}") for i in range(5)])
+        assert page_ids(store, "u1") == ["m0", "m1", "m2", "m3", "m4"]
+        assert page_ids(store, "u1", order="desc") == ["m4", "m3", "m2", "m1", "m0"]
+    finally:
+        store.close()
+
+
+# ----------------------------------------------------------------------
+# 3. BM25 색인
+# ----------------------------------------------------------------------
+
+def test_search_index_finds_added_entries():
+    index = LocalSearchIndex()
+    entries = [
+        make_entry("m0", text="저는 파이썬을 좋아합니다"),
+        make_entry("m1", text="커피를 매일 마십니다")
+    ]
+    results = index.search("u1", lambda: entries, "파이썬", limit=5)
+    assert [entry["id"] for _, entry in results] == ["m0"]
+
+    index.add("u1", make_entry("m2", text="파이썬 개발자입니다"))
+    index.remove("u1", "m0")
+    results = index.search("u1", lambda: entries, "파이썬", limit=5)
+    assert [entry["id"] for _, entry in results] == ["m2"]
+
+
+def test_search_index_concurrent_add_and_search():
+    index = LocalSearchIndex()
+    index.search("u1", lambda: [], "파이썬")
+    errors = []
+    stop = threading.Event()
+
+    def writer():
+        try:
+            for i in range(2000):
+                index.add("u1", make_entry(f"m{i}", text=f"파이썬 메모리 {i}"))
+                if i % 3 == 0:
+                    index.remove("u1", f"m{i - 1}")
+        except Exception as e:
+            errors.append(e)
+        finally:
+            stop.set()
+
+    def reader():
+        try:
+            while not stop.is_set():
+                index.search("u1", lambda: [], "파이썬 메모리", limit=10)
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=writer)] + [threading.Thread(target=reader) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert errors == []
+
+
+# ----------------------------------------------------------------------
+# 4. 벡터 색인
+# ----------------------------------------------------------------------
+
+def test_segment_generations(tmp_path):
+    first = np.eye(3, dtype=np.float32)
+    assert write_segment(tmp_path, "u1", ["a", "b", "c"], first) == 1
+    second = np.ones((2, 3), dtype=np.float32)
+    assert write_segment(tmp_path, "u1", ["d", "e"], second) == 2
+
+    ids, matrix = read_segment(tmp_path, "u1")
+    assert ids == ["d", "e"]
+    assert np.array_equal(np.asarray(matrix), second)
+    del matrix
+    # 이전 세대 파일은 정리됨
+    assert not _segment_files(tmp_path, "u1", 1)[0].exists()
+
+
+def test_segment_interrupted_write_keeps_previous(tmp_path):
+    write_segment(tmp_path, "u1", ["a", "b"], np.eye(2, dtype=np.float32))
+
+    # 새 세대 행렬만 기록되고 포인터를 바꾸기 전에 중단된 상황
+    matrix_file, _ = _segment_files(tmp_path, "u1", 2)
+    matrix_file.write_bytes(np.ones((3, 2), dtype=np.float32).tobytes())
+
+    ids, matrix = read_segment(tmp_path, "u1")
+    assert ids == ["a", "b"]
+    assert np.array_equal(np.asarray(matrix), np.eye(2, dtype=np.float32))
+
+
+def test_vector_index_search_after_reload(tmp_path):
+    index = LocalVectorIndex(tmp_path, save_interval=1)
+    index.add("u1", "m0", [1.0, 0.0, 0.0])
+    index.add("u1", "m1", [0.0, 1.0, 0.0])
+    index.add("u1", "m2", [0.9, 0.1, 0.0])
+    index.remove("u1", "m1")
+
+    reloaded = LocalVectorIndex(tmp_path)
+    results = reloaded.search("u1", [1.0, 0.0, 0.0], limit=5)
+    assert [memory_id for _, memory_id in results] == ["m0", "m2"]
+    assert results[0][0] == pytest.approx(1.0)
+
+
+def test_vector_index_reconcile(tmp_path):
+    index = LocalVectorIndex(tmp_path)
+    index.add("u1", "m0", [1.0, 0.0])
+    index.add("u1", "gone", [0.0, 1.0])
+    # 저장소에서 지워진 벡터는 제거하고, 벡터가 없는 ID를 돌려줌
+    assert index.reconcile("u1", ["m0", "m1", "m2"]) == ["m1", "m2"]
+    assert index.get("u1").ids == ["m0"]
+
+
+def test_vector_index_bulk_remove_saves_once(tmp_path):
+    index = LocalVectorIndex(tmp_path, save_interval=1)
+    for i in range(10):
+        index.add("u1", f"m{i}", [1.0, float(i)])
+
+    saves = []
+    original_save = index._save
+    index._save = lambda user_id, user_index: (saves.append(user_id), original_save(user_id, user_index))
+    assert index.remove_many("u1", [f"m{i}" for i in range(8)] + ["없음"]) == 8
+    assert saves == ["u1"]
+    assert sorted(LocalVectorIndex(tmp_path).get("u1").ids) == ["m8", "m9"]
+
+
+def test_vector_index_drop(tmp_path):
+    index = LocalVectorIndex(tmp_path, save_interval=1)
+    index.add("u1", "m0", [1.0, 0.0])
+    index.add("u2", "m1", [0.0, 1.0])
+    index.drop("u1")
+
+    assert not index.has_vectors("u1")
+    reloaded = LocalVectorIndex(tmp_path)
+    assert not reloaded.has_vectors("u1")
+    assert reloaded.get("u2").ids == ["m1"]
+    # 이전 세대 파일은 정리되고 빈 세대만 남음
+    assert len(list((tmp_path / "vectors").glob("u1@*.vec"))) == 1
+
+
+# ----------------------------------------------------------------------
+# 5. 임베딩 캐시
+# ----------------------------------------------------------------------
+
+def test_embedding_cache_lru():
+    cache = EmbeddingCache(max_entries=2)
+    cache.put("model", "a", [1.0])
+    cache.put("model", "b", [2.0])
+    assert cache.get("model", "a") == [1.0]
+    cache.put("model", "c", [3.0])
+
+    # 가장 오래 쓰이지 않은 "b"가 밀려남, 모델이 다르면 다른 키
+    assert cache.get("model", "b") is None
+    assert cache.get("model", "c") == [3.0]
+    assert cache.get("other", "a") is None
+
+
+def test_embedding_cache_disk(tmp_path):
+    disk_path = tmp_path / "embedding_cache.db"
+    EmbeddingCache(disk_path=disk_path).put_many("model", {"a": [0.5, 0.25], "b": [1.0, 2.0]})
+
+    cache = EmbeddingCache(disk_path=disk_path)
+    assert cache.get("model", "a") == [0.5, 0.25]
+    assert cache.get("model", "a") == [0.5, 0.25]
+    stats = cache.stats()
+    assert stats["disk_hits"] == 1
+    assert stats["hits"] == 1
+
+
+if __name__ == "__main__":
+    sys.exit(pytest.main([__file__, "-q"]))
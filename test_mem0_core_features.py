@@ -407,10 +407,7 @@ class Mem0TestSuite:
     async def cleanup_test_data(self):
         """테스트 데이터 정리"""
         try:
-            all_memories = await self.memory_manager.get_all_memories(self.test_user)
-            for memory in all_memories:
-                if memory.get('id'):
-                    await self.memory_manager.delete_memory(memory['id'], self.test_user)
+            await self.memory_manager.delete_all_memories(self.test_user)
         except:
             pass
 
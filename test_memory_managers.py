@@ -0,0 +1,653 @@
+#!/usr/bin/env python3
+"""
+메모리 매니저 동작 테스트 (Ollama, 벡터 DB 없이 가짜 mem0 Memory로 실행)
+
+주요 테스트 항목:
+1. SimpleMemoryManager - 비정상 종료로 빠진 로컬 임베딩 보충, 페이지 조회, 추가 시 기록 횟수/순서,
+   부분 저장 후 수집 재시도 시 중복 없음, 검색 실패 로그, 관련 메모리, 삭제
+2. 메모리 풀 - 생성 중복 방지, 빌린 인스턴스는 반납 후 연결 해제
+3. MemoryManager - 멀티테넌트 격리, ID 조회, 저장된 벡터로 관련 메모리 검색, 일괄 추가, 통계 유지,
+   Qdrant 장애 시 ChromaDB로 전환, 임베디드 Qdrant 경로
+4. 블로킹 호출 실행기 - 이벤트 루프 밖에서 실행, 시간 초과된 호출도 끝날 때까지 자리 차지
+
+실행: python -m pytest -q test_memory_managers.py
+"""
+
+import sys
+import time
+import asyncio
+import itertools
+import threading
+from pathlib import Path
+
+import pytest
+
+sys.path.append(str(Path(__file__).parent))
+
+from config.settings import AppConfig
+import core.memory_manager as memory_manager
+import core.memory_manager_simple as memory_manager_simple
+import core.memory_stats as memory_stats
+from core.memory_manager import MemoryManager
+from core.memory_manager_simple import SimpleMemoryManager
+from core.memory_pool import MemoryPool
+from core.ingest_queue import IngestQueue
+import core.executor as executor
+from core.executor import run_blocking
+from core.vector_store_ops import payload_to_memory, search_by_vectors
+
+# 가짜 임베더의 차원 - 텍스트에 들어 있는 단어마다 한 축
+VOCABULARY = ["커피", "파이썬", "강아지", "서울", "여행"]
+POINT_IDS = itertools.count()
+
+
+class FakeEmbedder:
+    """단어 포함 여부로 만드는 결정적 임베딩"""
+
+    def __init__(self):
+        self.calls = 0
+
+    def embed(self, text, memory_action=None):
+        self.calls += 1
+        return [1.0 if word in text else 0.0 for word in VOCABULARY] + [0.1]
+
+    def embed_batch(self, texts, memory_action=None):
+        return [self.embed(text, memory_action) for text in texts]
+
+
+def cosine(a, b):
+    norm = (sum(x * x for x in a) * sum(y * y for y in b)) ** 0.5
+    return sum(x * y for x, y in zip(a, b)) / norm if norm else 0.0
+
+
+class FakeCollection:
+    """ChromaDB 컬렉션 대역 (get/query만, 거리는 1 - 코사인 유사도)"""
+
+    def __init__(self, points):
+        self.points = points
+
+    def _matches(self, payload, where):
+        return not where or all(payload.get(key) == value for key, value in where.items())
+
+    def get(self, ids=None, where=None, limit=None, offset=0, include=()):
+        found = [
+            (point_id, vector, payload)
+            for point_id, (vector, payload) in self.points.items()
+            if (ids is None or point_id in ids) and self._matches(payload, where)
+        ]
+        found = found[offset:offset + limit if limit else None]
+        return {
+            "ids": [point_id for point_id, _, _ in found],
+            "embeddings": [vector for _, vector, _ in found],
+            "metadatas": [payload for _, _, payload in found]
+        }
+
+    def query(self, query_embeddings, n_results=10, where=None, include=()):
+        result = {"ids": [], "metadatas": [], "distances": []}
+        for query in query_embeddings:
+            hits = sorted(
+                (1.0 - cosine(query, vector), point_id, payload)
+                for point_id, (vector, payload) in self.points.items()
+                if self._matches(payload, where)
+            )[:n_results]
+            result["ids"].append([point_id for _, point_id, _ in hits])
+            result["metadatas"].append([payload for _, _, payload in hits])
+            result["distances"].append([distance for distance, _, _ in hits])
+        return result
+
+
+class FakeChromaStore:
+    """mem0 ChromaDB 벡터 저장소 대역 - ID → (벡터, 페이로드)"""
+
+    def __init__(self):
+        self.points = {}
+        self.collection = FakeCollection(self.points)
+        self.inserts = 0
+
+    def insert(self, vectors, payloads=None, ids=None):
+        self.inserts += 1
+        for vector, payload, point_id in zip(vectors, payloads, ids):
+            self.points[point_id] = (list(vector), dict(payload))
+
+    def delete(self, vector_id):
+        self.points.pop(vector_id, None)
+
+
+class FakeMemory:
+    """mem0 Memory 대역 - search_error가 있으면 검색이 실패"""
+
+    def __init__(self):
+        self.embedding_model = FakeEmbedder()
+        self.vector_store = FakeChromaStore()
+        self.search_error = None
+
+    def add(self, messages, user_id=None, metadata=None, infer=True):
+        text = messages[0]["content"] if isinstance(messages, list) else messages
+        point_id = f"p{next(POINT_IDS)}"
+        payload = dict(metadata or {}, data=text, user_id=user_id)
+        self.vector_store.insert([self.embedding_model.embed(text)], [payload], [point_id])
+        return {"results": [{"id": point_id, "memory": text, "event": "ADD"}]}
+
+    def get(self, memory_id):
+        point = self.vector_store.points.get(memory_id)
+        return payload_to_memory(memory_id, point[1]) if point else None
+
+    def get_all(self, **kwargs):
+        raise AssertionError("전체 목록 조회")
+
+    def search(self, query, user_id=None, limit=10):
+        if self.search_error:
+            raise self.search_error
+        hits = search_by_vectors(self.vector_store, [self.embedding_model.embed(query)], limit, user_id)[0]
+        return {"results": hits}
+
+    def update(self, memory_id, text=None, data=None, metadata=None):
+        vector, payload = self.vector_store.points[memory_id]
+        payload.update(metadata or {}, data=text or data)
+
+    def delete(self, memory_id):
+        self.vector_store.delete(memory_id)
+
+    def delete_all(self, user_id=None):
+        for point_id, (_, payload) in list(self.vector_store.points.items()):
+            if payload.get("user_id") == user_id:
+                self.vector_store.delete(point_id)
+
+
+def make_config(tmp_path, **database):
+    config = AppConfig(
+        base_dir=tmp_path,
+        data_dir=tmp_path / "data",
+        logs_dir=tmp_path / "logs",
+        uploads_dir=tmp_path / "uploads"
+    )
+    for key, value in database.items():
+        setattr(config.database, key, value)
+    return config
+
+
+@pytest.fixture
+def simple_manager(tmp_path, monkeypatch):
+    """가짜 mem0 Memory를 쓰는 SimpleMemoryManager"""
+    memory = FakeMemory()
+    monkeypatch.setattr(memory_manager_simple.Memory, "from_config", lambda config: memory)
+    manager = SimpleMemoryManager(make_config(tmp_path))
+    yield manager
+    manager.local_store.close()
+
+
+@pytest.fixture
+def make_manager(tmp_path, monkeypatch):
+    """
+    가짜 mem0 Memory를 쓰는 MemoryManager 생성 함수
+
+    Qdrant 헬스 체크는 qdrant["up"] 값을 돌려주고, Memory는 (백엔드, 컬렉션)마다 하나
+    """
+    memories = {}
+    qdrant = {"up": False}
+
+    def from_config(config):
+        vector_store = config["vector_store"]
+        key = (vector_store["provider"], vector_store["config"]["collection_name"])
+        return memories.setdefault(key, FakeMemory())
+
+    monkeypatch.setattr(memory_manager.Memory, "from_config", from_config)
+    monkeypatch.setattr(memory_manager, "http_probe", lambda url, timeout: lambda: qdrant["up"])
+    managers = []
+
+    def make(**database):
+        manager = MemoryManager(make_config(tmp_path, **database))
+        manager.fake_memories = memories
+        managers.append(manager)
+        return manager
+
+    make.qdrant = qdrant
+    yield make
+    for manager in managers:
+        manager.close()
+
+
+def point_ids(memory, user_id):
+    """가짜 벡터 저장소에 있는 사용자 메모리 ID"""
+    return [
+        point_id for point_id, (_, payload) in memory.vector_store.points.items()
+        if payload.get("user_id") == user_id
+    ]
+
+
+# ----------------------------------------------------------------------
+# 1. SimpleMemoryManager
+# ----------------------------------------------------------------------
+
+def test_vector_fallback_backfills_vectors_lost_in_crash(simple_manager, tmp_path):
+    manager = simple_manager
+
+    async def scenario():
+        await manager.add_memory("커피를 좋아합니다", "u1")
+        manager.vector_index.save_all()
+        # 저장 주기 전에 죽어 세그먼트에 빠진 메모리
+        await manager.add_memory("파이썬 개발자입니다", "u1")
+        await manager.add_memory("강아지를 키웁니다", "u1")
+        manager.vector_index._users.clear()
+        manager.vector_index._changes.clear()
+
+        restarted = SimpleMemoryManager(make_config(tmp_path))
+        restarted.memory.search_error = RuntimeError("벡터 DB 장애")
+        return restarted, await restarted.search_memories("강아지", "u1", limit=1)
+
+    restarted, results = asyncio.run(scenario())
+    assert [r["text"] for r in results] == ["강아지를 키웁니다"]
+    assert len(restarted.vector_index.get("u1")) == 3
+
+
+def test_delete_all_memories_drops_vectors(simple_manager):
+    manager = simple_manager
+
+    async def scenario():
+        ids = [await manager.add_memory(text, "u1") for text in ["커피", "파이썬", "서울"]]
+        assert await manager.delete_memories(ids[:1], "u1") == 1
+        assert sorted(manager.vector_index.get("u1").ids) == sorted(ids[1:])
+        return await manager.delete_all_memories("u1")
+
+    assert asyncio.run(scenario()) == 2
+    assert not manager.vector_index.has_vectors("u1")
+    assert manager.memory.vector_store.points == {}
+
+
+def test_get_all_memories_pages_local_store(simple_manager):
+    manager = simple_manager
+
+    async def scenario():
+        ids = await manager.add_memories([f"메모리 {i}" for i in range(5)], "u1")
+        first = await manager.list_memories("u1", limit=2)
+        listed = await manager.get_all_memories("u1", limit=3)
+        return ids, first, listed
+
+    ids, first, listed = asyncio.run(scenario())
+    assert [m["id"] for m in first["memories"]] == ids[:2]
+    assert first["next_cursor"]
+    # mem0 사본은 합치지 않으므로 같은 메모리가 두 번 나오지 않음
+    assert [m["id"] for m in listed] == ids[:3]
+
+
+def test_add_memory_writes_local_entry_once(simple_manager, monkeypatch):
+    manager = simple_manager
+    writes = []
+    monkeypatch.setattr(manager.local_store, "update", lambda *args, **kwargs: writes.append("update"))
+
+    memory_id = asyncio.run(manager.add_memory("커피를 좋아합니다", "u1"))
+    entry = manager.local_store.get("u1", memory_id)
+    assert writes == []
+    # mem0 사본의 포인트 ID가 처음 기록한 엔트리에 들어 있음
+    assert list(manager.memory.vector_store.points) == entry["metadata"]["mem0_ids"]
+
+    assert asyncio.run(manager.delete_memory(memory_id, "u1"))
+    assert manager.memory.vector_store.points == {}
+
+
+def test_add_memories_writes_local_rows_first(simple_manager, monkeypatch):
+    manager = simple_manager
+    points = manager.memory.vector_store.points
+
+    def fail(user_id, entries):
+        raise OSError("disk full")
+
+    with monkeypatch.context() as patch:
+        patch.setattr(manager.local_store, "add_many", fail)
+        with pytest.raises(OSError):
+            asyncio.run(manager.add_memories(["커피", "파이썬"], "u1", raise_errors=True))
+    # 로컬 기록이 실패하면 지울 수 없는 mem0 벡터를 남기지 않음
+    assert points == {}
+
+    ids = asyncio.run(manager.add_memories(["커피", "파이썬"], "u1"))
+    entries = [manager.local_store.get("u1", memory_id) for memory_id in ids]
+    assert sorted(points) == sorted(entry["metadata"]["mem0_ids"][0] for entry in entries)
+    assert all("mem0_ids" not in payload for _, payload in points.values())
+
+
+def test_ingest_retry_after_partial_write_does_not_duplicate(simple_manager):
+    manager = simple_manager
+    attempts = []
+
+    async def handler(job, job_id):
+        await manager.add_memories(job["items"], job["user_id"], raise_errors=True, job_id=job_id)
+        await manager.add_memory(job["items"][0], job["user_id"], raise_errors=True, job_id=f"{job_id}_single")
+        attempts.append(job_id)
+        if len(attempts) == 1:
+            # 로컬/mem0 저장이 끝난 뒤 실패 - 같은 작업이 다시 실행됨
+            raise RuntimeError("후처리 실패")
+
+    queue = IngestQueue(handler, workers=1, max_retries=3, retry_delay=0.01)
+    try:
+        queue.submit({"items": ["커피를 좋아합니다", "파이썬 개발자입니다"], "user_id": "u1"})
+        assert queue.join(timeout=10)
+    finally:
+        queue.close()
+
+    assert len(attempts) == 2 and attempts[0] == attempts[1]
+    assert queue.stats()["processed"] == 1
+    assert manager.local_store.count("u1") == 3
+    assert len(manager.memory.vector_store.points) == 3
+    assert len(manager.vector_index.get("u1")) == 3
+
+
+def test_mem0_search_failure_is_logged_with_traceback(simple_manager, caplog):
+    manager = simple_manager
+    manager.memory.search_error = RuntimeError("벡터 DB 장애")
+
+    async def scenario():
+        await manager.add_memory("커피를 좋아합니다", "u1")
+        return await manager.search_memories("커피", "u1")
+
+    with caplog.at_level("ERROR", logger="core.memory_manager_simple"):
+        results = asyncio.run(scenario())
+    assert [r["text"] for r in results] == ["커피를 좋아합니다"]
+    failures = [record for record in caplog.records if "mem0 벡터 검색 실패" in record.getMessage()]
+    assert failures and failures[0].exc_info is not None
+
+
+def test_simple_related_memories_reuse_local_vectors(simple_manager):
+    manager = simple_manager
+
+    async def scenario():
+        ids = [await manager.add_memory(text, "u1") for text in ["커피를 좋아합니다", "커피와 파이썬", "서울 여행"]]
+        manager.memory.search_error = AssertionError("재임베딩")
+        return await manager.get_related_memories(ids[0], "u1", limit=1)
+
+    related = asyncio.run(scenario())
+    assert [item["text"] for item in related] == ["커피와 파이썬"]
+
+
+# ----------------------------------------------------------------------
+# 2. 메모리 풀
+# ----------------------------------------------------------------------
+
+class PooledMemory:
+    def __init__(self, user_id):
+        self.user_id = user_id
+        self.closed = False
+
+
+def make_pool(delay=0.0, **kwargs):
+    created = []
+
+    def factory(user_id):
+        time.sleep(delay)
+        memory = PooledMemory(user_id)
+        created.append(memory)
+        return memory
+
+    def on_evict(memory):
+        memory.closed = True
+
+    return MemoryPool(factory, on_evict=on_evict, **kwargs), created
+
+
+def test_pool_creates_once_per_user():
+    pool, created = make_pool(delay=0.1)
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(pool.get("u1"))) for _ in range(5)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(created) == 1
+    assert all(memory is created[0] for memory in results)
+    assert pool.stats()["misses"] == 1
+
+
+def test_pool_creation_does_not_block_other_users():
+    pool, _ = make_pool(delay=0.5)
+    pool.get("u1")
+    slow = threading.Thread(target=pool.get, args=("u2",))
+    slow.start()
+    time.sleep(0.05)
+
+    started = time.perf_counter()
+    assert pool.get("u1") is not None
+    assert time.perf_counter() - started < 0.2
+    slow.join()
+
+
+def test_pool_defers_close_until_release():
+    pool, created = make_pool(max_size=1)
+    with pool.lease("u1") as memory:
+        pool.get("u2")  # u1을 내보냄
+        assert "u1" not in pool
+        assert not memory.closed
+    assert memory.closed
+
+    # 빌리지 않은 인스턴스는 내보낼 때 바로 해제
+    pool.get("u3")
+    assert created[1].closed
+
+
+# ----------------------------------------------------------------------
+# 3. MemoryManager
+# ----------------------------------------------------------------------
+
+def test_multi_tenant_rejects_other_users_memory(make_manager):
+    manager = make_manager(multi_tenant=True)
+    memory = manager.default_memory
+
+    async def scenario():
+        await manager.add_memory("커피를 좋아합니다", "u1")
+        await manager.add_memory("서울에 삽니다", "u2")
+        memory_id = point_ids(memory, "u1")[0]
+
+        # 컬렉션을 공유하므로 ID만 알면 닿을 수 있지만 페이로드의 user_id로 거부
+        assert not await manager.update_memory(memory_id, "바뀐 메모리", "u2")
+        assert not await manager.delete_memory(memory_id, "u2")
+        assert await manager.get_memory_by_id(memory_id, "u2") is None
+        assert memory.get(memory_id)["memory"] == "커피를 좋아합니다"
+
+        assert await manager.delete_memory(memory_id, "u1")
+        assert memory.get(memory_id) is None
+
+    asyncio.run(scenario())
+    assert list(manager.fake_memories) == [("chroma", "memories")]
+
+
+def test_get_memory_by_id_reads_one_point(make_manager):
+    manager = make_manager()
+
+    async def scenario():
+        await manager.add_memory("파이썬 개발자입니다", "u1")
+        memory_id = point_ids(manager.get_user_memory("u1"), "u1")[0]
+        # 가짜 Memory.get_all은 실패하므로 전체 목록을 훑으면 None
+        item = await manager.get_memory_by_id(memory_id, "u1")
+        assert item["memory"] == "파이썬 개발자입니다"
+        assert await manager.get_memory_by_id("없는 ID", "u1") is None
+
+    asyncio.run(scenario())
+
+
+def test_related_memories_reuse_stored_vectors(make_manager):
+    manager = make_manager()
+
+    async def scenario():
+        for text in ["커피를 좋아합니다", "커피와 파이썬", "서울 여행"]:
+            await manager.add_memory(text, "u1")
+        memory = manager.get_user_memory("u1")
+        # 텍스트 검색(재임베딩)으로 빠지면 결과가 비도록 검색을 막음
+        memory.search_error = AssertionError("재임베딩")
+        base_id = point_ids(memory, "u1")[0]
+        return await manager.get_related_memories(base_id, "u1", limit=2), base_id
+
+    related, base_id = asyncio.run(scenario())
+    assert [item["memory"] for item in related] == ["커피와 파이썬", "서울 여행"]
+    assert base_id not in [item["id"] for item in related]
+
+
+def test_add_memories_batches_embeddings_and_upserts(make_manager):
+    manager = make_manager()
+    manager.config.memory.ingest_upsert_batch_size = 2
+
+    ids = asyncio.run(manager.add_memories(
+        ["커피", {"text": "파이썬", "metadata": {"category": "work"}}, "서울", "여행", "강아지"],
+        "u1"
+    ))
+    memory = manager.get_user_memory("u1")
+    assert len(ids) == 5
+    assert memory.vector_store.inserts == 3
+    assert memory.get(ids[1])["metadata"]["category"] == "work"
+
+
+def test_breaker_routes_reads_to_chroma_until_qdrant_recovers(make_manager):
+    make_manager.qdrant["up"] = True
+    manager = make_manager()
+    assert manager.backend == "qdrant"
+
+    async def scenario():
+        await manager.add_memory("커피를 좋아합니다", "u1")
+        qdrant_memory = manager.fake_memories[("qdrant", "user_u1_memories")]
+
+        # Qdrant가 죽으면 실패한 요청은 차단기를 열고 ChromaDB로 한 번 재시도
+        make_manager.qdrant["up"] = False
+        qdrant_memory.vector_store.collection = None
+        chroma_memory = FakeMemory()
+        chroma_memory.add("커피는 ChromaDB에", user_id="u1")
+        manager.fake_memories[("chroma", "user_u1_memories")] = chroma_memory
+        page = await manager.list_memories("u1")
+        assert [m["memory"] for m in page["memories"]] == ["커피는 ChromaDB에"]
+        assert manager.backend == "chroma"
+
+        # 복구되면 헬스 체크가 차단기를 닫고 다시 Qdrant로
+        make_manager.qdrant["up"] = True
+        qdrant_memory.vector_store.collection = FakeCollection(qdrant_memory.vector_store.points)
+        assert manager.qdrant_monitor.check()
+        page = await manager.list_memories("u1")
+        assert [m["memory"] for m in page["memories"]] == ["커피를 좋아합니다"]
+
+    asyncio.run(scenario())
+    assert manager.backend == "qdrant"
+
+
+def test_qdrant_local_path_resolves_against_base_dir(make_manager, tmp_path, monkeypatch):
+    opened = []
+
+    class FakeQdrantClient:
+        def get_collections(self):
+            return []
+
+    def open_qdrant_local(path):
+        opened.append(path)
+        return FakeQdrantClient()
+
+    monkeypatch.setattr(memory_manager, "open_qdrant_local", open_qdrant_local)
+    # 실행 위치와 무관하게 sqlite_path처럼 base_dir 기준
+    elsewhere = tmp_path / "elsewhere"
+    elsewhere.mkdir()
+    monkeypatch.chdir(elsewhere)
+
+    manager = make_manager(vector_db_type="qdrant_local")
+    expected = str((tmp_path / "data" / "qdrant").resolve())
+    assert manager.qdrant_path == expected
+    assert manager.mem0_configs["qdrant"]["vector_store"]["config"]["path"] == expected
+    assert manager.backend == "qdrant"
+    assert set(opened) == {expected}
+
+
+def wait_until(predicate, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if predicate():
+            return True
+        time.sleep(0.01)
+    return False
+
+
+def test_statistics_survive_restart_and_backend_change(make_manager, monkeypatch):
+    manager = make_manager()
+    asyncio.run(manager.add_memories(["커피", {"text": "파이썬", "metadata": {"category": "work"}}], "u1"))
+
+    # 처음 조회는 기다리지 않고 0을 돌려주며 백그라운드에서 계산
+    assert manager.get_statistics("u1")["total_memories"] == 0
+    assert wait_until(lambda: manager.get_statistics("u1")["total_memories"] == 2)
+    manager._on_backend_change(False)
+    assert manager.get_statistics("u1")["categories"] == {"uncategorized": 1, "work": 1}
+    manager.close()
+
+    # 재시작: 저장된 카운터를 그대로 사용 (저장소를 다시 순회하지 않음)
+    memory_stats._stats.clear()
+    monkeypatch.setattr(memory_manager, "scroll_page", lambda *args: pytest.fail("전체 순회"))
+    restarted = make_manager()
+    assert restarted.get_statistics("u1")["total_memories"] == 2
+
+
+def test_statistics_after_crash_show_last_value_while_rebuilding(make_manager):
+    manager = make_manager()
+    asyncio.run(manager.add_memories(["커피", "파이썬"], "u1"))
+    manager.rebuild_statistics("u1")
+    manager.close()
+    memory_stats._stats.clear()
+
+    # 다음 실행이 카운터를 갱신하지 못하고 비정상 종료
+    crashed = make_manager()
+    crashed.get_user_memory("u1").add("서울 여행", user_id="u1")
+    memory_stats._stats.clear()
+
+    restarted = make_manager()
+    assert restarted.memory_stats.is_stale("u1")
+    assert restarted.get_statistics("u1")["total_memories"] == 2
+    assert wait_until(lambda: restarted.get_statistics("u1")["total_memories"] == 3)
+    assert not restarted.memory_stats.is_stale("u1")
+
+
+# ----------------------------------------------------------------------
+# 4. 블로킹 호출 실행기
+# ----------------------------------------------------------------------
+
+def test_run_blocking_keeps_loop_responsive():
+    loop_thread = threading.get_ident()
+
+    def blocking_call():
+        time.sleep(0.2)
+        return threading.get_ident()
+
+    async def scenario():
+        ticks = 0
+
+        async def ticker():
+            nonlocal ticks
+            while True:
+                await asyncio.sleep(0.01)
+                ticks += 1
+
+        task = asyncio.create_task(ticker())
+        worker_thread = await run_blocking(blocking_call)
+        task.cancel()
+        return worker_thread, ticks
+
+    worker_thread, ticks = asyncio.run(scenario())
+    assert worker_thread != loop_thread
+    # 블로킹 호출 동안에도 루프가 다른 작업을 실행
+    assert ticks >= 5
+
+
+def test_timed_out_call_keeps_executor_slot(monkeypatch):
+    # 루프당 자리 하나 - 시간 초과된 호출의 스레드가 끝나야 다음 호출이 시작
+    monkeypatch.setattr(executor, "_max_pending", 1)
+    finish = threading.Event()
+    order = []
+
+    def slow_call():
+        finish.wait(5)
+        order.append("slow")
+
+    async def scenario():
+        with pytest.raises(asyncio.TimeoutError):
+            await asyncio.wait_for(run_blocking(slow_call), 0.05)
+        waiting = asyncio.create_task(run_blocking(order.append, "next"))
+        await asyncio.sleep(0.1)
+        assert not waiting.done()
+        finish.set()
+        await waiting
+
+    asyncio.run(scenario())
+    assert order == ["slow", "next"]
+
+
+if __name__ == "__main__":
+    sys.exit(pytest.main([__file__, "-q"]))